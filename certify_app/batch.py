@@ -0,0 +1,156 @@
+import os
+import time
+import shutil
+import socket
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Any, Iterable
+
+from .config import BACKUP_DIR
+from .helpers import sanitize_folder_name, write_json_atomic
+from .outputs import THUMB_DIR
+from .cache import RenderCache, get_default_cache
+from .certificate import export_certificate
+from .verification import new_certificate_id, output_files, record_certificates
+from .profiling import BatchProfiler, profiling_requested, format_profile
+
+
+def generate_batch(
+    names: Iterable[Any],
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    output_dir: str,
+    signatories: List[Dict],
+    log: Optional[Callable[[str], None]] = None,
+    cache: Optional[RenderCache] = None,
+    print_ids: bool = False,
+    record: bool = True,
+    formats: Optional[List[Dict[str, Any]]] = None,
+    scale: float = 1.0,
+    file_stems: Optional[List[str]] = None,
+    thumbnails: bool = True,
+    field_texts: Optional[Dict[str, List[str]]] = None,
+    profile: Optional[bool] = None,
+) -> Dict[str, Any]:
+    # profile=None follows the CERTIFY_PROFILE environment variable
+    log = log or (lambda _msg: None)
+    record = record and scale == 1.0  # drafts are not real certificates
+    cache = cache if cache is not None else get_default_cache()
+    cache.reset_stats()
+
+    generated = 0
+    failed = 0
+    outputs: List[str] = []
+    files = 0
+    records: List[Dict[str, Any]] = []
+    thumb_names: Dict[str, str] = {}
+    run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profiler = BatchProfiler(output_dir) if (profiling_requested() if profile is None else profile) else None
+    if profiler:
+        profiler.start()
+    started = time.perf_counter()
+
+    # file_stems: collision-free output names from validation.validate_participants, parallel to names;
+    # field_texts: per-participant layout texts (report["fields"]), each list parallel to names
+    rows = zip(names, file_stems) if file_stems is not None else ((n, None) for n in names)
+    field_texts = field_texts or {}
+    for i, (raw, stem) in enumerate(rows):
+        missing = raw is None or (isinstance(raw, float) and raw != raw)  # None / NaN cells
+        name = "" if missing else str(raw).strip()
+        if not name:
+            failed += 1
+            log("Skipped empty name.")
+            continue
+
+        cert_id = new_certificate_id()
+        try:
+            paths = export_certificate(
+                participant_name=name,
+                event_title=event_title,
+                event_org=event_org,
+                event_dates=event_dates,
+                template_path=template_path,
+                output_dir=output_dir,
+                signatories=signatories,
+                cache=cache,
+                certificate_id=cert_id if print_ids else None,
+                formats=formats,
+                scale=scale,
+                file_stem=stem,
+                thumbnail=thumbnails,
+                fields={key: texts[i] for key, texts in field_texts.items()},
+            )
+            # the PDF when one was requested, so outputs keep naming the certificate file
+            main_path = next((p for p in paths if p.lower().endswith(".pdf")), paths[0])
+            files += len(paths)
+            log(f"Generated: {', '.join(paths)}")
+            outputs.append(main_path)
+            generated += 1
+            thumb_names[os.path.splitext(os.path.basename(main_path))[0]] = name
+            if record:
+                records.append({
+                    "id": cert_id,
+                    "participant": name,
+                    "event": event_title,
+                    "run_ts": run_ts,
+                    "files": output_files(paths),
+                })
+        except Exception as e:
+            failed += 1
+            log(f"[FAILED] {name}: {e}")
+
+    if thumbnails and thumb_names:
+        write_thumb_index(output_dir, thumb_names)
+
+    recorded = 0
+    if records:
+        try:
+            recorded = record_certificates(records)
+        except Exception as e:
+            log(f"[WARN] Verification index update failed: {e}")
+
+    seconds = time.perf_counter() - started
+    profile_summary = None
+    if profiler:
+        try:
+            profile_summary = profiler.stop()
+            for line in format_profile(profile_summary):
+                log(line)
+        except Exception as e:
+            log(f"[WARN] Profiling failed: {e}")
+
+    return {
+        "generated": generated,
+        "failed": failed,
+        "outputs": outputs,
+        "files": files,
+        "recorded": recorded,
+        "seconds": seconds,
+        "cache": cache.stats(),
+        "profile": profile_summary,
+    }
+
+
+def write_thumb_index(output_dir: str, names: Dict[str, str]) -> str:
+    # file stem -> participant name, for searching the gallery. One file per batch call,
+    # so spool workers sharing a run folder never overwrite each other's entries.
+    path = os.path.join(output_dir, THUMB_DIR, f"names-{socket.gethostname()}-{os.getpid()}-{time.time_ns()}.json")
+    write_json_atomic(path, names)
+    return path
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    stats = report.get("cache", {})
+    return (
+        f"Generated: {report['generated']} ({report.get('files', report['generated'])} files), Failed/Skipped: {report['failed']}, "
+        f"Time: {report['seconds']:.2f}s, Indexed: {report.get('recorded', 0)} | Cache hits: {stats.get('memory_hits', 0)} memory, "
+        f"{stats.get('hits', 0)} disk, misses: {stats.get('misses', 0)}, evictions: {stats.get('evictions', 0)}"
+    )
+
+
+def backup_output(output_dir: str, event_folder: str, timestamp: str) -> str:
+    backup_path = os.path.join(BACKUP_DIR, f"backup_{sanitize_folder_name(event_folder)}_{timestamp}")
+    # certificates only; .thumbs/ and .profile/ are working files of the live run
+    shutil.copytree(output_dir, backup_path, ignore=shutil.ignore_patterns(".*"))
+    return backup_path
@@ -0,0 +1,139 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, Optional, Any
+
+from PIL import Image
+
+from .config import CACHE_DIR, CACHE_MAX_BYTES
+
+
+def cache_key(kind: str, parts: Dict[str, Any]) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{kind}_" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# Content-addressed PNG cache on disk; least-recently-used entries are evicted past max_bytes.
+class RenderCache:
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.memory_hits = 0  # served by the in-process layers in front of this cache
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Bytes on disk as this process knows them: seeded by one scan, then kept up to date by
+        # put_image, so a write only rescans the folder once the budget is exceeded. Writes from
+        # other processes are picked up by that rescan.
+        self._total: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".png")
+
+    def get_image(self, key: str) -> Optional[Image.Image]:
+        path = self._path(key)
+        try:
+            with Image.open(path) as im:
+                im.load()
+                image = im.copy()
+            os.utime(path, None)  # mtime doubles as the LRU timestamp
+        except Exception:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return image
+
+    def count_memory_hit(self) -> None:
+        with self._lock:
+            self.memory_hits += 1
+
+    def put_image(self, key: str, image: Image.Image) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if self._total is None:
+            total = self.size_bytes()
+            with self._lock:
+                if self._total is None:
+                    self._total = total
+        try:
+            image.save(tmp, "PNG", compress_level=1)
+            size = os.path.getsize(tmp)
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._total += size - replaced
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(".png"):
+                continue
+            full = os.path.join(self.root, name)
+            try:
+                st = os.stat(full)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+            total += st.st_size
+
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, full in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(full)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+        with self._lock:
+            self._total = total
+
+    def size_bytes(self) -> int:
+        try:
+            return sum(
+                os.path.getsize(os.path.join(self.root, n))
+                for n in os.listdir(self.root) if n.endswith(".png")
+            )
+        except FileNotFoundError:
+            return 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.memory_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "memory_hits": self.memory_hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_default_cache: Optional[RenderCache] = None
+
+
+def get_default_cache() -> RenderCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache()
+    return _default_cache
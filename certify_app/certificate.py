@@ -1,75 +1,261 @@
 import os
-from typing import List, Dict
-from PIL import Image, ImageDraw, ImageFont
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any
+from PIL import Image, ImageDraw
 
-from .helpers import resource_path, safe_filename
+from .helpers import safe_filename, file_digest
+from . import fonts
+from .signatures import prepare_signature
+from .cache import RenderCache, cache_key
+from .outputs import save_outputs, save_thumbnail
+from .layout import get_placement_plan, layout_digest
+
+# Composited base layers kept in memory for the current process (template + static text + signatures).
+BASE_LAYER_MEMORY_SLOTS = 8
+_BASE_LAYERS: "OrderedDict[str, Image.Image]" = OrderedDict()
+_BASE_LAYERS_LOCK = threading.Lock()
 
 def load_template(template_path: str) -> Image.Image:
     if not os.path.exists(template_path):
         return Image.new("RGB", (1600, 1000), color="white")
-    return Image.open(template_path).convert("RGB")
+    with Image.open(template_path) as im:
+        return im.convert("RGB")
 
-def draw_text(image: Image.Image, text: str, position: tuple, font_size: int = 40) -> None:
-    draw = ImageDraw.Draw(image)
-    font_path = resource_path(os.path.join("fonts", "Roboto-VariableFont_wdth,wght.ttf"))
-    try:
-        font = ImageFont.truetype(font_path, font_size)
-    except Exception:
-        font = ImageFont.load_default()
+def get_font(font_size: int, instance: Optional[str] = None):
+    return fonts.get_font(font_size, instance)
 
+def draw_text(
+    image: Image.Image,
+    text: str,
+    position: tuple,
+    font_size: int = 40,
+    align: str = "center",
+    instance: Optional[str] = None,
+) -> None:
+    draw = ImageDraw.Draw(image)
     text = "" if text is None else str(text)
+    runs = fonts.font_runs(text, font_size, instance) if text else []
+    if len(runs) > 1:
+        _draw_runs(draw, runs, position, align)
+        return
+    font = runs[0][0] if runs else get_font(font_size, instance)
+
     bbox = draw.textbbox((0, 0), text, font=font)
     w = bbox[2] - bbox[0]
     h = bbox[3] - bbox[1]
-    x = position[0] - (w / 2)
+    if align == "left":
+        x = position[0] - bbox[0]
+    elif align == "right":
+        x = position[0] - w - bbox[0]
+    else:
+        x = position[0] - (w / 2)
     y = position[1] - (h / 2)
     draw.text((x, y), text, fill="black", font=font)
 
-def generate_certificate(
-    participant_name: str,
+def _draw_runs(draw: ImageDraw.ImageDraw, runs: List, position: tuple, align: str) -> None:
+    # Mixed-font text: runs share one baseline and advance by their own widths.
+    top = min(draw.textbbox((0, 0), chunk, font=font, anchor="ls")[1] for font, chunk in runs)
+    bottom = max(draw.textbbox((0, 0), chunk, font=font, anchor="ls")[3] for font, chunk in runs)
+    width = sum(font.getlength(chunk) for font, chunk in runs)
+    if align == "left":
+        x = position[0]
+    elif align == "right":
+        x = position[0] - width
+    else:
+        x = position[0] - width / 2
+    baseline = position[1] - (bottom - top) / 2 - top
+    for font, chunk in runs:
+        draw.text((x, baseline), chunk, fill="black", font=font, anchor="ls")
+        x += font.getlength(chunk)
+
+def base_layer_key(
     event_title: str,
     event_org: str,
     event_dates: str,
     template_path: str,
-    output_dir: str,
     signatories: List[Dict],
+    scale: float = 1.0,
 ) -> str:
-    image = load_template(template_path)
-    img_w, img_h = image.size
+    template_digest = file_digest(template_path) if os.path.exists(template_path) else ""
+    sigs = []
+    for sig in signatories:
+        sig_path = sig.get("signature_path")
+        sigs.append({
+            "name": sig.get("name", ""),
+            "position": sig.get("position", ""),
+            "signature": file_digest(sig_path) if sig_path and os.path.exists(sig_path) else "",
+        })
+    parts = {
+        "title": event_title,
+        "org": event_org,
+        "dates": event_dates,
+        "template": template_digest,
+        "signatories": sigs,
+        "fonts": fonts.chain_digest(),
+    }
+    if scale != 1.0:
+        parts["scale"] = scale
+    layout = layout_digest(template_path)
+    if layout != "default":
+        parts["layout"] = layout
+    return cache_key("base", parts)
+
+def scaled(value: float, scale: float) -> int:
+    return max(1, int(round(value * scale)))
 
-    # NOTE: Keep your original coordinates (adjust per template if needed)
-    draw_text(image, participant_name, position=(1000, 680), font_size=70)
-    draw_text(image, f"for participating in the {event_title} held by {event_org}", position=(1000, 830), font_size=32)
-    draw_text(image, f"on {event_dates}", position=(1000, 900), font_size=32)
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
 
-    bottom_signature_y = img_h - 210
-    bottom_name_y = img_h - 140
-    bottom_position_y = img_h - 90
+def format_field(field: Dict, context: Dict) -> str:
+    return str(field.get("text") or "").format_map(_KeepMissing(context))
 
-    for i, sig in enumerate(signatories):
-        if len(signatories) == 1:
-            x = img_w // 2
-        elif len(signatories) == 2:
-            x = img_w // 3 if i == 0 else 2 * img_w // 3
-        else:
-            x = img_w // 4 if i == 0 else img_w // 2 if i == 1 else 3 * img_w // 4
+def draw_field(image: Image.Image, field: Dict, text: str) -> None:
+    draw_text(image, text, position=(field["x"], field["y"]), font_size=field["size"], align=field["align"],
+              instance=field.get("font_instance"))
 
+def render_base_layer(
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    signatories: List[Dict],
+    cache: Optional[RenderCache] = None,
+    scale: float = 1.0,
+) -> Image.Image:
+    image = load_template(template_path)
+    if scale != 1.0:
+        image = image.resize((scaled(image.width, scale), scaled(image.height, scale)), Image.BILINEAR)
+
+    # Geometry comes from templates/<template>.layout.json (or the built-in default layout)
+    plan = get_placement_plan(template_path, image.size, len(signatories), scale)
+    context = {"event_title": event_title, "event_org": event_org, "event_dates": event_dates}
+    for field in plan["static"].values():
+        draw_field(image, field, format_field(field, context))
+
+    for sig, slot in zip(signatories, plan["slots"]):
+        x = slot["x"]
         sig_path = sig.get("signature_path")
         if sig_path and os.path.exists(sig_path):
-            s_img = Image.open(sig_path).convert("RGBA")
-            max_width = int(img_w * 0.18)
-            ratio = max_width / max(1, s_img.width)
-            new_height = int(s_img.height * ratio)
-            s_img = s_img.resize((max_width, new_height))
+            s_img = prepare_signature(sig_path, plan["signature_width"], cache=cache)
             sig_x = x - s_img.width // 2
-            sig_y = bottom_signature_y - new_height // 2
+            sig_y = slot["signature_y"] - s_img.height // 2
             image.paste(s_img, (sig_x, sig_y), s_img)
 
-        draw_text(image, sig.get("name", ""), position=(x, bottom_name_y), font_size=40)
-        draw_text(image, sig.get("position", ""), position=(x, bottom_position_y), font_size=32)
+        draw_text(image, sig.get("name", ""), position=(x, slot["name_y"]), font_size=plan["signature_name_size"])
+        draw_text(image, sig.get("position", ""), position=(x, slot["position_y"]), font_size=plan["signature_position_size"])
+
+    return image
+
+def get_base_layer(
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    signatories: List[Dict],
+    cache: Optional[RenderCache] = None,
+    scale: float = 1.0,
+) -> Image.Image:
+    key = base_layer_key(event_title, event_org, event_dates, template_path, signatories, scale=scale)
+
+    with _BASE_LAYERS_LOCK:
+        image = _BASE_LAYERS.get(key)
+        if image is not None:
+            _BASE_LAYERS.move_to_end(key)
+    if image is not None:
+        if cache is not None:
+            cache.count_memory_hit()
+        return image
 
-    os.makedirs(output_dir, exist_ok=True)
-    pdf_name = safe_filename(participant_name) + ".pdf"
-    pdf_path = os.path.join(output_dir, pdf_name)
-    image.save(pdf_path, "PDF", resolution=100.0)
-    return pdf_path
+    if cache is not None:
+        image = cache.get_image(key)
+    if image is None:
+        image = render_base_layer(event_title, event_org, event_dates, template_path, signatories, cache=cache, scale=scale)
+        if cache is not None:
+            cache.put_image(key, image)
+
+    with _BASE_LAYERS_LOCK:
+        _BASE_LAYERS[key] = image
+        while len(_BASE_LAYERS) > BASE_LAYER_MEMORY_SLOTS:
+            _BASE_LAYERS.popitem(last=False)
+    return image
+
+def clear_base_layers() -> None:
+    with _BASE_LAYERS_LOCK:
+        _BASE_LAYERS.clear()
+
+def render_certificate(
+    participant_name: str,
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    signatories: List[Dict],
+    cache: Optional[RenderCache] = None,
+    certificate_id: Optional[str] = None,
+    scale: float = 1.0,
+    fields: Optional[Dict[str, str]] = None,
+) -> Image.Image:
+    base = get_base_layer(event_title, event_org, event_dates, template_path, signatories, cache=cache, scale=scale)
+    image = base.copy()
+    dynamic = get_placement_plan(template_path, image.size, len(signatories), scale)["dynamic"]
+    if "name" in dynamic:
+        draw_field(image, dynamic["name"], participant_name)
+    if certificate_id and "certificate_id" in dynamic:
+        draw_field(image, dynamic["certificate_id"], format_field(dynamic["certificate_id"], {"certificate_id": certificate_id}))
+    # fields: this participant's texts for the layout's per-participant fields (texts.participant_texts)
+    for key, text in (fields or {}).items():
+        if text and key in dynamic:
+            draw_field(image, dynamic[key], text)
+    return image
+
+def export_certificate(
+    participant_name: str,
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    output_dir: str,
+    signatories: List[Dict],
+    cache: Optional[RenderCache] = None,
+    certificate_id: Optional[str] = None,
+    formats: Optional[List[Dict[str, Any]]] = None,
+    scale: float = 1.0,
+    file_stem: Optional[str] = None,
+    thumbnail: bool = False,
+    fields: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    # render once, then encode every requested format from the same composited image
+    image = render_certificate(
+        participant_name, event_title, event_org, event_dates, template_path, signatories,
+        cache=cache, certificate_id=certificate_id, scale=scale, fields=fields,
+    )
+    base_name = file_stem or safe_filename(participant_name)
+    paths = save_outputs(image, output_dir, base_name, formats)
+    if thumbnail:
+        save_thumbnail(image, output_dir, base_name)
+    return paths
+
+def generate_certificate(
+    participant_name: str,
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    output_dir: str,
+    signatories: List[Dict],
+    cache: Optional[RenderCache] = None,
+    certificate_id: Optional[str] = None,
+    formats: Optional[List[Dict[str, Any]]] = None,
+    scale: float = 1.0,
+    file_stem: Optional[str] = None,
+    fields: Optional[Dict[str, str]] = None,
+) -> str:
+    # scale < 1.0 renders a draft: template, fonts, signatures and coordinates all shrink together
+    paths = export_certificate(
+        participant_name, event_title, event_org, event_dates, template_path, output_dir, signatories,
+        cache=cache, certificate_id=certificate_id, formats=formats, scale=scale, file_stem=file_stem,
+        fields=fields,
+    )
+    return paths[0]
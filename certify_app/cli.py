@@ -0,0 +1,486 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+from typing import List, Dict, Optional
+
+import pandas as pd
+
+from .config import EVENTS_DIR, VERIFY_DB, ensure_folders
+from .helpers import sanitize_folder_name, load_event_settings
+from .outputs import parse_formats
+from .layout import write_default_layout
+from .draft import render_contact_sheets, DEFAULT_DRAFT_SCALE, DEFAULT_COLUMNS, DEFAULT_PER_SHEET
+from .batch import generate_batch, format_report, backup_output
+from .texts import texts_for_template
+from .validation import validate_participants, has_issues, format_validation_report
+from .estimate import estimate_batch, format_estimate
+from .imposition import impose_certificates, SHEET_SIZES_MM, DEFAULT_DPI
+from .watcher import EventWatcher
+from .server import CertificateService, serve, DEFAULT_WORKERS, DEFAULT_PDF_CACHE_BYTES
+from . import spool, verification, retention, storage, golden
+
+
+def _log(msg: str) -> None:
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+def _parse_signatories(values: Optional[List[str]], fallback: Optional[List[Dict]] = None) -> List[Dict]:
+    # --signatory "Name;Position[;path/to/signature.png]"
+    if not values and fallback:
+        return fallback
+    out = []
+    for raw in values or []:
+        parts = [p.strip() for p in raw.split(";")]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            raise SystemExit(f"Invalid --signatory (expected 'Name;Position[;signature]'): {raw}")
+        out.append({"name": parts[0], "position": parts[1], "signature_path": parts[2] if len(parts) > 2 and parts[2] else None})
+    if not out:
+        raise SystemExit("Add at least 1 --signatory.")
+    if len(out) > 3:
+        raise SystemExit("Maximum of 3 signatories allowed.")
+    return out
+
+
+def _event_context(event: str) -> Dict:
+    folder = sanitize_folder_name(event)
+    event_path = os.path.join(EVENTS_DIR, folder)
+    if not folder or not os.path.isdir(event_path):
+        raise SystemExit(f"Event not found: {event}")
+
+    participants_csv = os.path.join(event_path, "participants.csv")
+    if not os.path.exists(participants_csv):
+        raise SystemExit("Participants CSV missing. Import participants first.")
+    df = pd.read_csv(participants_csv)
+    if "name" not in df.columns:
+        raise SystemExit("participants.csv must have a 'name' column.")
+
+    ctx = load_event_settings(event_path)
+    ctx.update({"folder": folder, "event_path": event_path, "names": df["name"].tolist(), "participants": df})
+    return ctx
+
+
+def _template_for(args: argparse.Namespace, ctx: Dict) -> str:
+    template = args.template or ctx["template"]
+    if not template:
+        raise SystemExit("No template given (use --template or generate once from the GUI).")
+    return template
+
+
+def _preflight(ctx: Dict, template: str, signatories: List[Dict], strict: bool = False) -> Dict:
+    report = validate_participants(ctx["participants"], template_path=template, n_signatories=len(signatories),
+                                   context=ctx)
+    for line in format_validation_report(report):
+        _log(line)
+    if not report["valid"]:
+        raise SystemExit("participants.csv has no usable names.")
+    if strict and has_issues(report):
+        raise SystemExit("Pre-flight check failed (--strict).")
+    return report
+
+
+def _estimate(args: argparse.Namespace, ctx: Dict, template: str, signatories: List[Dict],
+              checked: Dict, workers: int) -> Dict:
+    est = estimate_batch(
+        checked["names"],
+        event_title=ctx["event_title"],
+        event_org=ctx["event_org"],
+        event_dates=ctx["event_dates"],
+        template_path=template,
+        signatories=signatories,
+        formats=_formats(args),
+        print_ids=args.print_ids,
+        workers=workers,
+        backup=not args.no_backup,
+        output_dir=os.path.join(ctx["event_path"], "certificates"),
+    )
+    _log(format_estimate(est))
+    return est
+
+
+def _formats(args: argparse.Namespace) -> List[Dict]:
+    try:
+        return parse_formats(args.formats)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+def _add_event_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("event", help="Event name or folder under events/")
+    p.add_argument("--template", help="Template image path (default: the one saved in event.json)")
+    p.add_argument("--signatory", action="append", help="'Name;Position[;signature.png]' (repeat up to 3)")
+    p.add_argument("--no-backup", action="store_true", help="Skip copying the run into backups/")
+    p.add_argument("--print-ids", action="store_true", help="Print each certificate's verification ID on the page")
+    p.add_argument("--formats", default="pdf", help="Output formats, e.g. 'pdf,png:width=1200,webp:quality=80:width=1200'")
+    p.add_argument("--strict", action="store_true", help="Abort if the participant pre-flight check finds problems")
+    p.add_argument("--dry-run", action="store_true", help="Render a small sample, print the time/disk estimate and exit")
+    p.add_argument("--profile", action="store_true",
+                   help="Write CPU samples and memory growth for each batch to <run>/.profile/ (or set CERTIFY_PROFILE=1)")
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    ctx = _event_context(args.event)
+    signatories = _parse_signatories(args.signatory, ctx["signatories"])
+    template = _template_for(args, ctx)
+    checked = _preflight(ctx, template, signatories, strict=args.strict)
+    if args.dry_run:
+        return 0 if _estimate(args, ctx, template, signatories, checked, workers=1)["fits"] else 1
+    with storage.run_lock(ctx["event_path"]):
+        output_dir = storage.new_run_dir(ctx["event_path"])
+        report = generate_batch(
+            checked["names"],
+            event_title=ctx["event_title"],
+            event_org=ctx["event_org"],
+            event_dates=ctx["event_dates"],
+            template_path=template,
+            output_dir=output_dir,
+            signatories=signatories,
+            log=_log,
+            print_ids=args.print_ids,
+            formats=_formats(args),
+            file_stems=checked["output_names"],
+            field_texts=checked["fields"],
+            profile=args.profile or None,
+        )
+    _log(f"Run report: {format_report(report)}")
+    if not args.no_backup:
+        _log(f"Backup saved: {backup_output(output_dir, ctx['folder'], os.path.basename(output_dir))}")
+    return 0 if report["failed"] == 0 else 1
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    ctx = _event_context(args.event)
+    template = args.template or ctx["template"]
+    signatories = _parse_signatories(args.signatory, ctx["signatories"]) if (args.signatory or ctx["signatories"]) else []
+    report = validate_participants(ctx["participants"], template_path=template, n_signatories=len(signatories),
+                                   context=ctx)
+    for line in format_validation_report(report):
+        _log(line)
+    return 1 if has_issues(report) else 0
+
+
+def cmd_draft(args: argparse.Namespace) -> int:
+    ctx = _event_context(args.event)
+    signatories = _parse_signatories(args.signatory, ctx["signatories"])
+    template = _template_for(args, ctx)
+    output_dir = os.path.join(ctx["event_path"], "drafts", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    report = render_contact_sheets(
+        ctx["names"],
+        event_title=ctx["event_title"],
+        event_org=ctx["event_org"],
+        event_dates=ctx["event_dates"],
+        template_path=template,
+        output_dir=output_dir,
+        signatories=signatories,
+        scale=args.scale,
+        columns=args.columns,
+        per_sheet=args.per_sheet,
+        log=_log,
+        field_texts=texts_for_template(ctx["participants"], template, len(signatories), ctx),
+    )
+    _log(f"Draft: {report['names']} names on {len(report['sheets'])} sheet(s) in {report['seconds']:.2f}s → {output_dir}")
+    return 0
+
+
+def cmd_impose(args: argparse.Namespace) -> int:
+    ctx = _event_context(args.event)
+    signatories = _parse_signatories(args.signatory, ctx["signatories"])
+    template = _template_for(args, ctx)
+    checked = _preflight(ctx, template, signatories)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = args.output or os.path.join(
+        ctx["event_path"], "print", f"{timestamp}_{args.sheet}_{args.up}up.pdf"
+    )
+    with storage.run_lock(ctx["event_path"]):
+        report = impose_certificates(
+            checked["names"],
+            event_title=ctx["event_title"],
+            event_org=ctx["event_org"],
+            event_dates=ctx["event_dates"],
+            template_path=template,
+            output_path=output_path,
+            signatories=signatories,
+            sheet=args.sheet,
+            up=args.up,
+            dpi=args.dpi,
+            crop_marks=not args.no_crop_marks,
+            log=_log,
+            field_texts=checked["fields"],
+        )
+    _log(f"Imposed {report['names']} certificates on {report['sheets']} sheet(s) in {report['seconds']:.2f}s")
+    return 0
+
+
+def cmd_spool(args: argparse.Namespace) -> int:
+    ctx = _event_context(args.event)
+    signatories = _parse_signatories(args.signatory, ctx["signatories"])
+    template = _template_for(args, ctx)
+    checked = _preflight(ctx, template, signatories, strict=args.strict)
+    if args.dry_run:
+        return 0 if _estimate(args, ctx, template, signatories, checked, workers=max(1, args.workers))["fits"] else 1
+
+    spool_dir = spool.create_spool(
+        ctx["event_path"], checked["names"],
+        event_title=ctx["event_title"],
+        event_org=ctx["event_org"],
+        event_dates=ctx["event_dates"],
+        template_path=template,
+        signatories=signatories,
+        shard_size=args.shard_size,
+        print_ids=args.print_ids,
+        formats=_formats(args),
+        file_stems=checked["output_names"],
+        field_texts=checked["fields"],
+        profile=args.profile,
+    )
+    _log(f"Spool created: {spool_dir}")
+    procs = spool.spawn_local_workers(spool_dir, args.workers)
+    if procs:
+        _log(f"Started {len(procs)} local worker(s).")
+    if args.no_wait:
+        return 0
+
+    report = spool.coordinate(spool_dir, lease_timeout=args.lease_timeout, log=_log)
+    for proc in procs:
+        proc.wait()
+    _log(f"Run assembled: {report['generated']} generated, {report['failed']} failed → {report['output_dir']}")
+    if not args.no_backup:
+        _log(f"Backup saved: {backup_output(report['output_dir'], ctx['folder'], os.path.basename(spool_dir))}")
+    return 0 if report["failed"] == 0 else 1
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    count = spool.run_worker(args.spool_dir, log=_log, idle_exit=args.once)
+    _log(f"Worker finished: {count} shard(s) rendered.")
+    return 0
+
+
+def cmd_coordinate(args: argparse.Namespace) -> int:
+    report = spool.coordinate(args.spool_dir, lease_timeout=args.lease_timeout, log=_log)
+    _log(f"Run assembled: {report['generated']} generated, {report['failed']} failed → {report['output_dir']}")
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    defaults = {}
+    if args.template:
+        defaults["template"] = args.template
+    if args.signatory:
+        defaults["signatories"] = _parse_signatories(args.signatory)
+
+    watcher = EventWatcher(
+        events_dir=args.events_dir, debounce=args.debounce,
+        poll_interval=args.poll_interval, defaults=defaults, log=_log,
+    )
+    try:
+        watcher.run_forever()
+    except KeyboardInterrupt:
+        watcher.stop()
+        _log("Watcher stopped.")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    service = CertificateService(
+        events_dir=args.events_dir,
+        workers=args.workers,
+        pdf_cache_bytes=int(args.cache_mb * 1024 * 1024),
+        allow_unlisted=args.allow_unlisted,
+    )
+    try:
+        serve(args.host, args.port, service=service, log=_log)
+    except KeyboardInterrupt:
+        _log("Server stopped.")
+    return 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    matches = verification.verify(args.query, db_path=args.db)
+    if not matches:
+        _log(f"NOT FOUND: no certificate matches '{args.query}'.")
+        return 1
+    for record in matches:
+        _log(f"VALID: {verification.describe(record)}")
+    return 0
+
+
+def cmd_retention(args: argparse.Namespace) -> int:
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+    if args.interval:
+        scanner = retention.RetentionScanner(args.events_dir, interval=args.interval, dedupe=not args.no_dedupe, log=_log)
+        scanner.start()
+        _log(f"Retention scanner running every {args.interval:.0f}s (Ctrl+C to stop).")
+        try:
+            while scanner.is_alive():
+                scanner.join(1.0)
+        except KeyboardInterrupt:
+            scanner.stop()
+            _log("Retention scanner stopped.")
+        return 0
+
+    if args.event:
+        event_path = os.path.join(args.events_dir, sanitize_folder_name(args.event))
+        if not os.path.isdir(event_path):
+            raise SystemExit(f"Event not found: {args.event}")
+        policy = retention.event_policy(event_path)
+        policy = {
+            "keep_last": args.keep_last if args.keep_last is not None else policy["keep_last"],
+            "max_bytes": max_bytes if max_bytes is not None else policy["max_bytes"],
+            "dedupe": not args.no_dedupe,
+        }
+        if args.apply:
+            return 0 if retention.apply_retention(event_path, log=_log, **policy) is not None else 1
+        plan = retention.plan_retention(event_path, **policy)
+        _log("[dry-run] " + retention.format_plan(plan))
+        for run in plan["delete"]:
+            _log(f"  remove {run['timestamp']}: {', '.join(run['paths'])}")
+        return 0
+
+    retention.scan_events(args.events_dir, apply=args.apply, keep_last=args.keep_last,
+                          max_bytes=max_bytes, dedupe=not args.no_dedupe, log=_log)
+    if not args.apply:
+        _log("Dry run only; add --apply to remove runs and deduplicate files.")
+    return 0
+
+
+def cmd_layout_init(args: argparse.Namespace) -> int:
+    try:
+        path = write_default_layout(args.template, overwrite=args.force)
+    except FileExistsError as e:
+        raise SystemExit(f"{e} (use --force to overwrite)")
+    _log(f"Layout written: {path}")
+    return 0
+
+
+def cmd_golden(args: argparse.Namespace) -> int:
+    cases = golden.build_corpus(args.templates_dir, args.sample_dir, args.golden_dir)
+    if args.case:
+        cases = [c for c in cases if any(sel in c["id"] for sel in args.case)]
+    try:
+        report = golden.run_harness(
+            cases,
+            paths=args.path or None,
+            golden_dir=args.golden_dir,
+            update=args.update,
+            log=_log,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.verbose:
+        for result in report["results"]:
+            _log(f"{'ok  ' if result['ok'] else 'FAIL'} {result['case']} ({result['path']}): {golden.format_metrics(result)}")
+    _log(golden.format_summary(report))
+    return 1 if report["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="certify", description="Certify: Certificate Generator (CLI)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("generate", help="Generate certificates for an event on this machine")
+    _add_event_args(p)
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("validate", help="Check participants.csv for empty, duplicate and overlong names")
+    p.add_argument("event", help="Event name or folder under events/")
+    p.add_argument("--template", help="Template image path (default: the one saved in event.json)")
+    p.add_argument("--signatory", action="append", help="'Name;Position[;signature.png]' (repeat up to 3)")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("draft", help="Render a reduced-resolution contact sheet of all names for layout checks")
+    p.add_argument("event", help="Event name or folder under events/")
+    p.add_argument("--template", help="Template image path (default: the one saved in event.json)")
+    p.add_argument("--signatory", action="append", help="'Name;Position[;signature.png]' (repeat up to 3)")
+    p.add_argument("--scale", type=float, default=DEFAULT_DRAFT_SCALE, help="Fraction of template resolution")
+    p.add_argument("--columns", type=int, default=DEFAULT_COLUMNS)
+    p.add_argument("--per-sheet", type=int, default=DEFAULT_PER_SHEET)
+    p.set_defaults(func=cmd_draft)
+
+    p = sub.add_parser("impose", help="Tile certificates 2-up/4-up onto print sheets with crop marks in one PDF")
+    p.add_argument("event", help="Event name or folder under events/")
+    p.add_argument("--template", help="Template image path (default: the one saved in event.json)")
+    p.add_argument("--signatory", action="append", help="'Name;Position[;signature.png]' (repeat up to 3)")
+    p.add_argument("--sheet", choices=sorted(SHEET_SIZES_MM), default="A4")
+    p.add_argument("--up", type=int, default=2, help="Certificates per sheet")
+    p.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    p.add_argument("--no-crop-marks", action="store_true")
+    p.add_argument("--output", help="Output PDF (default: events/<event>/print/<timestamp>_<sheet>_<up>up.pdf)")
+    p.set_defaults(func=cmd_impose)
+
+    p = sub.add_parser("spool", help="Split an event into shards for spool workers and coordinate the run")
+    _add_event_args(p)
+    p.add_argument("--shard-size", type=int, default=spool.DEFAULT_SHARD_SIZE)
+    p.add_argument("--workers", type=int, default=0, help="Local worker processes to start")
+    p.add_argument("--lease-timeout", type=float, default=spool.DEFAULT_LEASE_TIMEOUT)
+    p.add_argument("--no-wait", action="store_true", help="Only create the spool; do not coordinate")
+    p.set_defaults(func=cmd_spool)
+
+    p = sub.add_parser("worker", help="Claim and render shards from a spool directory")
+    p.add_argument("spool_dir")
+    p.add_argument("--once", action="store_true", help="Exit when no pending shard is left")
+    p.set_defaults(func=cmd_worker)
+
+    p = sub.add_parser("coordinate", help="Re-lease stalled shards and assemble a spool run")
+    p.add_argument("spool_dir")
+    p.add_argument("--lease-timeout", type=float, default=spool.DEFAULT_LEASE_TIMEOUT)
+    p.set_defaults(func=cmd_coordinate)
+
+    p = sub.add_parser("watch", help="Watch events/ and generate certificates for newly added participants")
+    p.add_argument("--events-dir", default=EVENTS_DIR)
+    p.add_argument("--template", help="Default template for events without one in event.json")
+    p.add_argument("--signatory", action="append", help="Default signatory 'Name;Position[;signature.png]'")
+    p.add_argument("--debounce", type=float, default=2.0, help="Seconds of quiet before rendering a burst of changes")
+    p.add_argument("--poll-interval", type=float, default=1.0)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("serve", help="Render certificates on demand over HTTP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--events-dir", default=EVENTS_DIR)
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent renders")
+    p.add_argument("--cache-mb", type=float, default=DEFAULT_PDF_CACHE_BYTES / (1024 * 1024), help="Rendered-PDF cache size")
+    p.add_argument("--allow-unlisted", action="store_true", help="Render names not in participants.csv")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("retention", help="Remove old certificate runs/backups and deduplicate identical files")
+    p.add_argument("event", nargs="?", help="Only this event (default: all events)")
+    p.add_argument("--events-dir", default=EVENTS_DIR)
+    p.add_argument("--keep-last", type=int, help="Keep the newest N runs per event")
+    p.add_argument("--max-mb", type=float, help="Maximum size of runs + backups per event")
+    p.add_argument("--no-dedupe", action="store_true", help="Do not hard-link identical files across runs")
+    p.add_argument("--apply", action="store_true", help="Make the changes (default is a dry run)")
+    p.add_argument("--interval", type=float, default=0, help="Keep running and apply each event's policy every N seconds")
+    p.set_defaults(func=cmd_retention)
+
+    p = sub.add_parser("layout-init", help="Write the default layout file beside a template for editing")
+    p.add_argument("template", help="Template image path")
+    p.add_argument("--force", action="store_true", help="Overwrite an existing layout file")
+    p.set_defaults(func=cmd_layout_init)
+
+    p = sub.add_parser("verify", help="Look up a certificate by ID, participant name or PDF file")
+    p.add_argument("query", help="Certificate ID, participant name, or path to a PDF")
+    p.add_argument("--db", default=VERIFY_DB)
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("golden", help="Check every render path against the committed golden images")
+    p.add_argument("--path", action="append", choices=list(golden.RENDER_PATHS), help="Only this render path (repeatable)")
+    p.add_argument("--case", action="append", help="Only cases whose id contains this text (repeatable)")
+    p.add_argument("--golden-dir", default=golden.GOLDEN_DIR)
+    p.add_argument("--templates-dir", default=golden.TEMPLATES_DIR)
+    p.add_argument("--sample-dir", default=golden.SAMPLE_DATA_DIR)
+    p.add_argument("--update", action="store_true", help="Rewrite the golden images from the current renderer (review the diffs first)")
+    p.add_argument("-v", "--verbose", action="store_true", help="Print the metrics of every comparison")
+    p.set_defaults(func=cmd_golden)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ensure_folders()
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,3 +10,32 @@ def ensure_folders() -> None:
     os.makedirs(EVENTS_DIR, exist_ok=True)
     os.makedirs(TEMPLATES_DIR, exist_ok=True)
     os.makedirs(BACKUP_DIR, exist_ok=True)
+
+CACHE_DIR = "cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+VERIFY_DB = "verification.db"
+
+# Retention defaults; an event can override them with "retention" in its event.json.
+# None means unlimited.
+RETENTION_KEEP_LAST = None
+RETENTION_MAX_BYTES = None
+RETENTION_MIN_AGE = 10 * 60  # seconds before a run is considered finished
+
+FONTS_DIR = "fonts"
+PRIMARY_FONT = "Roboto-VariableFont_wdth,wght.ttf"
+# Tried in order for characters the bundled fonts lack; missing paths are skipped.
+FALLBACK_FONT_PATHS = [
+    r"%WINDIR%\Fonts\segoeui.ttf",
+    r"%WINDIR%\Fonts\seguisym.ttf",
+    r"%WINDIR%\Fonts\msyh.ttc",
+    r"%WINDIR%\Fonts\malgun.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+]
+
+SAMPLE_DATA_DIR = "sample_data"
+# Reference renders for `certify golden`; mismatches are written to GOLDEN_DIR/diffs/.
+GOLDEN_DIR = "golden"
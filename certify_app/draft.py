@@ -0,0 +1,83 @@
+import os
+import time
+from typing import List, Dict, Optional, Callable, Any, Iterable
+
+from PIL import Image, ImageDraw
+
+from .cache import RenderCache, get_default_cache
+from .certificate import render_certificate
+
+DEFAULT_DRAFT_SCALE = 0.25
+DEFAULT_COLUMNS = 6
+DEFAULT_PER_SHEET = 60
+SHEET_GAP = 12
+LABEL_HEIGHT = 18
+
+
+def render_contact_sheets(
+    names: Iterable[Any],
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    output_dir: str,
+    signatories: List[Dict],
+    scale: float = DEFAULT_DRAFT_SCALE,
+    columns: int = DEFAULT_COLUMNS,
+    per_sheet: int = DEFAULT_PER_SHEET,
+    log: Optional[Callable[[str], None]] = None,
+    cache: Optional[RenderCache] = None,
+    field_texts: Optional[Dict[str, List[str]]] = None,
+    first_line: int = 2,
+) -> Dict[str, Any]:
+    # field_texts: per-participant layout texts, each list parallel to names (as in generate_batch);
+    # first_line: CSV line number of names[0] (the header is line 1), for the tile labels
+    log = log or (lambda _msg: None)
+    cache = cache if cache is not None else get_default_cache()
+    columns = max(1, int(columns))
+    per_sheet = max(columns, int(per_sheet))
+    os.makedirs(output_dir, exist_ok=True)
+
+    field_texts = field_texts or {}
+    clean = []
+    for i, raw in enumerate(names):
+        missing = raw is None or (isinstance(raw, float) and raw != raw)
+        name = "" if missing else str(raw).strip()
+        if name:
+            clean.append((first_line + i, name, {key: texts[i] for key, texts in field_texts.items()}))
+
+    started = time.perf_counter()
+    sheets: List[str] = []
+    for start in range(0, len(clean), per_sheet):
+        chunk = clean[start:start + per_sheet]
+        tiles = [
+            render_certificate(name, event_title, event_org, event_dates, template_path, signatories,
+                               cache=cache, scale=scale, fields=fields)
+            for _line, name, fields in chunk
+        ]
+        tile_w, tile_h = tiles[0].size
+        rows = (len(tiles) + columns - 1) // columns
+        cell_w = tile_w + SHEET_GAP
+        cell_h = tile_h + LABEL_HEIGHT + SHEET_GAP
+        sheet = Image.new("RGB", (columns * cell_w + SHEET_GAP, rows * cell_h + SHEET_GAP), "#D0D7E2")
+        draw = ImageDraw.Draw(sheet)
+
+        for i, ((line, name, _fields), tile) in enumerate(zip(chunk, tiles)):
+            x = SHEET_GAP + (i % columns) * cell_w
+            y = SHEET_GAP + (i // columns) * cell_h
+            sheet.paste(tile, (x, y))
+            # CSV line number + name under the tile, so layout problems can be traced back to the CSV
+            draw.text((x, y + tile_h + 2), f"{line}. {name}"[:80], fill="black")
+
+        # JPEG: several times faster to encode than PNG at contact-sheet sizes
+        path = os.path.join(output_dir, f"contact_sheet_{len(sheets) + 1:03d}.jpg")
+        sheet.save(path, "JPEG", quality=85)
+        sheets.append(path)
+        log(f"Draft sheet: {path} ({len(chunk)} names)")
+
+    return {
+        "names": len(clean),
+        "sheets": sheets,
+        "scale": scale,
+        "seconds": time.perf_counter() - started,
+    }
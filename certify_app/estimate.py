@@ -0,0 +1,134 @@
+import os
+import time
+import shutil
+import tempfile
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+
+from .cache import RenderCache, get_default_cache
+from .certificate import export_certificate, render_certificate
+from .verification import new_certificate_id, sha256_file
+
+DEFAULT_SAMPLE_SIZE = 9
+
+
+def stratified_sample(names: List[str], size: int = DEFAULT_SAMPLE_SIZE) -> List[int]:
+    # Indices of the shortest, longest and median-length names (a third each).
+    if len(names) <= size:
+        return list(range(len(names)))
+    order = np.argsort(np.fromiter((len(n) for n in names), dtype=np.int64, count=len(names)), kind="stable")
+    per = max(1, size // 3)
+    mid = len(order) // 2
+    picked = list(order[:per]) + list(order[mid - per // 2: mid - per // 2 + per]) + list(order[-per:])
+    return sorted(set(int(i) for i in picked), key=lambda i: len(names[i]))
+
+
+def estimate_batch(
+    names: List[str],
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    signatories: List[Dict],
+    formats: Optional[List[Dict[str, Any]]] = None,
+    print_ids: bool = False,
+    workers: int = 1,
+    backup: bool = True,
+    output_dir: Optional[str] = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    cache: Optional[RenderCache] = None,
+) -> Dict[str, Any]:
+    cache = cache if cache is not None else get_default_cache()
+    names = [n for n in names if n]
+    workers = max(1, int(workers))
+    if not names:
+        raise ValueError("No names to estimate.")
+
+    picked = stratified_sample(names, sample_size)
+
+    # One-off cost before the first certificate (base layer, fonts); near zero once cached.
+    started = time.perf_counter()
+    render_certificate(names[picked[0]], event_title, event_org, event_dates, template_path, signatories, cache=cache)
+    setup_seconds = time.perf_counter() - started
+    lengths, seconds, sizes = [], [], []
+    with tempfile.TemporaryDirectory(prefix="certify_estimate_") as tmp:
+        for i, idx in enumerate(picked):
+            name = names[idx]
+            t0 = time.perf_counter()
+            paths = export_certificate(
+                participant_name=name,
+                event_title=event_title,
+                event_org=event_org,
+                event_dates=event_dates,
+                template_path=template_path,
+                output_dir=tmp,
+                signatories=signatories,
+                cache=cache,
+                certificate_id=new_certificate_id() if print_ids else None,
+                formats=formats,
+                file_stem=f"sample_{i}",
+                thumbnail=True,
+            )
+            for path in paths:
+                sha256_file(path)  # verification index hashes every output file
+            seconds.append(time.perf_counter() - t0)
+            sizes.append(sum(os.path.getsize(p) for p in paths))
+            lengths.append(len(name))
+
+    # Per-name cost interpolated on name length between the sampled strata.
+    all_lengths = np.fromiter((len(n) for n in names), dtype=np.float64, count=len(names))
+    per_name_seconds = np.interp(all_lengths, lengths, seconds)
+    per_name_bytes = np.interp(all_lengths, lengths, sizes)
+
+    render_seconds = float(per_name_seconds.sum())
+    effective = min(workers, os.cpu_count() or 1, len(names))
+    wall_seconds = setup_seconds + render_seconds / effective
+    output_bytes = int(per_name_bytes.sum())
+    total_bytes = output_bytes * (2 if backup else 1)
+
+    free_bytes = None
+    if output_dir:
+        probe = output_dir
+        while probe and not os.path.exists(probe):
+            probe = os.path.dirname(probe)
+        free_bytes = shutil.disk_usage(probe or ".").free
+
+    return {
+        "names": len(names),
+        "sampled": len(picked),
+        "workers": workers,
+        "effective_workers": effective,
+        "setup_seconds": setup_seconds,
+        "seconds_per_name": render_seconds / len(names),
+        "wall_seconds": wall_seconds,
+        "output_bytes": output_bytes,
+        "backup_bytes": total_bytes - output_bytes,
+        "total_bytes": total_bytes,
+        "free_bytes": free_bytes,
+        "fits": free_bytes is None or total_bytes < free_bytes,
+    }
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m {s:02d}s" if h else (f"{m}m {s:02d}s" if m else f"{s}s")
+
+
+def format_estimate(est: Dict[str, Any]) -> str:
+    mb = 1024 * 1024
+    text = (
+        f"Estimate for {est['names']} certificates (sampled {est['sampled']}): "
+        f"~{_duration(est['wall_seconds'])} with {est['effective_workers']} worker(s) "
+        f"({est['seconds_per_name'] * 1000:.0f} ms each), "
+        f"~{est['output_bytes'] / mb:.1f} MB output"
+    )
+    if est["backup_bytes"]:
+        text += f" + {est['backup_bytes'] / mb:.1f} MB backup"
+    if est["free_bytes"] is not None:
+        text += f", {est['free_bytes'] / mb:.0f} MB free"
+        if not est["fits"]:
+            text += " (NOT ENOUGH DISK SPACE)"
+    return text
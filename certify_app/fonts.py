@@ -0,0 +1,225 @@
+import os
+import struct
+import hashlib
+import threading
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+from PIL import ImageFont
+
+from .config import FONTS_DIR, PRIMARY_FONT, FALLBACK_FONT_PATHS
+from .helpers import resource_path
+
+try:
+    from fontTools.ttLib import TTFont
+except ImportError:  # optional; the built-in cmap reader covers formats 4 and 12
+    TTFont = None
+
+_FONT_LOCK = threading.Lock()
+
+
+class Coverage:
+    # Sorted, merged codepoint ranges; lookups are a single bisect.
+    def __init__(self, codepoints):
+        starts: List[int] = []
+        ends: List[int] = []
+        for cp in sorted(codepoints):
+            if ends and cp == ends[-1] + 1:
+                ends[-1] = cp
+            else:
+                starts.append(cp)
+                ends.append(cp)
+        self.starts = starts
+        self.ends = ends
+
+    def __contains__(self, cp: int) -> bool:
+        i = bisect_right(self.starts, cp) - 1
+        return i >= 0 and cp <= self.ends[i]
+
+    def __len__(self) -> int:
+        return sum(e - s + 1 for s, e in zip(self.starts, self.ends))
+
+
+def _read_cmap(path: str) -> List[int]:
+    # Minimal sfnt cmap reader (Unicode subtables, formats 4 and 12).
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == b"ttcf":
+        (offset,) = struct.unpack(">I", data[12:16])  # first face of a collection
+        data_offset = offset
+    else:
+        data_offset = 0
+    num_tables = struct.unpack(">H", data[data_offset + 4:data_offset + 6])[0]
+    cmap_offset = None
+    for i in range(num_tables):
+        rec = data_offset + 12 + 16 * i
+        tag, _checksum, offset, _length = struct.unpack(">4sIII", data[rec:rec + 16])
+        if tag == b"cmap":
+            cmap_offset = offset
+            break
+    if cmap_offset is None:
+        return []
+
+    (_version, count) = struct.unpack(">HH", data[cmap_offset:cmap_offset + 4])
+    subtables = []
+    for i in range(count):
+        rec = cmap_offset + 4 + 8 * i
+        platform, encoding, offset = struct.unpack(">HHI", data[rec:rec + 8])
+        if platform == 0 or (platform == 3 and encoding in (1, 10)):
+            subtables.append(cmap_offset + offset)
+
+    codepoints = set()
+    for sub in subtables:
+        fmt = struct.unpack(">H", data[sub:sub + 2])[0]
+        if fmt == 4:
+            seg_x2 = struct.unpack(">H", data[sub + 6:sub + 8])[0]
+            segs = seg_x2 // 2
+            ends = struct.unpack(f">{segs}H", data[sub + 14:sub + 14 + seg_x2])
+            starts_at = sub + 16 + seg_x2
+            starts = struct.unpack(f">{segs}H", data[starts_at:starts_at + seg_x2])
+            deltas = struct.unpack(f">{segs}h", data[starts_at + seg_x2:starts_at + 2 * seg_x2])
+            ro_at = starts_at + 2 * seg_x2
+            range_offsets = struct.unpack(f">{segs}H", data[ro_at:ro_at + seg_x2])
+            for i in range(segs):
+                start, end = starts[i], ends[i]
+                if start == 0xFFFF:
+                    continue
+                for cp in range(start, end + 1):
+                    if range_offsets[i] == 0:
+                        glyph = (cp + deltas[i]) & 0xFFFF
+                    else:
+                        at = ro_at + 2 * i + range_offsets[i] + 2 * (cp - start)
+                        glyph = struct.unpack(">H", data[at:at + 2])[0]
+                        glyph = (glyph + deltas[i]) & 0xFFFF if glyph else 0
+                    if glyph:
+                        codepoints.add(cp)
+        elif fmt == 12:
+            n_groups = struct.unpack(">I", data[sub + 12:sub + 16])[0]
+            for g in range(n_groups):
+                at = sub + 16 + 12 * g
+                start, end, first_glyph = struct.unpack(">III", data[at:at + 12])
+                codepoints.update(range(start if first_glyph else start + 1, end + 1))
+    return sorted(codepoints)
+
+
+@lru_cache(maxsize=32)
+def _coverage(path: str, mtime: float) -> Coverage:
+    if TTFont is not None:
+        font = TTFont(path, lazy=True, fontNumber=0)
+        try:
+            return Coverage(font.getBestCmap() or {})
+        finally:
+            font.close()
+    return Coverage(_read_cmap(path))
+
+
+def get_coverage(path: str) -> Coverage:
+    return _coverage(path, os.path.getmtime(path))
+
+
+@lru_cache(maxsize=1)
+def font_chain() -> Tuple[str, ...]:
+    # Primary font first, then any other fonts shipped in fonts/, then system fallbacks.
+    primary = resource_path(os.path.join(FONTS_DIR, PRIMARY_FONT))
+    chain = [primary] if os.path.exists(primary) else []
+    fonts_dir = resource_path(FONTS_DIR)
+    if os.path.isdir(fonts_dir):
+        for name in sorted(os.listdir(fonts_dir)):
+            path = os.path.join(fonts_dir, name)
+            if name.lower().endswith((".ttf", ".otf", ".ttc")) and path not in chain:
+                chain.append(path)
+    for path in FALLBACK_FONT_PATHS:
+        path = os.path.expandvars(path)
+        if os.path.exists(path) and path not in chain:
+            chain.append(path)
+    return tuple(chain)
+
+
+@lru_cache(maxsize=1)
+def _chain_coverages() -> Tuple[Coverage, ...]:
+    return tuple(get_coverage(p) for p in font_chain())
+
+
+def reload_fonts() -> None:
+    # Call after adding fonts to fonts/ in a running process.
+    for fn in (font_chain, _chain_coverages, _coverage, get_sized_font):
+        fn.cache_clear()
+
+
+def chain_digest() -> str:
+    h = hashlib.sha1()
+    for path in font_chain():
+        st = os.stat(path)
+        h.update(f"{path}|{st.st_size}|{st.st_mtime}".encode())
+    return h.hexdigest()[:12]
+
+
+@lru_cache(maxsize=256)
+def get_sized_font(path: Optional[str], size: int, instance: Optional[str] = None):
+    # One FreeTypeFont per (font, size, named instance), shared by every render in the process.
+    if not path:
+        return ImageFont.load_default()
+    with _FONT_LOCK:
+        font = ImageFont.truetype(path, size)
+        if instance:
+            try:
+                font.set_variation_by_name(instance)
+            except (OSError, ValueError):
+                pass  # static font or unknown instance: keep the default design
+    return font
+
+
+def get_font(size: int, instance: Optional[str] = None):
+    chain = font_chain()
+    try:
+        return get_sized_font(chain[0] if chain else None, size, instance)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _follows_previous(ch: str) -> bool:
+    # Spaces and combining marks stay in the surrounding run's font.
+    return ch.isspace() or unicodedata.category(ch).startswith("M")
+
+
+def split_runs(text: str) -> List[Tuple[Optional[str], str]]:
+    # [(font_path, substring), ...] using the first font in the chain that has each character.
+    chain = font_chain()
+    coverages = _chain_coverages()
+    runs: List[Tuple[Optional[str], str]] = []
+    for ch in text:
+        if runs and _follows_previous(ch):
+            runs[-1] = (runs[-1][0], runs[-1][1] + ch)
+            continue
+        cp = ord(ch)
+        path = next((p for p, cov in zip(chain, coverages) if cp in cov), chain[0] if chain else None)
+        if runs and runs[-1][0] == path:
+            runs[-1] = (path, runs[-1][1] + ch)
+        else:
+            runs.append((path, ch))
+    return runs
+
+
+def font_runs(text: str, size: int, instance: Optional[str] = None):
+    out = []
+    for path, chunk in split_runs(text):
+        try:
+            out.append((get_sized_font(path, size, instance), chunk))
+        except OSError:
+            out.append((ImageFont.load_default(), chunk))
+    return out
+
+
+def missing_characters(text: str) -> str:
+    chain = font_chain()
+    coverages = _chain_coverages()
+    return "".join(sorted(
+        ch for ch in set(text)
+        if not _follows_previous(ch) and not any(ord(ch) in cov for cov in coverages)
+    ))
+
+
+def font_report() -> Dict[str, int]:
+    return {os.path.basename(p): len(get_coverage(p)) for p in font_chain()}
@@ -0,0 +1,206 @@
+import os
+import json
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any
+
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex, QSortFilterProxyModel,
+    QSize, QUrl, pyqtSignal,
+)
+from PyQt5.QtGui import QImage, QPixmap, QColor, QDesktopServices
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QLineEdit, QListView, QLabel
+
+from .outputs import THUMB_DIR, THUMB_WIDTH, PIL_FORMATS
+
+THUMB_HEIGHT = int(THUMB_WIDTH / 1.414) + 1
+PIXMAP_CACHE_SLOTS = 600
+
+
+def list_runs(event_path: str) -> List[str]:
+    root = os.path.join(event_path, "certificates")
+    if not os.path.isdir(root):
+        return []
+    return sorted((d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))), reverse=True)
+
+
+def load_run_entries(run_dir: str) -> List[Dict[str, Any]]:
+    # One entry per certificate in the run; only names and paths, no image data.
+    thumb_dir = os.path.join(run_dir, THUMB_DIR)
+    names: Dict[str, str] = {}
+    thumbs = set()
+    if os.path.isdir(thumb_dir):
+        for entry in os.scandir(thumb_dir):
+            if entry.name.startswith("names-") and entry.name.endswith(".json"):
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        names.update(json.load(f))
+                except Exception:
+                    pass
+            elif entry.name.endswith(".jpg"):
+                thumbs.add(entry.name[:-4])
+
+    outputs: Dict[str, str] = {}
+    exts = tuple(f".{ext}" for ext in PIL_FORMATS)
+    for entry in os.scandir(run_dir):
+        stem, ext = os.path.splitext(entry.name)
+        if ext.lower() in exts and (stem not in outputs or ext.lower() == ".pdf"):
+            outputs[stem] = entry.path
+
+    return [
+        {
+            "stem": stem,
+            "name": names.get(stem, stem.replace("_", " ")),
+            "file": path,
+            "thumb": os.path.join(thumb_dir, f"{stem}.jpg") if stem in thumbs else None,
+        }
+        for stem, path in sorted(outputs.items(), key=lambda kv: names.get(kv[0], kv[0]).casefold())
+    ]
+
+
+class _ThumbSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class _ThumbJob(QRunnable):
+    def __init__(self, path: str, signals: _ThumbSignals):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        # QImage (not QPixmap) is safe to decode off the GUI thread
+        self.signals.loaded.emit(self.path, QImage(self.path))
+
+
+class ThumbnailModel(QAbstractListModel):
+    # Decoration is only requested for rows the view is painting, so thumbnails are decoded
+    # on demand in a background pool and kept in a bounded LRU of pixmaps.
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.entries: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._pixmaps: "OrderedDict[str, QPixmap]" = OrderedDict()
+        self._pending = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._signals = _ThumbSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._placeholder = QPixmap(THUMB_WIDTH, THUMB_HEIGHT)
+        self._placeholder.fill(QColor("#E5E7EB"))
+
+    def set_entries(self, entries: List[Dict[str, Any]]) -> None:
+        self.beginResetModel()
+        self.entries = entries
+        self._rows = {e["thumb"]: i for i, e in enumerate(entries) if e["thumb"]}
+        self._pixmaps.clear()
+        self._pending.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry["name"]
+        if role == Qt.ToolTipRole:
+            return entry["file"]
+        if role == Qt.UserRole:
+            return entry["file"]
+        if role == Qt.DecorationRole:
+            path = entry["thumb"]
+            if not path:
+                return self._placeholder
+            pixmap = self._pixmaps.get(path)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(path)
+                return pixmap
+            if path not in self._pending:
+                self._pending.add(path)
+                self._pool.start(_ThumbJob(path, self._signals))
+            return self._placeholder
+        return None
+
+    def _on_loaded(self, path: str, image: QImage) -> None:
+        self._pending.discard(path)
+        row = self._rows.get(path)
+        if row is None or image.isNull():
+            return
+        self._pixmaps[path] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > PIXMAP_CACHE_SLOTS:
+            self._pixmaps.popitem(last=False)
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+    def shutdown(self) -> None:
+        self._pool.clear()
+        self._pool.waitForDone(2000)
+
+
+class GalleryDialog(QDialog):
+    def __init__(self, event_path: str, parent=None):
+        super().__init__(parent)
+        self.event_path = event_path
+        self.setWindowTitle(f"Gallery: {os.path.basename(event_path)}")
+        self.resize(1100, 760)
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Run:"))
+        self.run_combo = QComboBox()
+        self.run_combo.addItems(list_runs(event_path))
+        self.run_combo.currentIndexChanged.connect(lambda: self.load_run())
+        top.addWidget(self.run_combo, 1)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by name")
+        top.addWidget(self.search_input, 2)
+        self.count_label = QLabel("")
+        top.addWidget(self.count_label)
+        layout.addLayout(top)
+
+        self.model = ThumbnailModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.search_input.textChanged.connect(self._apply_filter)
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.IconMode)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setMovement(QListView.Static)
+        self.view.setIconSize(QSize(THUMB_WIDTH, THUMB_HEIGHT))
+        self.view.setGridSize(QSize(THUMB_WIDTH + 16, THUMB_HEIGHT + 40))
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setBatchSize(200)
+        self.view.setWordWrap(True)
+        self.view.setModel(self.proxy)
+        self.view.doubleClicked.connect(self._open_file)
+        layout.addWidget(self.view)
+        layout.addWidget(QLabel("Double-click a certificate to open it."))
+
+        self.load_run()
+
+    def load_run(self) -> None:
+        run = self.run_combo.currentText()
+        entries = load_run_entries(os.path.join(self.event_path, "certificates", run)) if run else []
+        self.model.set_entries(entries)
+        self._update_count()
+
+    def _apply_filter(self, text: str) -> None:
+        self.proxy.setFilterFixedString(text.strip())
+        self._update_count()
+
+    def _update_count(self) -> None:
+        self.count_label.setText(f"{self.proxy.rowCount()} / {self.model.rowCount()}")
+
+    def _open_file(self, index: QModelIndex) -> None:
+        path = index.data(Qt.UserRole)
+        if path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(path)))
+
+    def closeEvent(self, event):
+        self.model.shutdown()
+        super().closeEvent(event)
@@ -0,0 +1,332 @@
+import os
+import time
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable, Any, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from .config import TEMPLATES_DIR, ALLOWED_TEMPLATE_EXTS, GOLDEN_DIR, SAMPLE_DATA_DIR
+from .cache import RenderCache
+from .certificate import render_certificate, export_certificate, clear_base_layers
+from .signatures import clear_signature_cache
+
+# Equivalence harness: every render path must reproduce the golden images committed in
+# GOLDEN_DIR. Those were rendered by the original single-pass generate_certificate (before the
+# render cache, layouts, font fallback and drafts), so drift from the original output fails the
+# check even when every optimised path drifts the same way. Drafts draw text at the scaled font
+# size, so they cannot match a shrunken full render; they are checked against their own goldens
+# in GOLDEN_DIR/draft, rendered at DRAFT_SCALE. Images are compared per pixel (channel difference
+# above PIXEL_TOLERANCE) and perceptually (SSIM over SSIM_BLOCK x SSIM_BLOCK blocks; a shifted or
+# missing element drags down the worst block even when the mean barely moves).
+#
+# The corpus only uses what the original renderer could draw: no certificate IDs, and signatures
+# from GOLDEN_DIR/signatures, which are already trimmed and keyed. Raw uploads are rendered
+# differently on purpose since signatures are trimmed and white-keyed before placement.
+
+PIXEL_TOLERANCE = 8
+SSIM_BLOCK = 8
+DRAFT_SCALE = 0.5
+SIGNATURES_SUBDIR = "signatures"
+DRAFT_SUBDIR = "draft"
+
+# golden set -> (subdir of GOLDEN_DIR, render scale). Every path is held to the same limits.
+GOLDEN_SETS: Dict[str, Tuple[str, float]] = {
+    "exact": ("", 1.0),
+    "draft": (DRAFT_SUBDIR, DRAFT_SCALE),
+}
+LIMITS: Dict[str, float] = {"changed": 0.0005, "ssim": 0.999, "min_ssim": 0.95}
+
+EDGE_NAMES = [
+    "Maria Clara de los Santos-Villanueva Jr.",
+    "Zoë Ångström-Núñez",
+    "Li",
+]
+
+
+def _templates(templates_dir: str) -> List[str]:
+    if not os.path.isdir(templates_dir):
+        return []
+    return [
+        os.path.join(templates_dir, f) for f in sorted(os.listdir(templates_dir))
+        if f.lower().endswith(ALLOWED_TEMPLATE_EXTS)
+    ]
+
+
+def build_corpus(templates_dir: str = TEMPLATES_DIR, sample_dir: str = SAMPLE_DATA_DIR,
+                 golden_dir: str = GOLDEN_DIR, names_per_combo: int = 1) -> List[Dict[str, Any]]:
+    # Names, event details and signatories come from sample_data/; every template is paired with
+    # 1, 2 and 3 signatories, with and without signature images.
+    names: List[str] = []
+    event = {"event_title": "Golden Workshop", "event_org": "Certify", "event_dates": "January 1, 2025"}
+    people: List[Tuple[str, str]] = []
+    participants_csv = os.path.join(sample_dir, "participants.csv")
+    if os.path.exists(participants_csv):
+        names.extend(pd.read_csv(participants_csv)["name"].dropna().astype(str).tolist())
+    all_in_one = os.path.join(sample_dir, "sample_all_in_one.csv")
+    if os.path.exists(all_in_one):
+        df = pd.read_csv(all_in_one)
+        names.extend(df["name"].dropna().astype(str).tolist())
+        first = df.iloc[0]
+        event = {
+            "event_title": str(first["event_name"]),
+            "event_org": str(first["organization"]),
+            "event_dates": str(first["start_date"]),
+        }
+        people = list(dict.fromkeys(zip(df["signatory_name"].astype(str), df["signatory_position"].astype(str))))
+    names = EDGE_NAMES + [n for n in dict.fromkeys(n.strip() for n in names) if n and n not in EDGE_NAMES]
+
+    signatures_dir = os.path.join(golden_dir, SIGNATURES_SUBDIR)
+    signatures = sorted(
+        os.path.join(signatures_dir, f) for f in os.listdir(signatures_dir) if f.lower().endswith(".png")
+    ) if os.path.isdir(signatures_dir) else []
+    people = (people + [("Jose Rizal", "Chairperson"), ("Gabriela Silang", "Dean"), ("Andres Bonifacio", "Registrar")])[:3]
+
+    def signatory(i: int, with_image: bool) -> Dict[str, Any]:
+        name, position = people[i]
+        path = signatures[i % len(signatures)] if with_image and signatures else None
+        return {"name": name, "position": position, "signature_path": path}
+
+    combos = [
+        [signatory(0, True)],
+        [signatory(0, True), signatory(1, False)],
+        [signatory(i, True) for i in range(3)],
+    ]
+
+    cases = []
+    for template in _templates(templates_dir):
+        stem = os.path.splitext(os.path.basename(template))[0]
+        for sigs in combos:
+            for _ in range(names_per_combo):
+                i = len(cases)
+                cases.append(dict(
+                    event,
+                    id=f"{stem}-{len(sigs)}sig-{i:02d}",
+                    name=names[i % len(names)],
+                    template_path=template,
+                    signatories=sigs,
+                ))
+    return cases
+
+
+def _reset_caches() -> None:
+    clear_base_layers()
+    clear_signature_cache()
+
+
+def _render(case: Dict[str, Any], cache: Optional[RenderCache] = None, scale: float = 1.0) -> Image.Image:
+    return render_certificate(case["name"], case["event_title"], case["event_org"], case["event_dates"],
+                              case["template_path"], case["signatories"], cache=cache, scale=scale)
+
+
+# Each path yields (case, image) for every case; they all start from cold in-process caches.
+def _path_memory(cases, workdir):
+    _reset_caches()
+    for case in cases:
+        yield case, _render(case)
+
+
+def _path_disk_cache(cases, workdir):
+    cache = RenderCache(os.path.join(workdir, "cache"))
+    for case in cases:
+        _reset_caches()
+        _render(case, cache=cache)  # populate
+        _reset_caches()
+        yield case, _render(case, cache=cache)
+
+
+def _path_threaded(cases, workdir):
+    _reset_caches()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield from zip(cases, pool.map(_render, cases))
+
+
+def _path_export(cases, workdir):
+    _reset_caches()
+    out_dir = os.path.join(workdir, "export")
+    for case in cases:
+        paths = export_certificate(case["name"], case["event_title"], case["event_org"], case["event_dates"],
+                                   case["template_path"], out_dir, case["signatories"],
+                                   formats=[{"format": "png"}], file_stem=case["id"])
+        with Image.open(paths[0]) as im:
+            yield case, im.convert("RGB")
+        os.remove(paths[0])
+
+
+def _path_draft(cases, workdir):
+    _reset_caches()
+    for case in cases:
+        yield case, _render(case, scale=DRAFT_SCALE)
+
+
+RENDER_PATHS: Dict[str, Tuple[Callable[..., Iterator], str]] = {
+    "memory": (_path_memory, "exact"),
+    "disk-cache": (_path_disk_cache, "exact"),
+    "threaded": (_path_threaded, "exact"),
+    "export": (_path_export, "exact"),
+    "draft": (_path_draft, "draft"),
+}
+
+
+def _block_ssim(a: np.ndarray, b: np.ndarray, block: int = SSIM_BLOCK) -> np.ndarray:
+    # SSIM per non-overlapping block of two grayscale float arrays, fully vectorized.
+    h, w = (a.shape[0] // block) * block, (a.shape[1] // block) * block
+    a = a[:h, :w].reshape(h // block, block, w // block, block)
+    b = b[:h, :w].reshape(h // block, block, w // block, block)
+    mu_a, mu_b = a.mean(axis=(1, 3)), b.mean(axis=(1, 3))
+    var_a, var_b = a.var(axis=(1, 3)), b.var(axis=(1, 3))
+    cov = (a * b).mean(axis=(1, 3)) - mu_a * mu_b
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    return ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+
+
+def _gray(arr: np.ndarray) -> np.ndarray:
+    return arr @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def compare_images(reference: Image.Image, candidate: Image.Image,
+                   pixel_tolerance: int = PIXEL_TOLERANCE) -> Dict[str, Any]:
+    if reference.size != candidate.size:
+        return {"size": (reference.size, candidate.size), "changed": 1.0, "max_diff": 255, "ssim": 0.0, "min_ssim": 0.0}
+    a = np.asarray(reference.convert("RGB"), dtype=np.int16)
+    b = np.asarray(candidate.convert("RGB"), dtype=np.int16)
+    diff = np.abs(a - b).max(axis=2)
+    ssim = _block_ssim(_gray(a.astype(np.float32)), _gray(b.astype(np.float32)))
+    return {
+        "changed": float((diff > pixel_tolerance).mean()),
+        "max_diff": int(diff.max()),
+        "ssim": float(ssim.mean()),
+        "min_ssim": float(ssim.min()),
+        "diff": diff,
+    }
+
+
+def within_tolerance(metrics: Dict[str, Any], limits: Dict[str, float]) -> bool:
+    return (
+        "size" not in metrics
+        and metrics["changed"] <= limits["changed"]
+        and metrics["ssim"] >= limits["ssim"]
+        and metrics["min_ssim"] >= limits["min_ssim"]
+    )
+
+
+def write_diff_image(reference: Image.Image, candidate: Image.Image, metrics: Dict[str, Any], path: str,
+                     pixel_tolerance: int = PIXEL_TOLERANCE) -> str:
+    # reference | candidate | faded reference with differing pixels in red
+    w, h = reference.size
+    sheet = Image.new("RGB", (w * 3, h), "white")
+    sheet.paste(reference.convert("RGB"), (0, 0))
+    sheet.paste(candidate.convert("RGB").resize(reference.size), (w, 0))
+    if "diff" in metrics:
+        faded = np.asarray(reference.convert("L"), dtype=np.uint8) // 4 + 191
+        heat = np.stack([faded, faded, faded], axis=2)
+        heat[metrics["diff"] > pixel_tolerance] = (220, 0, 0)
+        sheet.paste(Image.fromarray(heat, "RGB"), (w * 2, 0))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sheet.save(path, "PNG", compress_level=1)
+    return path
+
+
+def run_harness(
+    cases: List[Dict[str, Any]],
+    paths: Optional[List[str]] = None,
+    golden_dir: str = GOLDEN_DIR,
+    diff_dir: Optional[str] = None,
+    update: bool = False,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    # Checks every render path against the stored golden image of each case. A case without a
+    # golden image fails; update=True instead writes it (and rewrites existing ones) from the
+    # current renderer, which blesses whatever it draws, so review the diffs before committing.
+    log = log or (lambda _msg: None)
+    paths = list(RENDER_PATHS) if paths is None else paths
+    unknown = [p for p in paths if p not in RENDER_PATHS]
+    if unknown:
+        raise ValueError(f"Unknown render path(s): {', '.join(unknown)}")
+    if not cases:
+        raise ValueError("Empty corpus (no templates found?).")
+    diff_dir = diff_dir or os.path.join(golden_dir, "diffs")
+    started = time.perf_counter()
+
+    goldens: Dict[Tuple[str, str], Image.Image] = {}
+    results: List[Dict[str, Any]] = []
+
+    def record(case: Dict[str, Any], path: str, reference: Image.Image, candidate: Image.Image) -> None:
+        metrics = compare_images(reference, candidate)
+        ok = within_tolerance(metrics, LIMITS)
+        result = {k: v for k, v in metrics.items() if k != "diff"}
+        result.update({"case": case["id"], "path": path, "ok": ok})
+        if not ok:
+            result["diff_image"] = write_diff_image(
+                reference, candidate, metrics, os.path.join(diff_dir, f"{case['id']}.{path}.png"))
+            log(f"[FAILED] {case['id']} ({path}): {format_metrics(result)} -> {result['diff_image']}")
+        results.append(result)
+
+    sets = sorted({RENDER_PATHS[p][1] for p in paths})
+    if update:
+        _reset_caches()
+        for kind in sets:
+            subdir, scale = GOLDEN_SETS[kind]
+            os.makedirs(os.path.join(golden_dir, subdir), exist_ok=True)
+            for case in cases:
+                golden_path = os.path.join(golden_dir, subdir, f"{case['id']}.png")
+                _render(case, scale=scale).save(golden_path, "PNG", optimize=True)
+                log(f"Golden written: {golden_path}")
+        _reset_caches()
+
+    for kind in sets:
+        subdir, _scale = GOLDEN_SETS[kind]
+        for case in cases:
+            golden_path = os.path.join(golden_dir, subdir, f"{case['id']}.png")
+            if not os.path.exists(golden_path):
+                results.append({"case": case["id"], "path": kind, "ok": False, "missing": golden_path})
+                log(f"[FAILED] {case['id']}: no golden image at {golden_path} (run with --update to create it)")
+                continue
+            with Image.open(golden_path) as im:
+                goldens[(kind, case["id"])] = im.convert("RGB")
+
+    workdir = tempfile.mkdtemp(prefix="certify_golden_")
+    try:
+        for path in paths:
+            produce, kind = RENDER_PATHS[path]
+            checked = [case for case in cases if (kind, case["id"]) in goldens]
+            if not checked:
+                continue
+            t0 = time.perf_counter()
+            for case, image in produce(checked, workdir):
+                record(case, path, goldens[(kind, case["id"])], image)
+            log(f"{path}: {len(checked)} case(s) in {time.perf_counter() - t0:.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        _reset_caches()
+
+    failed = [r for r in results if not r["ok"]]
+    return {
+        "cases": len(cases),
+        "paths": paths,
+        "results": results,
+        "failed": len(failed),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def format_metrics(result: Dict[str, Any]) -> str:
+    if "missing" in result:
+        return f"no golden image at {result['missing']}"
+    if "size" in result:
+        return f"size {result['size'][1]} != {result['size'][0]}"
+    return (
+        f"{result['changed'] * 100:.3f}% px changed, max diff {result['max_diff']}, "
+        f"SSIM {result['ssim']:.4f} (worst block {result['min_ssim']:.3f})"
+    )
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    checks = len(report["results"])
+    return (
+        f"Golden check: {report['cases']} case(s), {checks} comparison(s), "
+        f"{report['failed']} failed in {report['seconds']:.1f}s"
+    )
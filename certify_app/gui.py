@@ -1,6 +1,5 @@
 # certify_app/gui.py
 import os
-import json
 from datetime import datetime
 from typing import List, Dict, Optional
 import inspect
@@ -8,13 +7,27 @@ import inspect
 import pandas as pd
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog,
-    QLabel, QLineEdit, QMessageBox, QTextEdit, QComboBox, QGroupBox, QScrollArea
+    QLabel, QLineEdit, QMessageBox, QTextEdit, QComboBox, QGroupBox, QScrollArea, QCheckBox
 )
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPixmap
 
 from .config import EVENTS_DIR, TEMPLATES_DIR, BACKUP_DIR, ALLOWED_TEMPLATE_EXTS
-from .helpers import sanitize_folder_name, load_event_metadata, parse_date_ymd, format_date_range
-from .certificate import generate_certificate
+from .helpers import (
+    sanitize_folder_name, load_event_metadata, parse_date_ymd, format_date_range, update_event_metadata
+)
+from .outputs import FORMAT_PRESETS, parse_formats
+from .batch import generate_batch, format_report, backup_output
+from .layout import layout_path_for
+from .preview import PreviewRenderer
+from .verification import verify as verify_certificate, describe as describe_certificate
+from .validation import validate_participants, has_issues, format_validation_report
+from .estimate import estimate_batch, format_estimate
+from .imposition import impose_certificates, IMPOSITION_PRESETS
+from .gallery import GalleryDialog, list_runs as gallery_runs
+from .profiling import stop_profiling
+from . import storage
+from . import retention
 
 
 MODERN_STYLE = """
@@ -28,6 +41,7 @@ QTextEdit { background: #FFFFFF; border-radius: 10px; padding: 10px; color: #000
 """
 
 IMG_FILTER = "Image Files (*.png *.jpg *.jpeg)"
+LOG_MAX_LINES = 5000
 
 
 class CertifyGUI(QWidget):
@@ -115,6 +129,34 @@ class CertifyGUI(QWidget):
         sign_group.setLayout(sign_layout)
         left_col.addWidget(sign_group)
 
+        storage_group = QGroupBox("Storage Cleanup")
+        storage_layout = QVBoxLayout()
+        self.keep_last_input = QLineEdit()
+        self.keep_last_input.setPlaceholderText("Keep last N runs (blank = all)")
+        storage_layout.addWidget(self.keep_last_input)
+        self.max_mb_input = QLineEdit()
+        self.max_mb_input.setPlaceholderText("Max MB per event (blank = no limit)")
+        storage_layout.addWidget(self.max_mb_input)
+
+        storage_buttons = QHBoxLayout()
+        self.btn_cleanup_preview = QPushButton("Preview Cleanup")
+        self.btn_cleanup_preview.clicked.connect(self._guard(lambda: self.cleanup_event(apply=False)))
+        storage_buttons.addWidget(self.btn_cleanup_preview)
+        self.btn_cleanup_apply = QPushButton("Apply Cleanup")
+        self.btn_cleanup_apply.clicked.connect(self._guard(lambda: self.cleanup_event(apply=True)))
+        storage_buttons.addWidget(self.btn_cleanup_apply)
+        storage_layout.addLayout(storage_buttons)
+
+        self.auto_cleanup_check = QCheckBox("Apply saved policies to all events every 15 min")
+        self.auto_cleanup_check.toggled.connect(self._guard(self.toggle_auto_cleanup))
+        storage_layout.addWidget(self.auto_cleanup_check)
+        self.cleanup_timer = QTimer(self)
+        self.cleanup_timer.setInterval(int(retention.DEFAULT_SCAN_INTERVAL * 1000))
+        self.cleanup_timer.timeout.connect(self._guard(self.run_auto_cleanup))
+
+        storage_group.setLayout(storage_layout)
+        left_col.addWidget(storage_group)
+
         left_col.addStretch()
 
         # ------------------------
@@ -155,17 +197,92 @@ class CertifyGUI(QWidget):
         self.btn_generate.clicked.connect(self._guard(self.generate_certificates))
         cert_layout.addWidget(self.btn_generate)
 
+        cert_layout.addWidget(QLabel("Output formats:"))
+        self.formats_combo = QComboBox()
+        self.formats_combo.addItems(list(FORMAT_PRESETS.keys()))
+        cert_layout.addWidget(self.formats_combo)
+
+        self.print_ids_check = QCheckBox("Print certificate ID on each certificate")
+        cert_layout.addWidget(self.print_ids_check)
+
+        self.profile_check = QCheckBox("Profile CPU and memory (files in the run's .profile folder)")
+        self.profile_check.toggled.connect(self._guard(self.toggle_profiling))
+        cert_layout.addWidget(self.profile_check)
+
+        print_row = QHBoxLayout()
+        self.impose_combo = QComboBox()
+        self.impose_combo.addItems(list(IMPOSITION_PRESETS.keys()))
+        print_row.addWidget(self.impose_combo)
+        self.impose_dpi_combo = QComboBox()
+        self.impose_dpi_combo.addItems(["300 dpi", "150 dpi"])
+        print_row.addWidget(self.impose_dpi_combo)
+        self.btn_impose = QPushButton("Export Print Sheets")
+        self.btn_impose.clicked.connect(self._guard(self.export_print_sheets))
+        print_row.addWidget(self.btn_impose)
+        cert_layout.addLayout(print_row)
+
+        self.btn_gallery = QPushButton("Review Certificates")
+        self.btn_gallery.clicked.connect(self._guard(self.open_gallery))
+        cert_layout.addWidget(self.btn_gallery)
+
         cert_group.setLayout(cert_layout)
         right_col.addWidget(cert_group)
 
+        verify_group = QGroupBox("Verify Certificate")
+        verify_layout = QVBoxLayout()
+        self.verify_input = QLineEdit()
+        self.verify_input.setPlaceholderText("Certificate ID or participant name")
+        self.verify_input.returnPressed.connect(self._guard(self.verify_certificate_ui))
+        verify_layout.addWidget(self.verify_input)
+
+        verify_buttons = QHBoxLayout()
+        self.btn_verify = QPushButton("Verify")
+        self.btn_verify.clicked.connect(self._guard(self.verify_certificate_ui))
+        verify_buttons.addWidget(self.btn_verify)
+        self.btn_verify_file = QPushButton("Verify PDF File")
+        self.btn_verify_file.clicked.connect(self._guard(self.verify_certificate_file))
+        verify_buttons.addWidget(self.btn_verify_file)
+        verify_layout.addLayout(verify_buttons)
+
+        verify_group.setLayout(verify_layout)
+        right_col.addWidget(verify_group)
+
+        preview_group = QGroupBox("Live Preview")
+        preview_layout = QVBoxLayout()
+        preview_row = QHBoxLayout()
+        self.preview_template_combo = QComboBox()
+        self.preview_template_combo.currentIndexChanged.connect(lambda: self.schedule_preview())
+        preview_row.addWidget(self.preview_template_combo, 2)
+        self.preview_name_input = QLineEdit()
+        self.preview_name_input.setPlaceholderText("Sample participant name")
+        self.preview_name_input.setText("Juan Dela Cruz")
+        self.preview_name_input.textChanged.connect(lambda: self.schedule_preview())
+        preview_row.addWidget(self.preview_name_input, 1)
+        preview_layout.addLayout(preview_row)
+
+        self.preview_label = QLabel("(No preview)")
+        self.preview_label.setFixedSize(480, 340)
+        self.preview_label.setStyleSheet("background-color: #E5E7EB; border-radius: 6px;")
+        preview_layout.addWidget(self.preview_label)
+
+        self.preview_renderer = PreviewRenderer(self)
+        self.preview_renderer.ready.connect(self._show_preview)
+        self.preview_renderer.failed.connect(lambda msg: self.preview_label.setText(f"(Preview failed)\n{msg}"))
+
+        preview_group.setLayout(preview_layout)
+        right_col.addWidget(preview_group)
+
         self.output_log = QTextEdit()
         self.output_log.setReadOnly(True)
+        # oldest lines are dropped so a long-running session doesn't grow without bound
+        self.output_log.document().setMaximumBlockCount(LOG_MAX_LINES)
         self.output_log.setMinimumHeight(350)
         right_col.addWidget(self.output_log)
 
         content_layout.addLayout(left_col, 1)
         content_layout.addLayout(right_col, 2)
 
+        self.refresh_preview_templates()
         self.refresh_event_list()
         self.update_button_states()
 
@@ -224,6 +341,48 @@ class CertifyGUI(QWidget):
                 out.append({"name": name, "position": pos, "signature_path": s.get("signature_path")})
         return out
 
+    def selected_formats(self) -> List[Dict]:
+        return parse_formats(FORMAT_PRESETS.get(self.formats_combo.currentText(), "pdf"))
+
+    # ------------------------
+    # Live preview
+    # ------------------------
+    def refresh_preview_templates(self) -> None:
+        current = self.preview_template_combo.currentText()
+        self.preview_template_combo.blockSignals(True)
+        self.preview_template_combo.clear()
+        try:
+            names = sorted(f for f in os.listdir(TEMPLATES_DIR) if f.lower().endswith(ALLOWED_TEMPLATE_EXTS))
+        except Exception:
+            names = []
+        self.preview_template_combo.addItems(names)
+        idx = self.preview_template_combo.findText(current)
+        if idx >= 0:
+            self.preview_template_combo.setCurrentIndex(idx)
+        self.preview_template_combo.blockSignals(False)
+        self.schedule_preview()
+
+    def schedule_preview(self) -> None:
+        template = self.preview_template_combo.currentText()
+        if not template:
+            return
+        title = self.selected_event() or self.new_event_input.text().strip()
+        self.preview_renderer.request({
+            "participant_name": self.preview_name_input.text().strip() or "Participant Name",
+            "event_title": title,
+            "event_org": self.event_org_input.text().strip(),
+            "event_dates": format_date_range(self.event_start_input.text().strip(), self.event_end_input.text().strip()),
+            "template_path": os.path.join(TEMPLATES_DIR, template),
+            "signatories": self.valid_signatories(),
+        })
+
+    def _show_preview(self, pixmap: QPixmap) -> None:
+        self.preview_label.setPixmap(pixmap.scaled(self.preview_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def closeEvent(self, event):
+        self.preview_renderer.shutdown()
+        super().closeEvent(event)
+
     def update_button_states(self) -> None:
         event_selected = bool(self.selected_event())
         participants_ok = event_selected and os.path.exists(self.participants_csv_path())
@@ -237,13 +396,19 @@ class CertifyGUI(QWidget):
         # Delete/import require an event selected
         self.btn_delete.setEnabled(event_selected)
         self.btn_csv.setEnabled(event_selected)
+        self.btn_cleanup_preview.setEnabled(event_selected)
+        self.btn_cleanup_apply.setEnabled(event_selected)
+        self.btn_gallery.setEnabled(event_selected)
 
         # Generate requires: event + participants + signatory + template
         self.btn_generate.setEnabled(event_selected and participants_ok and sign_ok and template_ok)
+        self.btn_impose.setEnabled(event_selected and participants_ok and sign_ok and template_ok)
 
         # Remove signatory only if exists
         self.btn_remove_sign.setEnabled(len(self.signatories) > 0)
 
+        self.schedule_preview()
+
         self.btn_generate.setToolTip(
             "To enable Generate:\n"
             "1) Select an event\n"
@@ -341,6 +506,65 @@ class CertifyGUI(QWidget):
             "template_file": template_file,
         }
 
+    def _preflight(self, df: pd.DataFrame, template_path: str, n_signatories: int,
+                   context: Optional[Dict[str, str]] = None) -> Optional[dict]:
+        report = validate_participants(df, template_path=template_path, n_signatories=n_signatories, context=context)
+        for line in format_validation_report(report):
+            self.log(line)
+        if not report["valid"]:
+            QMessageBox.warning(self, "No participants", "participants.csv has no usable names.")
+            return None
+        if has_issues(report):
+            reply = QMessageBox.question(
+                self, "Check participants",
+                "\n".join(format_validation_report(report)) + "\n\nGenerate anyway?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                self.log("Generation cancelled after pre-flight check.")
+                return None
+        return report
+
+    def _confirm_estimate(self, names: List[str], title: str, org: str, dates: str, template_path: str,
+                          sign_data: List[Dict], event_path: str) -> bool:
+        est = estimate_batch(
+            names, title, org, dates, template_path, sign_data,
+            formats=self.selected_formats(),
+            print_ids=self.print_ids_check.isChecked(),
+            output_dir=os.path.join(event_path, "certificates"),
+        )
+        summary = format_estimate(est)
+        self.log(summary)
+        if not est["fits"]:
+            QMessageBox.warning(self, "Not enough disk space", summary)
+            return False
+        reply = QMessageBox.question(
+            self, "Generate Certificates", summary + "\n\nStart generating?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            self.log("Generation cancelled.")
+            return False
+        return True
+
+    def _save_generation_settings(self, event_path: str, template_path: str, sign_data: List[Dict]) -> None:
+        # Remember template + signatories in event.json so CLI/watch mode can regenerate this event
+        try:
+            update_event_metadata(
+                event_path,
+                template=os.path.abspath(template_path),
+                signatories=[
+                    {
+                        "name": s["name"],
+                        "position": s["position"],
+                        "signature_path": os.path.abspath(s["signature_path"]) if s.get("signature_path") else None,
+                    }
+                    for s in sign_data
+                ],
+            )
+        except Exception as e:
+            self.log(f"[WARN] Failed to save generation settings: {e}")
+
     def clear_signatories_ui(self) -> None:
         while self.signatories:
             sig = self.signatories.pop()
@@ -398,14 +622,14 @@ class CertifyGUI(QWidget):
         os.makedirs(event_path, exist_ok=True)
         self.log(f"Using event folder: {event_path}")
 
-        # Save event.json and participants.csv
+        # Save event.json and participants.csv; merged, so keys this flow does not set (the
+        # retention policy) survive. Template and signatories are saved again before generating.
         try:
-            with open(os.path.join(event_path, "event.json"), "w", encoding="utf-8") as f:
-                json.dump(
-                    {"title": event_name, "organization": org, "start_date": start_date, "end_date": end_date},
-                    f, ensure_ascii=False, indent=2
-                )
-            pd.DataFrame({"name": participants}).to_csv(os.path.join(event_path, "participants.csv"), index=False)
+            storage.update_metadata(
+                event_path,
+                {"title": event_name, "organization": org, "start_date": start_date, "end_date": end_date},
+            )
+            storage.write_participants(event_path, pd.DataFrame({"name": participants}))
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save event files: {e}")
             self.log(f"[FAILED] save files: {e}")
@@ -523,13 +747,11 @@ class CertifyGUI(QWidget):
             QMessageBox.warning(self, "Missing CSV", "participants.csv missing in event folder.")
             return
 
+        self._save_generation_settings(event_path, template_path, sign_data)
+
         # Format event date range
         event_dates = format_date_range(start_date, end_date)
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_dir = os.path.join(event_path, "certificates", ts)
-        os.makedirs(output_dir, exist_ok=True)
-
         try:
             df = pd.read_csv(participants_csv)
         except Exception as e:
@@ -540,36 +762,40 @@ class CertifyGUI(QWidget):
             QMessageBox.warning(self, "Invalid CSV", "participants.csv must contain 'name' column.")
             return
 
-        generated = 0
-        failed = 0
+        checked = self._preflight(df, template_path, len(sign_data),
+                                  {"event_title": event_name, "event_org": org, "event_dates": event_dates})
+        if checked is None:
+            return
+        if not self._confirm_estimate(checked["names"], event_name, org, event_dates, template_path, sign_data, event_path):
+            return
 
-        self.log(f"Generating certificates → {output_dir}")
-        for _, row in df.iterrows():
-            pname = str(row.get("name", "")).strip()
-            if not pname:
-                failed += 1
-                continue
-            try:
-                pdf_path = generate_certificate(
-                    participant_name=pname,
-                    event_title=event_name,
-                    event_org=org,
-                    event_dates=event_dates,
-                    template_path=template_path,
-                    output_dir=output_dir,
-                    signatories=sign_data,
-                )
-                self.log(f"Generated: {pdf_path}")
-                generated += 1
-            except Exception as e:
-                failed += 1
-                self.log(f"[FAILED] {pname}: {e}")
+        with storage.run_lock(event_path):
+            output_dir = storage.new_run_dir(event_path)
+            ts = os.path.basename(output_dir)
+
+            self.log(f"Generating certificates → {output_dir}")
+            report = generate_batch(
+                checked["names"],
+                event_title=event_name,
+                event_org=org,
+                event_dates=event_dates,
+                template_path=template_path,
+                output_dir=output_dir,
+                signatories=sign_data,
+                log=self.log,
+                print_ids=self.print_ids_check.isChecked(),
+                formats=self.selected_formats(),
+                file_stems=checked["output_names"],
+                field_texts=checked["fields"],
+                profile=self.profile_check.isChecked() or None,
+            )
+        generated = report["generated"]
+        failed = report["failed"]
+        self.log(f"Run report: {format_report(report)}")
 
         # Backup output
-        import shutil
-        backup_path = os.path.join(BACKUP_DIR, f"backup_{sanitize_folder_name(folder)}_{ts}")
         try:
-            shutil.copytree(output_dir, backup_path)
+            backup_path = backup_output(output_dir, folder, ts)
             self.log(f"Backup saved: {backup_path}")
         except Exception as e:
             self.log(f"[WARN] Backup failed: {e}")
@@ -596,8 +822,7 @@ class CertifyGUI(QWidget):
         events = []
         try:
             for folder in os.listdir(EVENTS_DIR):
-                full = os.path.join(EVENTS_DIR, folder)
-                if os.path.isdir(full):
+                if storage.is_event_dir(EVENTS_DIR, folder):
                     events.append(folder.replace("_", " "))
             events.sort()
         except Exception as e:
@@ -630,6 +855,9 @@ class CertifyGUI(QWidget):
         self.event_org_input.setText(meta.get("organization", ""))
         self.event_start_input.setText(meta.get("start_date", ""))
         self.event_end_input.setText(meta.get("end_date", ""))
+        policy = retention.event_policy(path)
+        self.keep_last_input.setText("" if policy["keep_last"] is None else str(policy["keep_last"]))
+        self.max_mb_input.setText("" if policy["max_bytes"] is None else f"{policy['max_bytes'] / (1024 * 1024):g}")
 
         self.update_button_states()
 
@@ -667,7 +895,11 @@ class CertifyGUI(QWidget):
             QMessageBox.warning(self, "Already exists", f"Event '{title}' already exists.")
             return
 
-        os.makedirs(path, exist_ok=True)
+        try:
+            os.makedirs(path)
+        except FileExistsError:
+            QMessageBox.warning(self, "Already exists", f"Event '{title}' already exists.")
+            return
 
         metadata = {
             "title": title,
@@ -677,8 +909,7 @@ class CertifyGUI(QWidget):
         }
 
         try:
-            with open(os.path.join(path, "event.json"), "w", encoding="utf-8") as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            storage.update_metadata(path, metadata, replace=True)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save event.json: {e}")
             return
@@ -706,10 +937,12 @@ class CertifyGUI(QWidget):
         if reply != QMessageBox.Yes:
             return
 
-        import shutil
         try:
-            shutil.rmtree(self.event_path_for(ev))
+            storage.delete_event(self.event_path_for(ev), timeout=5)
             self.log(f"Deleted event: {ev}")
+        except storage.LockTimeout:
+            QMessageBox.warning(self, "Event busy", f"'{ev}' is being generated by another process. Try again when it finishes.")
+            self.log(f"[FAILED] delete_event: '{ev}' is in use.")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to delete event: {e}")
             self.log(f"[FAILED] delete_event: {e}")
@@ -807,6 +1040,11 @@ class CertifyGUI(QWidget):
         try:
             shutil.copy(file_path, dest_path)
             self.log(f"Template added: {dest_path}")
+            layout_src = layout_path_for(file_path)
+            if os.path.exists(layout_src):
+                shutil.copy(layout_src, layout_path_for(dest_path))
+                self.log(f"Template layout added: {layout_path_for(dest_path)}")
+            self.refresh_preview_templates()
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to add template: {e}")
             self.log(f"[FAILED] add_template: {e}")
@@ -840,7 +1078,7 @@ class CertifyGUI(QWidget):
             return
 
         try:
-            df.to_csv(os.path.join(event_path, "participants.csv"), index=False)
+            storage.write_participants(event_path, df)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save participants.csv: {e}")
             return
@@ -891,11 +1129,9 @@ class CertifyGUI(QWidget):
                 return
 
         try:
-            with open(os.path.join(event_path, "event.json"), "w", encoding="utf-8") as f:
-                json.dump(
-                    {"title": ev, "organization": org, "start_date": start_date, "end_date": end_date},
-                    f, ensure_ascii=False, indent=2
-                )
+            storage.update_metadata(
+                event_path, {"title": ev, "organization": org, "start_date": start_date, "end_date": end_date}
+            )
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save event.json: {e}")
             return
@@ -908,9 +1144,7 @@ class CertifyGUI(QWidget):
         if not template_file:
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_dir = os.path.join(event_path, "certificates", timestamp)
-        os.makedirs(output_dir, exist_ok=True)
+        self._save_generation_settings(event_path, template_file, sign_data)
 
         try:
             df = pd.read_csv(participants_csv)
@@ -922,36 +1156,38 @@ class CertifyGUI(QWidget):
             QMessageBox.warning(self, "Invalid CSV", "participants.csv must have a 'name' column.")
             return
 
-        generated = 0
-        failed = 0
-
-        for _, row in df.iterrows():
-            name = str(row.get("name", "")).strip()
-            if not name:
-                failed += 1
-                self.log("Skipped empty name.")
-                continue
+        checked = self._preflight(df, template_file, len(sign_data),
+                                  {"event_title": ev, "event_org": org, "event_dates": event_dates})
+        if checked is None:
+            return
+        if not self._confirm_estimate(checked["names"], ev, org, event_dates, template_file, sign_data, event_path):
+            return
 
-            try:
-                pdf_path = generate_certificate(
-                    participant_name=name,
-                    event_title=ev,
-                    event_org=org,
-                    event_dates=event_dates,
-                    template_path=template_file,
-                    output_dir=output_dir,
-                    signatories=sign_data,
-                )
-                self.log(f"Generated: {pdf_path}")
-                generated += 1
-            except Exception as e:
-                failed += 1
-                self.log(f"[FAILED] {name}: {e}")
+        with storage.run_lock(event_path):
+            output_dir = storage.new_run_dir(event_path)
+            timestamp = os.path.basename(output_dir)
+
+            report = generate_batch(
+                checked["names"],
+                event_title=ev,
+                event_org=org,
+                event_dates=event_dates,
+                template_path=template_file,
+                output_dir=output_dir,
+                signatories=sign_data,
+                log=self.log,
+                print_ids=self.print_ids_check.isChecked(),
+                formats=self.selected_formats(),
+                file_stems=checked["output_names"],
+                field_texts=checked["fields"],
+                profile=self.profile_check.isChecked() or None,
+            )
+        generated = report["generated"]
+        failed = report["failed"]
+        self.log(f"Run report: {format_report(report)}")
 
-        import shutil
-        backup_path = os.path.join(BACKUP_DIR, f"backup_{sanitize_folder_name(ev)}_{timestamp}")
         try:
-            shutil.copytree(output_dir, backup_path)
+            backup_path = backup_output(output_dir, ev, timestamp)
             self.log(f"Backup saved: {backup_path}")
         except Exception as e:
             self.log(f"[WARN] Backup failed: {e}")
@@ -961,3 +1197,172 @@ class CertifyGUI(QWidget):
             f"Finished!\nGenerated: {generated}\nFailed/Skipped: {failed}\nOutput: {output_dir}"
         )
         self.update_button_states()
+
+    def toggle_profiling(self, checked: bool) -> None:
+        if not checked:
+            stop_profiling()
+            self.log("Profiling off.")
+        else:
+            self.log("Profiling on: each generation run writes CPU samples and memory growth to <run>/.profile/.")
+
+    def open_gallery(self, *_):
+        ev = self.selected_event()
+        if not ev:
+            QMessageBox.warning(self, "Missing info", "Select an event first.")
+            return
+
+        event_path = self.event_path_for(ev)
+        if not gallery_runs(event_path):
+            QMessageBox.information(self, "No certificates", "This event has no generated certificates yet.")
+            return
+        GalleryDialog(event_path, self).exec_()
+
+    def export_print_sheets(self, *_):
+        ev = self.selected_event()
+        if not ev:
+            QMessageBox.warning(self, "Missing info", "Select an event first.")
+            return
+
+        event_path = self.event_path_for(ev)
+        participants_csv = os.path.join(event_path, "participants.csv")
+        if not os.path.exists(participants_csv):
+            QMessageBox.warning(self, "Missing file", "Participants CSV missing. Import participants first.")
+            return
+
+        sign_data = self.valid_signatories()
+        if not sign_data:
+            QMessageBox.warning(self, "Missing info", "Add at least 1 signatory (name + position).")
+            return
+
+        template_file, _ = QFileDialog.getOpenFileName(
+            self, "Select Template", TEMPLATES_DIR, IMG_FILTER
+        )
+        if not template_file:
+            return
+
+        try:
+            df = pd.read_csv(participants_csv)
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to read participants.csv: {e}")
+            return
+
+        if "name" not in df.columns:
+            QMessageBox.warning(self, "Invalid CSV", "participants.csv must have a 'name' column.")
+            return
+
+        org = self.event_org_input.text().strip()
+        event_dates = format_date_range(self.event_start_input.text().strip(), self.event_end_input.text().strip())
+        checked = self._preflight(df, template_file, len(sign_data),
+                                  {"event_title": ev, "event_org": org, "event_dates": event_dates})
+        if checked is None:
+            return
+
+        sheet, up = IMPOSITION_PRESETS[self.impose_combo.currentText()]
+        dpi = int(self.impose_dpi_combo.currentText().split()[0])
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(event_path, "print", f"{timestamp}_{sheet}_{up}up.pdf")
+
+        with storage.run_lock(event_path):
+            report = impose_certificates(
+                checked["names"],
+                event_title=ev,
+                event_org=org,
+                event_dates=event_dates,
+                template_path=template_file,
+                output_path=output_path,
+                signatories=sign_data,
+                sheet=sheet,
+                up=up,
+                dpi=dpi,
+                log=self.log,
+                field_texts=checked["fields"],
+            )
+        QMessageBox.information(
+            self, "Print Sheets Ready",
+            f"{report['names']} certificates on {report['sheets']} {sheet} sheet(s).\nOutput:\n{output_path}"
+        )
+
+    # ------------------------
+    # Storage cleanup
+    # ------------------------
+    def _retention_policy_from_ui(self) -> Optional[Dict]:
+        keep_text = self.keep_last_input.text().strip()
+        mb_text = self.max_mb_input.text().strip()
+        try:
+            keep_last = int(keep_text) if keep_text else None
+            max_bytes = int(float(mb_text) * 1024 * 1024) if mb_text else None
+        except ValueError:
+            QMessageBox.warning(self, "Invalid policy", "Keep last N must be a whole number and Max MB a number.")
+            return None
+        if keep_last is not None and keep_last < 1:
+            QMessageBox.warning(self, "Invalid policy", "Keep at least 1 run.")
+            return None
+        return {"keep_last": keep_last, "max_bytes": max_bytes}
+
+    def cleanup_event(self, apply: bool = False) -> None:
+        ev = self.selected_event()
+        if not ev:
+            QMessageBox.warning(self, "Error", "Select an event first.")
+            return
+        policy = self._retention_policy_from_ui()
+        if policy is None:
+            return
+
+        event_path = self.event_path_for(ev)
+        plan = retention.plan_retention(event_path, **policy)
+        self.log(("" if apply else "[dry-run] ") + retention.format_plan(plan))
+        for run in plan["delete"]:
+            self.log(f"  remove {run['timestamp']}: {', '.join(run['paths'])}")
+        if not apply:
+            return
+
+        if plan["delete"]:
+            reply = QMessageBox.question(
+                self, "Apply Cleanup",
+                f"Permanently remove {len(plan['delete'])} old run(s) of '{ev}' (certificates and backups)?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        update_event_metadata(event_path, retention=policy)
+        self.log(f"Cleanup policy saved for {ev}.")
+        # re-planned under the event's run lock; skipped with a warning while a batch writes to it
+        retention.apply_retention(event_path, log=self.log, **policy)
+
+    def toggle_auto_cleanup(self, enabled: bool) -> None:
+        if enabled:
+            self.cleanup_timer.start()
+            self.log("Automatic cleanup enabled.")
+            self.run_auto_cleanup()
+        else:
+            self.cleanup_timer.stop()
+            self.log("Automatic cleanup disabled.")
+
+    def run_auto_cleanup(self) -> None:
+        retention.scan_events(EVENTS_DIR, apply=True, log=self.log)
+
+    # ------------------------
+    # Verification
+    # ------------------------
+    def _show_verification(self, query: str, matches: List[Dict]) -> None:
+        if not matches:
+            self.log(f"[VERIFY] Not found: {query}")
+            QMessageBox.warning(self, "Not Found", f"No certificate matches:\n{query}")
+            return
+        lines = [describe_certificate(m) for m in matches]
+        for line in lines:
+            self.log(f"[VERIFY] Valid: {line}")
+        QMessageBox.information(self, "Certificate Found", "\n\n".join(lines[:10]))
+
+    def verify_certificate_ui(self, *_):
+        query = self.verify_input.text().strip()
+        if not query:
+            QMessageBox.warning(self, "Missing info", "Enter a certificate ID or participant name.")
+            return
+        self._show_verification(query, verify_certificate(query))
+
+    def verify_certificate_file(self, *_):
+        path, _ = QFileDialog.getOpenFileName(self, "Select Certificate PDF", BACKUP_DIR, "PDF Files (*.pdf)")
+        if not path:
+            return
+        self._show_verification(path, verify_certificate(path))
@@ -2,8 +2,18 @@ import os
 import sys
 import json
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from . import storage
+
+# Keyed by (path, mtime, size); bounded because every edited template, signature or layout adds entries.
+DIGEST_MEMORY_SLOTS = 256
+_DIGEST_CACHE: "OrderedDict[Tuple[str, float, int], str]" = OrderedDict()
+_DIGEST_LOCK = threading.Lock()
 
 def sanitize_folder_name(name: str) -> str:
     name = (name or "").strip()
@@ -23,6 +33,25 @@ def resource_path(relative_path: str) -> str:
     base_path = os.path.abspath(os.path.join(base_path, ".."))
     return os.path.join(base_path, relative_path)
 
+def file_digest(path: str) -> str:
+    st = os.stat(path)
+    stamp = (os.path.abspath(path), st.st_mtime, st.st_size)
+    with _DIGEST_LOCK:
+        digest = _DIGEST_CACHE.get(stamp)
+        if digest is not None:
+            _DIGEST_CACHE.move_to_end(stamp)
+            return digest
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _DIGEST_LOCK:
+        _DIGEST_CACHE[stamp] = digest
+        while len(_DIGEST_CACHE) > DIGEST_MEMORY_SLOTS:
+            _DIGEST_CACHE.popitem(last=False)
+    return digest
+
 def load_event_metadata(event_path: str) -> Dict[str, Any]:
     metadata_path = os.path.join(event_path, "event.json")
     if os.path.exists(metadata_path):
@@ -35,6 +64,12 @@ def load_event_metadata(event_path: str) -> Dict[str, Any]:
             pass
     return {"organization": "", "start_date": "", "end_date": ""}
 
+def write_json_atomic(path: str, data: Any) -> None:
+    storage.write_json(path, data)
+
+def update_event_metadata(event_path: str, **fields: Any) -> Dict[str, Any]:
+    return storage.update_metadata(event_path, fields)
+
 def parse_date_ymd(s: str) -> Optional[datetime]:
     s = (s or "").strip()
     if not s:
@@ -70,3 +105,16 @@ def format_date_range(start_date: str, end_date: str) -> str:
     if sdt:
         return fmt(sdt, True)
     return fmt(edt, True) if edt else ""
+
+def load_event_settings(event_path: str) -> Dict[str, Any]:
+    # Everything needed to render an event from disk: text from event.json plus the
+    # template/signatories saved by the last GUI run (may be missing for older events).
+    meta = load_event_metadata(event_path)
+    folder = os.path.basename(os.path.normpath(event_path))
+    return {
+        "event_title": meta.get("title") or folder.replace("_", " "),
+        "event_org": meta.get("organization", ""),
+        "event_dates": format_date_range(meta.get("start_date", ""), meta.get("end_date", "")),
+        "template": meta.get("template"),
+        "signatories": meta.get("signatories") or [],
+    }
@@ -0,0 +1,212 @@
+import os
+import io
+import time
+from typing import List, Dict, Optional, Callable, Any, Iterable, Tuple
+
+from PIL import Image, ImageDraw
+
+from .cache import RenderCache, get_default_cache
+from .certificate import load_template, render_certificate
+
+SHEET_SIZES_MM: Dict[str, Tuple[float, float]] = {"A4": (210.0, 297.0), "A3": (297.0, 420.0)}
+IMPOSITION_PRESETS: Dict[str, Tuple[str, int]] = {
+    "A4 2-up": ("A4", 2),
+    "A4 4-up": ("A4", 4),
+    "A3 2-up": ("A3", 2),
+    "A3 4-up": ("A3", 4),
+}
+DEFAULT_DPI = 300
+MARGIN_MM = 10.0
+GUTTER_MM = 10.0
+MARK_OFFSET_MM = 1.5
+MARK_LENGTH_MM = 4.0
+SHEET_JPEG_QUALITY = 92
+
+
+def _px(mm: float, dpi: int) -> int:
+    return int(round(mm / 25.4 * dpi))
+
+
+def plan_sheet(sheet: str, up: int, cert_size: Tuple[int, int], dpi: int = DEFAULT_DPI) -> Dict[str, Any]:
+    # Picks the orientation and grid (cols x rows == up) that gives the largest tiles.
+    if sheet not in SHEET_SIZES_MM:
+        raise ValueError(f"Unknown sheet size: {sheet}")
+    up = int(up)
+    if up < 1:
+        raise ValueError("up must be at least 1")
+    aspect = cert_size[0] / cert_size[1]
+    short, long_ = SHEET_SIZES_MM[sheet]
+
+    best = None
+    for sheet_w, sheet_h in ((short, long_), (long_, short)):
+        for cols in range(1, up + 1):
+            if up % cols:
+                continue
+            rows = up // cols
+            avail_w = (sheet_w - 2 * MARGIN_MM - (cols - 1) * GUTTER_MM) / cols
+            avail_h = (sheet_h - 2 * MARGIN_MM - (rows - 1) * GUTTER_MM) / rows
+            tile_w = min(avail_w, avail_h * aspect)
+            if tile_w > 0 and (best is None or tile_w > best["tile_mm"][0]):
+                best = {
+                    "sheet_mm": (sheet_w, sheet_h), "cols": cols, "rows": rows,
+                    "tile_mm": (tile_w, tile_w / aspect),
+                }
+    if best is None:
+        raise ValueError(f"{up} certificates do not fit on {sheet}")
+
+    sheet_w, sheet_h = best["sheet_mm"]
+    tile_w, tile_h = best["tile_mm"]
+    # centre the grid on the sheet
+    grid_w = best["cols"] * tile_w + (best["cols"] - 1) * GUTTER_MM
+    grid_h = best["rows"] * tile_h + (best["rows"] - 1) * GUTTER_MM
+    left = (sheet_w - grid_w) / 2
+    top = (sheet_h - grid_h) / 2
+    cells = [
+        (_px(left + c * (tile_w + GUTTER_MM), dpi), _px(top + r * (tile_h + GUTTER_MM), dpi))
+        for r in range(best["rows"]) for c in range(best["cols"])
+    ]
+    return {
+        "sheet": sheet,
+        "up": up,
+        "dpi": dpi,
+        "cols": best["cols"],
+        "rows": best["rows"],
+        "sheet_px": (_px(sheet_w, dpi), _px(sheet_h, dpi)),
+        "sheet_pt": (sheet_w / 25.4 * 72, sheet_h / 25.4 * 72),
+        "tile_px": (_px(tile_w, dpi), _px(tile_h, dpi)),
+        "cells": cells,
+        "scale": _px(tile_w, dpi) / cert_size[0],
+    }
+
+
+def draw_crop_marks(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: int, dpi: int) -> None:
+    off = _px(MARK_OFFSET_MM, dpi)
+    length = _px(MARK_LENGTH_MM, dpi)
+    width = max(1, _px(0.1, dpi))
+    for cx, sx in ((x, -1), (x + w, 1)):
+        for cy, sy in ((y, -1), (y + h, 1)):
+            draw.line([(cx + sx * off, cy), (cx + sx * (off + length), cy)], fill="black", width=width)
+            draw.line([(cx, cy + sy * off), (cx, cy + sy * (off + length))], fill="black", width=width)
+
+
+class PdfSheetWriter:
+    # Minimal PDF writer that streams one JPEG page at a time, so memory stays at one
+    # sheet regardless of page count (Pillow's save_all keeps every page in memory).
+    def __init__(self, path: str, page_size_pt: Tuple[float, float]):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self.page_w, self.page_h = page_size_pt
+        self.f = open(self.tmp, "wb")
+        self.offsets: Dict[int, int] = {}
+        self.pages: List[int] = []
+        self.next_id = 3  # 1 = catalog, 2 = page tree (written at close)
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _obj(self, obj_id: int, body: bytes, stream: Optional[bytes] = None) -> None:
+        self.offsets[obj_id] = self.f.tell()
+        self.f.write(f"{obj_id} 0 obj\n".encode() + body)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+
+    def add_page(self, image: Image.Image, quality: int = SHEET_JPEG_QUALITY) -> None:
+        buf = io.BytesIO()
+        image.convert("RGB").save(buf, "JPEG", quality=quality)
+        data = buf.getvalue()
+        img_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        self._obj(img_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>"
+        ).encode(), data)
+        content = f"q {self.page_w:.2f} 0 0 {self.page_h:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._obj(content_id, f"<< /Length {len(content)} >>".encode(), content)
+        self._obj(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_w:.2f} {self.page_h:.2f}] "
+            f"/Resources << /XObject << /Im0 {img_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        self.pages.append(page_id)
+
+    def close(self) -> None:
+        kids = " ".join(f"{p} 0 R" for p in self.pages)
+        self._obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode())
+        self._obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self.f.tell()
+        count = self.next_id
+        self.f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, count):
+            self.f.write(f"{self.offsets.get(obj_id, 0):010d} 00000 n \n".encode())
+        self.f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        self.f.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+def impose_certificates(
+    names: Iterable[Any],
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    output_path: str,
+    signatories: List[Dict],
+    sheet: str = "A4",
+    up: int = 2,
+    dpi: int = DEFAULT_DPI,
+    crop_marks: bool = True,
+    log: Optional[Callable[[str], None]] = None,
+    cache: Optional[RenderCache] = None,
+    field_texts: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    log = log or (lambda _msg: None)
+    cache = cache if cache is not None else get_default_cache()
+    field_texts = field_texts or {}
+    clean = []
+    for i, raw in enumerate(names):
+        missing = raw is None or (isinstance(raw, float) and raw != raw)
+        name = "" if missing else str(raw).strip()
+        if name:
+            clean.append((name, {key: texts[i] for key, texts in field_texts.items()}))
+    if not clean:
+        raise ValueError("No names to impose.")
+
+    plan = plan_sheet(sheet, up, load_template(template_path).size, dpi)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    started = time.perf_counter()
+    writer = PdfSheetWriter(output_path, plan["sheet_pt"])
+    sheets = 0
+    try:
+        for start in range(0, len(clean), up):
+            page = Image.new("RGB", plan["sheet_px"], "white")
+            draw = ImageDraw.Draw(page)
+            for (name, fields), (x, y) in zip(clean[start:start + up], plan["cells"]):
+                # The base layer is rendered once at this scale and shared by every tile.
+                tile = render_certificate(name, event_title, event_org, event_dates, template_path, signatories,
+                                          cache=cache, scale=plan["scale"], fields=fields)
+                if tile.size != plan["tile_px"]:
+                    tile = tile.resize(plan["tile_px"], Image.LANCZOS)
+                page.paste(tile, (x, y))
+                if crop_marks:
+                    draw_crop_marks(draw, x, y, plan["tile_px"][0], plan["tile_px"][1], dpi)
+            writer.add_page(page)
+            sheets += 1
+            if sheets % 50 == 0:
+                log(f"Imposed {sheets} sheet(s)...")
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    log(f"Print sheets: {output_path} ({len(clean)} certificates on {sheets} {sheet} sheet(s), {up}-up at {dpi} dpi)")
+    return {
+        "names": len(clean),
+        "sheets": sheets,
+        "output": output_path,
+        "plan": plan,
+        "seconds": time.perf_counter() - started,
+    }
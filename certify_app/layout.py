@@ -0,0 +1,183 @@
+import os
+import json
+import copy
+import string
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Dict, List, Optional, Any, Tuple
+
+from .helpers import file_digest, write_json_atomic
+
+LAYOUT_SUFFIX = ".layout.json"
+ALIGNMENTS = ("center", "left", "right")
+
+# Reproduces the original hard-coded geometry (designed for 2000x1414 templates).
+# Coordinates: plain numbers are template pixels (negative y counts up from the bottom edge),
+# "NN%" strings are a fraction of the image size, "a/b" strings are exact fractions.
+DEFAULT_LAYOUT: Dict[str, Any] = {
+    "fields": {
+        "name": {"x": 1000, "y": 680, "size": 70, "align": "center", "max_width": "90%"},
+        "event_line": {
+            "x": 1000, "y": 830, "size": 32, "align": "center",
+            "text": "for participating in the {event_title} held by {event_org}",
+        },
+        "dates_line": {"x": 1000, "y": 900, "size": 32, "align": "center", "text": "on {event_dates}"},
+        "certificate_id": {"x": "50%", "y": -35, "size": 20, "align": "center", "text": "Certificate ID: {certificate_id}"},
+    },
+    "signatures": {
+        "width": 0.18,
+        "signature_y": -210,
+        "name_y": -140,
+        "position_y": -90,
+        "name_size": 40,
+        "position_size": 32,
+        "slots": {
+            "1": ["1/2"],
+            "2": ["1/3", "2/3"],
+            "3": ["1/4", "1/2", "3/4"],
+        },
+    },
+}
+
+# Fields drawn per certificate; everything else is static and baked into the base layer.
+DYNAMIC_FIELDS = ("name", "certificate_id")
+# Placeholders shared by every certificate of a run. A field whose "text" uses any other
+# placeholder, e.g. "Awarded {award} as {role}", takes it from that participants.csv column
+# and is drawn per certificate too.
+EVENT_KEYS = ("event_title", "event_org", "event_dates")
+
+_FORMATTER = string.Formatter()
+
+# Keyed by (layout digest, image size, signatories, scale); bounded because every layout edit,
+# template size and draft scale adds entries.
+PLAN_MEMORY_SLOTS = 64
+_PLANS: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+_PLANS_LOCK = threading.Lock()
+
+
+def layout_path_for(template_path: str) -> str:
+    root, _ = os.path.splitext(template_path)
+    return root + LAYOUT_SUFFIX
+
+
+def layout_digest(template_path: str) -> str:
+    path = layout_path_for(template_path or "")
+    return file_digest(path) if template_path and os.path.exists(path) else "default"
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    out = copy.deepcopy(base)
+    for k, v in override.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def load_layout(template_path: str) -> Dict[str, Any]:
+    path = layout_path_for(template_path or "")
+    if not template_path or not os.path.exists(path):
+        return copy.deepcopy(DEFAULT_LAYOUT)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Layout must be a JSON object: {path}")
+    return _merge(DEFAULT_LAYOUT, data)
+
+
+def write_default_layout(template_path: str, overwrite: bool = False) -> str:
+    path = layout_path_for(template_path)
+    if os.path.exists(path) and not overwrite:
+        raise FileExistsError(f"Layout already exists: {path}")
+    write_json_atomic(path, DEFAULT_LAYOUT)
+    return path
+
+
+def _coord(value: Any, extent: int, scale: float) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.endswith("%"):
+            return int(extent * float(value[:-1]) / 100)
+        if "/" in value:
+            return int(extent * Fraction(value))
+        value = float(value)
+    px = int(round(float(value) * scale))
+    return extent + px if value < 0 else px
+
+
+def _size(value: Any, scale: float) -> int:
+    return max(1, int(round(float(value) * scale)))
+
+
+def template_keys(text: Optional[str]) -> List[str]:
+    return [key for _, key, _, _ in _FORMATTER.parse(text or "") if key is not None]
+
+
+def compile_layout(layout: Dict[str, Any], image_size: Tuple[int, int], n_signatories: int, scale: float = 1.0) -> Dict[str, Any]:
+    img_w, img_h = image_size
+    fields = {}
+    for key, spec in layout.get("fields", {}).items():
+        if spec is None:
+            continue  # a layout can drop a field with "field": null
+        align = spec.get("align", "center")
+        if align not in ALIGNMENTS:
+            raise ValueError(f"Invalid align '{align}' for field '{key}'")
+        try:
+            keys = template_keys(spec.get("text"))
+        except ValueError as e:
+            raise ValueError(f"Invalid text for field '{key}': {e}")
+        fields[key] = {
+            "x": _coord(spec.get("x", "50%"), img_w, scale),
+            "y": _coord(spec.get("y", "50%"), img_h, scale),
+            "size": _size(spec.get("size", 40), scale),
+            "align": align,
+            "text": spec.get("text"),
+            "max_width": _coord(spec["max_width"], img_w, scale) if spec.get("max_width") else None,
+            "font_instance": spec.get("font_instance"),  # named variable-font instance, e.g. "Bold"
+            "keys": keys,
+        }
+
+    sig = layout.get("signatures", {})
+    slots = []
+    if n_signatories:
+        xs = sig.get("slots", {}).get(str(n_signatories))
+        if not xs or len(xs) < n_signatories:
+            raise ValueError(f"Layout has no signature slots for {n_signatories} signatories")
+        sig_y = _coord(sig.get("signature_y"), img_h, scale)
+        name_y = _coord(sig.get("name_y"), img_h, scale)
+        pos_y = _coord(sig.get("position_y"), img_h, scale)
+        for x in xs[:n_signatories]:
+            slots.append({"x": _coord(x, img_w, scale), "signature_y": sig_y, "name_y": name_y, "position_y": pos_y})
+
+    dynamic = {
+        k: v for k, v in fields.items()
+        if k in DYNAMIC_FIELDS or any(key not in EVENT_KEYS for key in v["keys"])
+    }
+    return {
+        "static": {k: v for k, v in fields.items() if k not in dynamic},
+        "dynamic": dynamic,
+        # participants.csv columns used by the per-certificate text fields
+        "columns": sorted({key for k, v in dynamic.items() if k not in DYNAMIC_FIELDS
+                           for key in v["keys"] if key not in EVENT_KEYS}),
+        "signature_width": int(img_w * float(sig.get("width", 0.18))),
+        "signature_name_size": _size(sig.get("name_size", 40), scale),
+        "signature_position_size": _size(sig.get("position_size", 32), scale),
+        "slots": slots,
+    }
+
+
+def get_placement_plan(template_path: str, image_size: Tuple[int, int], n_signatories: int, scale: float = 1.0) -> Dict[str, Any]:
+    key = (layout_digest(template_path), tuple(image_size), n_signatories, scale)
+    with _PLANS_LOCK:
+        plan = _PLANS.get(key)
+        if plan is not None:
+            _PLANS.move_to_end(key)
+            return plan
+    plan = compile_layout(load_layout(template_path), image_size, n_signatories, scale)
+    with _PLANS_LOCK:
+        _PLANS[key] = plan
+        while len(_PLANS) > PLAN_MEMORY_SLOTS:
+            _PLANS.popitem(last=False)
+    return plan
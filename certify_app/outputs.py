@@ -0,0 +1,127 @@
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+from PIL import Image
+
+# Per-format encoder settings. "width"/"scale" request a downscaled copy, which is
+# produced once per distinct target size and shared by every format that asks for it.
+# PDFs leave out Pillow's creation/modification timestamps, so re-rendering the same certificate
+# gives byte-identical files that retention can hard-link across runs.
+FORMAT_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "pdf": {"resolution": 100.0, "creationDate": None, "modDate": None},
+    "png": {"compress_level": 6},
+    "jpg": {"quality": 90},
+    "webp": {"quality": 85, "method": 4},
+}
+PIL_FORMATS = {"pdf": "PDF", "png": "PNG", "jpg": "JPEG", "webp": "WEBP"}
+DEFAULT_FORMATS: List[Dict[str, Any]] = [{"format": "pdf"}]
+
+# Review thumbnails live in <run>/.thumbs/<stem>.jpg, next to the real outputs.
+THUMB_DIR = ".thumbs"
+THUMB_WIDTH = 240
+THUMB_QUALITY = 80
+
+FORMAT_PRESETS: Dict[str, str] = {
+    "PDF": "pdf",
+    "PDF + PNG": "pdf,png",
+    "PDF + PNG + WebP (web size)": "pdf,png:width=1200,webp:width=1200:quality=80",
+}
+
+
+def _parse_value(value: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_formats(spec: Optional[str]) -> List[Dict[str, Any]]:
+    # "pdf,png:width=1200,webp:quality=80:width=1200"
+    spec = (spec or "").strip()
+    if not spec:
+        return [dict(f) for f in DEFAULT_FORMATS]
+    formats = []
+    for item in spec.split(","):
+        parts = [p.strip() for p in item.split(":") if p.strip()]
+        if not parts:
+            continue
+        fmt = parts[0].lower().lstrip(".")
+        fmt = "jpg" if fmt == "jpeg" else fmt
+        if fmt not in PIL_FORMATS:
+            raise ValueError(f"Unsupported output format: {parts[0]}")
+        entry: Dict[str, Any] = {"format": fmt}
+        for opt in parts[1:]:
+            k, sep, v = opt.partition("=")
+            if not sep or not k.strip():
+                raise ValueError(f"Invalid option '{opt}' for {fmt} (expected key=value)")
+            entry[k.strip()] = _parse_value(v.strip())
+        formats.append(entry)
+    if not formats:
+        raise ValueError("No output formats given.")
+    return formats
+
+
+def encode_image(image: Image.Image, fp: Any, fmt: str, **options: Any) -> None:
+    # fp: a path or binary file object; options override the format's FORMAT_DEFAULTS
+    settings = dict(FORMAT_DEFAULTS.get(fmt, {}))
+    settings.update(options)
+    image.save(fp, PIL_FORMATS[fmt], **settings)
+
+
+def _target_size(image: Image.Image, spec: Dict[str, Any]) -> Tuple[int, int]:
+    w, h = image.size
+    if spec.get("width"):
+        new_w = min(w, int(spec["width"]))
+    elif spec.get("scale"):
+        new_w = min(w, int(w * float(spec["scale"])))
+    else:
+        return (w, h)
+    return (max(1, new_w), max(1, round(h * new_w / w)))
+
+
+def save_outputs(
+    image: Image.Image,
+    output_dir: str,
+    base_name: str,
+    formats: Optional[List[Dict[str, Any]]] = None,
+) -> List[str]:
+    formats = formats or DEFAULT_FORMATS
+    os.makedirs(output_dir, exist_ok=True)
+
+    variants: Dict[Tuple[int, int], Image.Image] = {image.size: image}
+    paths = []
+    for spec in formats:
+        fmt = spec["format"]
+        size = _target_size(image, spec)
+        if size not in variants:
+            variants[size] = image.resize(size, Image.LANCZOS)
+        encoded = variants[size]
+
+        options = {k: v for k, v in spec.items() if k not in ("format", "width", "scale")}
+        if fmt == "pdf" and encoded.size != image.size:
+            # keep the printed page size constant when a PDF is downscaled
+            resolution = options.get("resolution", FORMAT_DEFAULTS["pdf"]["resolution"])
+            options["resolution"] = float(resolution) * encoded.width / image.width
+        if fmt == "pdf":
+            # Pillow titles a PDF after the file it writes; spelled out so in-memory encodes match
+            options.setdefault("title", base_name)
+
+        path = os.path.join(output_dir, f"{base_name}.{fmt}")
+        encode_image(encoded, path, fmt, **options)
+        paths.append(path)
+    return paths
+
+
+def save_thumbnail(image: Image.Image, output_dir: str, base_name: str, width: int = THUMB_WIDTH) -> str:
+    thumb_dir = os.path.join(output_dir, THUMB_DIR)
+    os.makedirs(thumb_dir, exist_ok=True)
+    # box-reduce by an integer factor first, then a short resample; far cheaper than
+    # resampling (or copying) the full-size render
+    factor = max(1, image.width // (width * 2))
+    thumb = image.reduce(factor) if factor > 1 else image.copy()
+    thumb.thumbnail((width, width), Image.BILINEAR)
+    path = os.path.join(thumb_dir, f"{base_name}.jpg")
+    thumb.convert("RGB").save(path, "JPEG", quality=THUMB_QUALITY)
+    return path
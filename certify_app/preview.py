@@ -0,0 +1,86 @@
+from typing import Dict, Optional, Any
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from .certificate import render_certificate
+
+PREVIEW_SCALE = 0.24
+PREVIEW_DEBOUNCE_MS = 300
+
+
+def pil_to_qimage(image) -> QImage:
+    image = image.convert("RGB")
+    data = image.tobytes("raw", "RGB")
+    # copy(): QImage must not outlive the Python bytes buffer it wraps
+    return QImage(data, image.width, image.height, 3 * image.width, QImage.Format_RGB888).copy()
+
+
+class _PreviewSignals(QObject):
+    finished = pyqtSignal(int, object)
+
+
+class _PreviewJob(QRunnable):
+    def __init__(self, request_id: int, params: Dict[str, Any], signals: _PreviewSignals):
+        super().__init__()
+        self.request_id = request_id
+        self.params = params
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = pil_to_qimage(render_certificate(scale=PREVIEW_SCALE, **self.params))
+        except Exception as e:
+            result = e
+        self.signals.finished.emit(self.request_id, result)
+
+
+class PreviewRenderer(QObject):
+    # Debounces requests, renders on a single background thread and drops stale results:
+    # while a render is running only the newest pending request is kept, so fast typing
+    # costs at most one extra thumbnail render.
+    ready = pyqtSignal(QPixmap)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent: Optional[QObject] = None, debounce_ms: int = PREVIEW_DEBOUNCE_MS):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._start_latest)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _PreviewSignals()
+        self._signals.finished.connect(self._on_finished)
+
+        self._latest_id = 0
+        self._pending: Optional[Dict[str, Any]] = None
+        self._running = False
+
+    def request(self, params: Dict[str, Any]) -> None:
+        self._latest_id += 1
+        self._pending = params
+        self._timer.start()  # restarts the debounce window
+
+    def _start_latest(self) -> None:
+        if self._running or self._pending is None:
+            return
+        params, self._pending = self._pending, None
+        self._running = True
+        self._pool.start(_PreviewJob(self._latest_id, params, self._signals))
+
+    def _on_finished(self, request_id: int, result: object) -> None:
+        self._running = False
+        if request_id == self._latest_id:
+            if isinstance(result, Exception):
+                self.failed.emit(f"{type(result).__name__}: {result}")
+            else:
+                self.ready.emit(QPixmap.fromImage(result))
+        if self._pending is not None and not self._timer.isActive():
+            self._start_latest()
+
+    def shutdown(self) -> None:
+        self._timer.stop()
+        self._pending = None
+        self._pool.waitForDone(2000)
@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import tracemalloc
+from collections import Counter
+from typing import List, Dict, Optional, Any
+
+try:
+    import psutil
+except ImportError:  # optional; /proc/self/statm is read on Linux instead
+    psutil = None
+
+# Opt-in batch profiling (CLI --profile, the GUI checkbox, or CERTIFY_PROFILE=1 for watchers
+# and spool workers). Each profiled batch writes <run>/.profile/<batch>/:
+#   cpu.folded   sampled Python stacks, one "a;b;c count" line each (flamegraph / speedscope)
+#   cpu_top.txt  functions by share of samples (self and inclusive)
+#   memory.txt   tracemalloc growth during the batch and since the previous profiled batch
+#   summary.json the numbers shown in the log
+# tracemalloc stays on for the rest of the process once a profiled batch has run, so the
+# between-batch diff covers everything allocated in between; stop_profiling() turns it off.
+
+PROFILE_ENV = "CERTIFY_PROFILE"
+PROFILE_DIR = ".profile"
+SAMPLE_INTERVAL = 0.005
+TRACE_FRAMES = 8
+TOP_LINES = 25
+
+_LAST_SNAPSHOT: Dict[str, Any] = {"snapshot": None}
+_LOCK = threading.Lock()
+
+
+def profiling_requested() -> bool:
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def rss_bytes() -> Optional[int]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def stop_profiling() -> None:
+    with _LOCK:
+        _LAST_SNAPSHOT["snapshot"] = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class StackSampler(threading.Thread):
+    # Samples one thread's Python stack every `interval` seconds. Frames are only visible
+    # while the sampled thread does not hold the GIL inside a C call, which is also when
+    # Pillow does most of its work, so hot spots show up as their calling Python frames.
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),  # the sampler's own bookkeeping
+        tracemalloc.Filter(False, "*/linecache.py"),  # source lines read while writing memory.txt
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def _growth(new: tracemalloc.Snapshot, old: tracemalloc.Snapshot) -> List[tracemalloc.StatisticDiff]:
+    return [s for s in new.compare_to(old, "lineno") if s.size_diff]
+
+
+def _where(stat: tracemalloc.StatisticDiff) -> str:
+    frame = stat.traceback[0]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+def _top_functions(stacks: Counter, samples: int, limit: int = TOP_LINES) -> List[List[Any]]:
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for name in set(frames):
+            total[name] += count
+    return [[name, count / samples, total[name] / samples] for name, count in own.most_common(limit)]
+
+
+class BatchProfiler:
+    def __init__(self, output_dir: str):
+        self.dir = os.path.join(
+            output_dir, PROFILE_DIR, f"batch-{socket.gethostname()}-{os.getpid()}-{time.time_ns()}"
+        )
+        self.sampler: Optional[StackSampler] = None
+
+    def start(self) -> None:
+        with _LOCK:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        self.rss_start = rss_bytes()
+        self.start_snapshot = _snapshot()
+        self.started = time.perf_counter()
+        self.sampler = StackSampler(threading.get_ident())
+        self.sampler.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self.sampler.stop()
+        seconds = time.perf_counter() - self.started
+        end = _snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        with _LOCK:
+            previous = _LAST_SNAPSHOT["snapshot"]
+            _LAST_SNAPSHOT["snapshot"] = end
+
+        during = _growth(end, self.start_snapshot)
+        since_last = _growth(end, previous) if previous is not None else []
+        samples = max(1, self.sampler.samples)
+        top = _top_functions(self.sampler.stacks, samples)
+
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, "cpu.folded"), "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(self.dir, "cpu_top.txt"), "w", encoding="utf-8") as f:
+            f.write(f"{self.sampler.samples} samples every {SAMPLE_INTERVAL * 1000:.0f} ms over {seconds:.1f}s\n")
+            f.write(f"{'self':>7} {'total':>7}  function\n")
+            for name, own, total in top:
+                f.write(f"{own:7.1%} {total:7.1%}  {name}\n")
+        with open(os.path.join(self.dir, "memory.txt"), "w", encoding="utf-8") as f:
+            for title, stats in (("Growth during this batch", during),
+                                 ("Growth since the previous profiled batch", since_last if previous is not None else None)):
+                f.write(f"== {title} ==\n")
+                if stats is None:
+                    f.write("(first profiled batch in this process)\n\n")
+                    continue
+                for stat in stats[:TOP_LINES]:
+                    f.write(f"{stat}\n")
+                for stat in stats[:3]:
+                    f.write(f"\n{_where(stat)} allocated from:\n")
+                    f.write("\n".join(f"  {line}" for line in stat.traceback.format()) + "\n")
+                f.write("\n")
+
+        summary = {
+            "dir": self.dir,
+            "seconds": seconds,
+            "samples": self.sampler.samples,
+            "top": [[name, own] for name, own, _total in top[:5]],
+            "rss_start": self.rss_start,
+            "rss_end": rss_bytes(),
+            "traced_peak": peak,
+            "growth": sum(s.size_diff for s in during),
+            "since_last": sum(s.size_diff for s in since_last) if previous is not None else None,
+            "top_growth": [[_where(s), s.size_diff] for s in (since_last or during) if s.size_diff > 0][:3],
+        }
+        with open(os.path.join(self.dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def format_profile(summary: Dict[str, Any]) -> List[str]:
+    mb = 1024 * 1024
+
+    def size(n: Optional[int]) -> str:
+        return "n/a" if n is None else f"{n / mb:.1f} MB"
+
+    hot = ", ".join(f"{name.split(':', 1)[-1]} {share:.0%}" for name, share in summary["top"]) or "no samples"
+    memory = f"Profile memory: RSS {size(summary['rss_start'])} → {size(summary['rss_end'])}, traced peak {size(summary['traced_peak'])}"
+    if summary["since_last"] is not None:
+        memory += f", {summary['since_last'] / mb:+.1f} MB kept since previous profiled batch"
+    else:
+        memory += f", {summary['growth'] / mb:+.1f} MB kept during this batch"
+    if summary["top_growth"]:
+        memory += " (top: " + ", ".join(f"{where} {n / mb:+.2f} MB" for where, n in summary["top_growth"]) + ")"
+    return [
+        f"Profile CPU: {summary['samples']} samples over {summary['seconds']:.1f}s; hottest: {hot}",
+        memory,
+        f"Profile files: {summary['dir']}",
+    ]
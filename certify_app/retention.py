@@ -0,0 +1,267 @@
+import os
+import re
+import time
+import shutil
+import threading
+from typing import List, Dict, Optional, Callable, Any
+
+from .config import EVENTS_DIR, BACKUP_DIR, RETENTION_KEEP_LAST, RETENTION_MAX_BYTES, RETENTION_MIN_AGE
+from .helpers import file_digest, load_event_metadata, sanitize_folder_name
+from .storage import is_event_dir, cleanup_lock, LockTimeout
+
+RUN_PATTERN = re.compile(r"^\d{8}_\d{6}(_\d+)?$")
+DEFAULT_SCAN_INTERVAL = 15 * 60
+
+
+def _walk_files(root: str) -> List[str]:
+    # Certificate files only: dot-directories (.thumbs/, .profile/) are neither counted nor deduplicated.
+    out = []
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        out.extend(os.path.join(dirpath, f) for f in files)
+    return out
+
+
+def _disk_bytes(paths: List[str], seen: Optional[set] = None) -> int:
+    # Hard-linked copies share an inode and only count once.
+    seen = seen if seen is not None else set()
+    total = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino)
+        if key not in seen:
+            seen.add(key)
+            total += st.st_size
+    return total
+
+
+def list_runs(event_path: str, backup_dir: str = BACKUP_DIR) -> List[Dict[str, Any]]:
+    # Timestamped certificate runs and their backups, oldest first. "live" (watcher output)
+    # and other non-timestamp folders are never touched.
+    runs: Dict[str, Dict[str, Any]] = {}
+    cert_root = os.path.join(event_path, "certificates")
+    if os.path.isdir(cert_root):
+        for name in os.listdir(cert_root):
+            path = os.path.join(cert_root, name)
+            if RUN_PATTERN.match(name) and os.path.isdir(path):
+                runs.setdefault(name, {"timestamp": name, "paths": []})["paths"].append(path)
+
+    prefix = re.compile(rf"^backup_{re.escape(sanitize_folder_name(os.path.basename(event_path)))}_(\d{{8}}_\d{{6}}(?:_\d+)?)$")
+    if os.path.isdir(backup_dir):
+        for name in os.listdir(backup_dir):
+            m = prefix.match(name)
+            path = os.path.join(backup_dir, name)
+            if m and os.path.isdir(path):
+                runs.setdefault(m.group(1), {"timestamp": m.group(1), "paths": []})["paths"].append(path)
+
+    out = []
+    for ts in sorted(runs):
+        run = runs[ts]
+        run["files"] = [f for p in run["paths"] for f in _walk_files(p)]
+        run["bytes"] = _disk_bytes(run["files"])
+        run["mtime"] = max([os.path.getmtime(p) for p in run["paths"] + run["files"]])
+        out.append(run)
+    return out
+
+
+def event_policy(event_path: str) -> Dict[str, Any]:
+    policy = {"keep_last": RETENTION_KEEP_LAST, "max_bytes": RETENTION_MAX_BYTES}
+    stored = load_event_metadata(event_path).get("retention")
+    if isinstance(stored, dict):
+        policy.update({k: stored[k] for k in ("keep_last", "max_bytes") if k in stored})
+    return policy
+
+
+def plan_retention(
+    event_path: str,
+    keep_last: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    dedupe: bool = True,
+    backup_dir: str = BACKUP_DIR,
+    min_age: float = RETENTION_MIN_AGE,
+) -> Dict[str, Any]:
+    now = time.time()
+    runs = list_runs(event_path, backup_dir)
+    # Runs still being written (or just finished) are left alone entirely.
+    settled = [r for r in runs if now - r["mtime"] >= min_age]
+    newest = runs[-1]["timestamp"] if runs else None
+
+    delete: List[Dict[str, Any]] = []
+    candidates = [r for r in settled if r["timestamp"] != newest]
+    if keep_last is not None:
+        keep_last = max(1, int(keep_last))
+        excess = len(runs) - keep_last
+        delete.extend(candidates[:max(0, excess)])
+        candidates = candidates[max(0, excess):]
+
+    kept = [r for r in runs if r not in delete]
+    if max_bytes is not None:
+        seen: set = set()
+        total = sum(_disk_bytes(r["files"], seen) for r in kept)
+        for run in candidates:
+            if total <= max_bytes:
+                break
+            delete.append(run)
+            kept.remove(run)
+            seen = set()
+            total = sum(_disk_bytes(r["files"], seen) for r in kept)
+
+    links: List[List[str]] = []
+    if dedupe:
+        links = _plan_links([r for r in kept if r in settled])
+
+    seen = set()
+    before = sum(_disk_bytes(r["files"], seen) for r in runs)
+    freed = sum(_disk_bytes(r["files"], set()) for r in delete)
+    freed += sum(os.path.getsize(dup) for dup, _ in links)
+    return {
+        "event_path": event_path,
+        "runs": len(runs),
+        "bytes": before,
+        "delete": [{"timestamp": r["timestamp"], "paths": r["paths"], "bytes": r["bytes"]} for r in delete],
+        "links": links,
+        "bytes_freed": min(freed, before),
+    }
+
+
+def _plan_links(runs: List[Dict[str, Any]]) -> List[List[str]]:
+    # Group by size first; only same-size files are hashed.
+    by_size: Dict[int, List[str]] = {}
+    for run in runs:
+        for path in run["files"]:
+            try:
+                by_size.setdefault(os.path.getsize(path), []).append(path)
+            except OSError:
+                continue
+
+    links = []
+    for size, paths in by_size.items():
+        if size == 0 or len(paths) < 2:
+            continue
+        canonical: Dict[str, str] = {}
+        for path in paths:
+            digest = file_digest(path)
+            first = canonical.setdefault(digest, path)
+            if first != path and not os.path.samefile(first, path):
+                links.append([path, first])
+    return links
+
+
+def apply_plan(plan: Dict[str, Any], log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    log = log or (lambda _msg: None)
+    deleted = linked = 0
+    for run in plan["delete"]:
+        for path in run["paths"]:
+            try:
+                shutil.rmtree(path)
+                deleted += 1
+                log(f"Removed old run: {path}")
+            except Exception as e:
+                log(f"[FAILED] Remove {path}: {e}")
+
+    for dup, canonical in plan["links"]:
+        tmp = f"{dup}.link-tmp"
+        try:
+            os.link(canonical, tmp)
+            os.replace(tmp, dup)
+            linked += 1
+        except OSError as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            log(f"[WARN] Could not deduplicate {dup}: {e}")
+            break  # filesystem without hard links; no point trying the rest
+    if linked:
+        log(f"Deduplicated {linked} identical file(s).")
+    return {"deleted": deleted, "linked": linked}
+
+
+def apply_retention(event_path: str, log: Optional[Callable[[str], None]] = None,
+                    **policy: Any) -> Optional[Dict[str, Any]]:
+    # Plans and applies under the event's exclusive run lock, so no batch, spool worker or watcher
+    # is writing into the runs being linked or removed. A busy event is skipped (None) until the next scan.
+    log = log or (lambda _msg: None)
+    try:
+        with cleanup_lock(event_path):
+            plan = plan_retention(event_path, **policy)
+            if plan["delete"] or plan["links"]:
+                log(format_plan(plan))
+                plan["result"] = apply_plan(plan, log)
+            return plan
+    except LockTimeout:
+        log(f"[WARN] {os.path.basename(event_path)}: event is busy (certificates are being generated); cleanup skipped.")
+        return None
+
+
+def format_plan(plan: Dict[str, Any]) -> str:
+    name = os.path.basename(plan["event_path"])
+    mb = 1024 * 1024
+    return (
+        f"{name}: {plan['runs']} run(s), {plan['bytes'] / mb:.1f} MB | "
+        f"remove {len(plan['delete'])} run(s), deduplicate {len(plan['links'])} file(s), "
+        f"frees ~{plan['bytes_freed'] / mb:.1f} MB"
+    )
+
+
+def list_event_paths(events_dir: str = EVENTS_DIR) -> List[str]:
+    if not os.path.isdir(events_dir):
+        return []
+    return [
+        os.path.join(events_dir, d) for d in sorted(os.listdir(events_dir))
+        if is_event_dir(events_dir, d)
+    ]
+
+
+def scan_events(
+    events_dir: str = EVENTS_DIR,
+    apply: bool = False,
+    keep_last: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    dedupe: bool = True,
+    log: Optional[Callable[[str], None]] = None,
+) -> List[Dict[str, Any]]:
+    # Explicit keep_last/max_bytes override every event; otherwise each event's own policy applies.
+    log = log or (lambda _msg: None)
+    plans = []
+    for event_path in list_event_paths(events_dir):
+        policy = event_policy(event_path)
+        policy = {
+            "keep_last": keep_last if keep_last is not None else policy["keep_last"],
+            "max_bytes": max_bytes if max_bytes is not None else policy["max_bytes"],
+            "dedupe": dedupe,
+        }
+        if apply:
+            plan = apply_retention(event_path, log, **policy)
+            if plan is None:
+                continue
+        else:
+            plan = plan_retention(event_path, **policy)
+            if plan["delete"] or plan["links"]:
+                log("[dry-run] " + format_plan(plan))
+        plans.append(plan)
+    return plans
+
+
+class RetentionScanner(threading.Thread):
+    # Periodically applies each event's retention policy in the background.
+    def __init__(self, events_dir: str = EVENTS_DIR, interval: float = DEFAULT_SCAN_INTERVAL,
+                 dedupe: bool = True, log: Optional[Callable[[str], None]] = None):
+        super().__init__(daemon=True)
+        self.events_dir = events_dir
+        self.interval = interval
+        self.dedupe = dedupe
+        self.log = log or (lambda _msg: None)
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                scan_events(self.events_dir, apply=True, dedupe=self.dedupe, log=self.log)
+            except Exception as e:
+                self.log(f"[FAILED] Retention scan: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -0,0 +1,215 @@
+import io
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional, Callable, Tuple
+from urllib.parse import urlparse, parse_qs, unquote, quote
+
+import pandas as pd
+
+from .config import EVENTS_DIR
+from .helpers import sanitize_folder_name, safe_filename, load_event_settings
+from .cache import get_default_cache
+from .outputs import encode_image
+from .certificate import render_certificate, base_layer_key
+from .texts import texts_for_template
+
+DEFAULT_WORKERS = 4
+DEFAULT_PDF_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class NotFound(Exception):
+    pass
+
+
+class CertificateService:
+    def __init__(
+        self,
+        events_dir: str = EVENTS_DIR,
+        workers: int = DEFAULT_WORKERS,
+        pdf_cache_bytes: int = DEFAULT_PDF_CACHE_BYTES,
+        allow_unlisted: bool = False,
+    ):
+        self.events_dir = events_dir
+        self.allow_unlisted = allow_unlisted
+        self.pdf_cache_bytes = pdf_cache_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="certify-render")
+        self._pdfs: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._pdf_bytes = 0
+        self._participants: Dict[str, Tuple[Tuple[float, int], pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _event_path(self, event: str) -> str:
+        folder = sanitize_folder_name(event)
+        path = os.path.join(self.events_dir, folder)
+        if not folder or not os.path.isdir(path):
+            raise NotFound(f"Unknown event: {event}")
+        return path
+
+    def _participants_frame(self, event_path: str) -> pd.DataFrame:
+        # participants.csv with names stripped, re-read only when the file changes
+        csv_path = os.path.join(event_path, "participants.csv")
+        try:
+            st = os.stat(csv_path)
+        except FileNotFoundError:
+            return pd.DataFrame({"name": []})
+        stamp = (st.st_mtime, st.st_size)
+        with self._lock:
+            cached = self._participants.get(event_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        df = pd.read_csv(csv_path)
+        if "name" not in df.columns:
+            df["name"] = ""
+        df["name"] = df["name"].astype("string").fillna("").str.strip()
+        with self._lock:
+            self._participants[event_path] = (stamp, df)
+        return df
+
+    def _participant_fields(self, frame: pd.DataFrame, name: str, settings: Dict) -> Dict[str, str]:
+        # the layout's per-participant texts for this name's first row, as batch output draws them
+        rows = frame[frame["name"] == name].head(1)
+        if rows.empty:
+            return {}
+        context = {k: settings[k] for k in ("event_title", "event_org", "event_dates")}
+        texts = texts_for_template(rows, settings["template"], len(settings["signatories"]), context)
+        return {key: values[0] for key, values in texts.items()}
+
+    def _remember(self, key: Tuple, pdf: bytes) -> None:
+        with self._lock:
+            if key in self._pdfs:
+                return
+            self._pdfs[key] = pdf
+            self._pdf_bytes += len(pdf)
+            while self._pdf_bytes > self.pdf_cache_bytes and self._pdfs:
+                _, old = self._pdfs.popitem(last=False)
+                self._pdf_bytes -= len(old)
+
+    def _render_pdf(self, name: str, settings: Dict, fields: Dict[str, str]) -> bytes:
+        image = render_certificate(
+            name,
+            settings["event_title"], settings["event_org"], settings["event_dates"],
+            settings["template"], settings["signatories"],
+            cache=get_default_cache(),
+            fields=fields,
+        )
+        buf = io.BytesIO()
+        # same encoder settings as batch PDFs, so a served file hashes like the indexed one
+        encode_image(image, buf, "pdf", title=safe_filename(name))
+        return buf.getvalue()
+
+    def certificate_pdf(self, event: str, name: str) -> bytes:
+        name = (name or "").strip()
+        if not name:
+            raise NotFound("Missing participant name.")
+        event_path = self._event_path(event)
+        frame = self._participants_frame(event_path)
+        if not self.allow_unlisted and not (frame["name"] == name).any():
+            raise NotFound(f"'{name}' is not registered for this event.")
+
+        settings = load_event_settings(event_path)
+        if not settings["template"] or not settings["signatories"]:
+            raise NotFound("Event has no saved template/signatories yet.")
+        fields = self._participant_fields(frame, name, settings)
+
+        # base-layer key and the row's texts in the cache key: edits to event.json or to this
+        # participant's participants.csv columns invalidate cached PDFs
+        layer = base_layer_key(
+            settings["event_title"], settings["event_org"], settings["event_dates"],
+            settings["template"], settings["signatories"],
+        )
+        key = (event_path, name, layer, tuple(sorted(fields.items())))
+        with self._lock:
+            pdf = self._pdfs.get(key)
+            if pdf is not None:
+                self._pdfs.move_to_end(key)
+                self.hits += 1
+                return pdf
+            self.misses += 1
+
+        # bounded pool: at most `workers` renders run at once, the rest queue here
+        pdf = self._executor.submit(self._render_pdf, name, settings, fields).result()
+        self._remember(key, pdf)
+        return pdf
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cached": len(self._pdfs), "cached_bytes": self._pdf_bytes}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def content_disposition(name: str) -> str:
+    # http.server encodes headers as Latin-1, so non-ASCII names go in the RFC 5987 filename*
+    # parameter and the plain filename gets an ASCII approximation for older clients
+    filename = f"{safe_filename(name)}.pdf"
+    ascii_stem = unicodedata.normalize("NFKD", safe_filename(name)).encode("ascii", "ignore").decode("ascii")
+    fallback = f"{ascii_stem.strip('_.') or 'certificate'}.pdf"
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def make_handler(service: CertificateService, log: Optional[Callable[[str], None]] = None):
+    log = log or (lambda _msg: None)
+
+    class CertificateHandler(BaseHTTPRequestHandler):
+        # GET /events/<event>/certificate?name=<participant>
+        # GET /health
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+
+            if parts == ["health"]:
+                stats = service.stats()
+                body = ", ".join(f"{k}={v}" for k, v in stats.items()).encode("utf-8")
+                return self._send(200, body, "text/plain; charset=utf-8")
+
+            if len(parts) == 3 and parts[0] == "events" and parts[2] == "certificate":
+                name = parse_qs(url.query).get("name", [""])[0]
+                try:
+                    pdf = service.certificate_pdf(parts[1], name)
+                except NotFound as e:
+                    return self._send(404, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+                except Exception as e:
+                    log(f"[FAILED] {parts[1]} / {name}: {type(e).__name__}: {e}")
+                    return self._send(500, b"Failed to render certificate.", "text/plain; charset=utf-8")
+                headers = {"Content-Disposition": content_disposition(name)}
+                return self._send(200, pdf, "application/pdf", headers)
+
+            return self._send(404, b"Not found.", "text/plain; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            log(f"{self.address_string()} {fmt % args}")
+
+    return CertificateHandler
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    service: Optional[CertificateService] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> None:
+    service = service or CertificateService()
+    httpd = ThreadingHTTPServer((host, port), make_handler(service, log))
+    if log:
+        log(f"Serving certificates on http://{host}:{port}/events/<event>/certificate?name=<participant>")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        service.shutdown()
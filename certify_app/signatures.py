@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple, Optional
+
+import numpy as np
+from PIL import Image
+
+from .helpers import file_digest
+from .cache import RenderCache, cache_key
+
+# Pixels whose darkest channel is at or above this value are treated as paper.
+WHITE_THRESHOLD = 235
+# Width of the alpha ramp below WHITE_THRESHOLD (keeps anti-aliased ink edges smooth).
+KEY_SOFTNESS = 40
+
+# Keyed by (file digest, width); bounded because every uploaded or edited signature adds entries.
+SIGNATURE_MEMORY_SLOTS = 32
+_SIGNATURE_CACHE: "OrderedDict[Tuple[str, int], Image.Image]" = OrderedDict()
+_SIGNATURE_LOCK = threading.Lock()
+
+
+def _remember(key: Tuple[str, int], image: Image.Image) -> None:
+    with _SIGNATURE_LOCK:
+        _SIGNATURE_CACHE[key] = image
+        _SIGNATURE_CACHE.move_to_end(key)
+        while len(_SIGNATURE_CACHE) > SIGNATURE_MEMORY_SLOTS:
+            _SIGNATURE_CACHE.popitem(last=False)
+
+
+def key_background(image: Image.Image, threshold: int = WHITE_THRESHOLD, softness: int = KEY_SOFTNESS) -> Image.Image:
+    arr = np.array(image.convert("RGBA"), dtype=np.uint8)
+    darkest = arr[..., :3].min(axis=2).astype(np.int32)
+    # 255 for ink, 0 for near-white paper, linear in between
+    ramp = np.clip((threshold - darkest) * 255 // max(1, softness), 0, 255).astype(np.uint8)
+    arr[..., 3] = np.minimum(arr[..., 3], ramp)
+    return Image.fromarray(arr, "RGBA")
+
+
+def trim_whitespace(image: Image.Image) -> Image.Image:
+    bbox = image.getchannel("A").getbbox()
+    if not bbox:
+        return image
+    return image.crop(bbox)
+
+
+def prepare_signature(signature_path: str, target_width: int, cache: Optional[RenderCache] = None) -> Image.Image:
+    target_width = max(1, int(target_width))
+    key = (file_digest(signature_path), target_width)
+    with _SIGNATURE_LOCK:
+        cached = _SIGNATURE_CACHE.get(key)
+        if cached is not None:
+            _SIGNATURE_CACHE.move_to_end(key)
+    if cached is not None:
+        if cache is not None:
+            cache.count_memory_hit()
+        return cached
+
+    disk_key = cache_key("sig", {"digest": key[0], "width": target_width})
+    if cache is not None:
+        cached = cache.get_image(disk_key)
+        if cached is not None:
+            _remember(key, cached)
+            return cached
+
+    with Image.open(signature_path) as src:
+        s_img = trim_whitespace(key_background(src))
+
+    ratio = target_width / max(1, s_img.width)
+    new_height = max(1, int(s_img.height * ratio))
+    s_img = s_img.resize((target_width, new_height))
+    _remember(key, s_img)
+    if cache is not None:
+        cache.put_image(disk_key, s_img)
+    return s_img
+
+
+def clear_signature_cache() -> None:
+    with _SIGNATURE_LOCK:
+        _SIGNATURE_CACHE.clear()
@@ -0,0 +1,315 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import subprocess
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Any
+
+from .helpers import write_json_atomic
+from .storage import run_lock, new_run_dir
+from .batch import generate_batch
+from .layout import layout_path_for
+
+# Spool layout (lives inside the event folder so it sits on the same shared drive):
+#   events/<event>/spool/<run_id>/
+#       job.json            event parameters, asset names, output folder
+#       assets/             template + signatures copied for every host to read
+#       pending/<shard>     unclaimed shards (JSON list of [name, output file stem(, {field: text})])
+#       leased/<shard>      claimed shards; mtime is the lease heartbeat
+#       done/<shard>        completion markers with the shard's report
+SPOOL_SUBDIR = "spool"
+DEFAULT_SHARD_SIZE = 100
+DEFAULT_LEASE_TIMEOUT = 300.0
+
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _copy_asset(src: Optional[str], assets_dir: str, prefix: str) -> Optional[str]:
+    if not src or not os.path.exists(src):
+        return None
+    name = f"{prefix}_{os.path.basename(src)}"
+    shutil.copy(src, os.path.join(assets_dir, name))
+    return name
+
+
+def create_spool(
+    event_path: str,
+    names: List[str],
+    event_title: str,
+    event_org: str,
+    event_dates: str,
+    template_path: str,
+    signatories: List[Dict],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    run_id: Optional[str] = None,
+    print_ids: bool = False,
+    formats: Optional[List[Dict]] = None,
+    file_stems: Optional[List[str]] = None,
+    field_texts: Optional[Dict[str, List[str]]] = None,
+    profile: bool = False,
+) -> str:
+    # new_run_dir reserves certificates/<run_id>, so a batch started in the same second gets its own folder
+    run_id = run_id or os.path.basename(new_run_dir(event_path))
+    spool_dir = os.path.join(event_path, SPOOL_SUBDIR, run_id)
+    assets_dir = os.path.join(spool_dir, "assets")
+    for sub in ("assets", "pending", "leased", "done"):
+        os.makedirs(os.path.join(spool_dir, sub), exist_ok=True)
+
+    template = _copy_asset(template_path, assets_dir, "template")
+    if template and os.path.exists(layout_path_for(template_path)):
+        # the layout travels with the template copy, or workers would fall back to the default
+        shutil.copy(layout_path_for(template_path), layout_path_for(os.path.join(assets_dir, template)))
+
+    job = {
+        "event_title": event_title,
+        "event_org": event_org,
+        "event_dates": event_dates,
+        "template": template,
+        "signatories": [
+            {
+                "name": s.get("name", ""),
+                "position": s.get("position", ""),
+                "signature": _copy_asset(s.get("signature_path"), assets_dir, f"sig{i}"),
+            }
+            for i, s in enumerate(signatories)
+        ],
+        # relative to the spool dir, so hosts with different mount points agree
+        "output_dir": os.path.join("..", "..", "certificates", run_id),
+        "print_ids": bool(print_ids),
+        "profile": bool(profile),
+        "formats": formats,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    # stems are fixed up front so names in different shards can never overwrite each other
+    entries = [[n, stem] for n, stem in zip(names, file_stems)] if file_stems is not None else [[n, None] for n in names]
+    if field_texts:
+        for i, entry in enumerate(entries):
+            entry.append({key: texts[i] for key, texts in field_texts.items()})
+    shard_size = max(1, int(shard_size))
+    shards = 0
+    for start in range(0, len(entries), shard_size):
+        shard_name = f"shard_{shards:05d}.json"
+        write_json_atomic(os.path.join(spool_dir, "pending", shard_name), entries[start:start + shard_size])
+        shards += 1
+    job["shards"] = shards
+
+    # job.json last: workers ignore spools without it
+    write_json_atomic(os.path.join(spool_dir, "job.json"), job)
+    return spool_dir
+
+
+def load_job(spool_dir: str) -> Dict[str, Any]:
+    job = _read_json(os.path.join(spool_dir, "job.json"))
+    assets_dir = os.path.join(spool_dir, "assets")
+    template = job.get("template")
+    return {
+        "event_title": job.get("event_title", ""),
+        "event_org": job.get("event_org", ""),
+        "event_dates": job.get("event_dates", ""),
+        "template_path": os.path.join(assets_dir, template) if template else "",
+        "signatories": [
+            {
+                "name": s.get("name", ""),
+                "position": s.get("position", ""),
+                "signature_path": os.path.join(assets_dir, s["signature"]) if s.get("signature") else None,
+            }
+            for s in job.get("signatories", [])
+        ],
+        "output_dir": os.path.normpath(os.path.join(spool_dir, job["output_dir"])),
+        "shards": job.get("shards", 0),
+        "print_ids": job.get("print_ids", False),
+        "profile": job.get("profile", False),
+        "formats": job.get("formats"),
+    }
+
+
+def claim_shard(spool_dir: str) -> Optional[str]:
+    pending = os.path.join(spool_dir, "pending")
+    try:
+        candidates = sorted(n for n in os.listdir(pending) if n.endswith(".json"))
+    except FileNotFoundError:
+        return None
+    for shard_name in candidates:
+        leased = os.path.join(spool_dir, "leased", shard_name)
+        try:
+            # rename is atomic on one filesystem: exactly one worker wins the shard
+            os.rename(os.path.join(pending, shard_name), leased)
+        except (FileNotFoundError, PermissionError):
+            continue
+        os.utime(leased, None)
+        return shard_name
+    return None
+
+
+def complete_shard(spool_dir: str, shard_name: str, report: Dict[str, Any]) -> None:
+    marker = dict(report)
+    marker["worker"] = f"{socket.gethostname()}:{os.getpid()}"
+    marker["finished"] = datetime.now().isoformat(timespec="seconds")
+    write_json_atomic(os.path.join(spool_dir, "done", shard_name), marker)
+    try:
+        os.remove(os.path.join(spool_dir, "leased", shard_name))
+    except FileNotFoundError:
+        pass  # re-leased to someone else meanwhile; the done marker still wins
+
+
+def run_worker(
+    spool_dir: str,
+    log: Optional[Callable[[str], None]] = None,
+    idle_exit: bool = False,
+    poll_interval: float = 2.0,
+) -> int:
+    log = log or (lambda _msg: None)
+    # the coordinator writes job.json after the shards; a worker started earlier waits for it
+    while not os.path.exists(os.path.join(spool_dir, "job.json")):
+        if idle_exit:
+            log(f"No job.json in {spool_dir} yet; nothing to do.")
+            return 0
+        time.sleep(poll_interval)
+    job = load_job(spool_dir)
+    rendered = 0
+
+    while True:
+        shard_name = claim_shard(spool_dir)
+        if shard_name is None:
+            if idle_exit or is_complete(spool_dir):
+                return rendered
+            time.sleep(poll_interval)
+            continue
+
+        leased = os.path.join(spool_dir, "leased", shard_name)
+        entries = _read_json(leased)
+        log(f"Claimed {shard_name} ({len(entries)} names)")
+
+        def heartbeat(msg: str, leased=leased) -> None:
+            try:
+                os.utime(leased, None)
+            except FileNotFoundError:
+                pass
+            log(msg)
+
+        # event_path = <event>/spool/<run_id>/../..; holding the run lock keeps the event from being deleted mid-shard
+        with run_lock(os.path.dirname(os.path.dirname(os.path.abspath(spool_dir))), timeout=None):
+            report = generate_batch(
+                [e[0] for e in entries],
+                event_title=job["event_title"],
+                event_org=job["event_org"],
+                event_dates=job["event_dates"],
+                template_path=job["template_path"],
+                output_dir=job["output_dir"],
+                signatories=job["signatories"],
+                log=heartbeat,
+                print_ids=job["print_ids"],
+                formats=job["formats"],
+                file_stems=[e[1] for e in entries],
+                field_texts=_shard_field_texts(entries),
+                profile=job["profile"] or None,
+            )
+        report["outputs"] = [os.path.basename(p) for p in report["outputs"]]
+        complete_shard(spool_dir, shard_name, report)
+        rendered += 1
+
+
+def _shard_field_texts(entries: List[List[Any]]) -> Dict[str, List[str]]:
+    # entries are [name, stem] or [name, stem, {field: text}]
+    fields = [e[2] if len(e) > 2 else {} for e in entries]
+    keys = sorted({key for f in fields for key in f})
+    return {key: [f.get(key, "") for f in fields] for key in keys}
+
+
+def requeue_stalled(spool_dir: str, lease_timeout: float = DEFAULT_LEASE_TIMEOUT) -> List[str]:
+    leased_dir = os.path.join(spool_dir, "leased")
+    now = time.time()
+    requeued = []
+    try:
+        names = os.listdir(leased_dir)
+    except FileNotFoundError:
+        return requeued
+    for shard_name in names:
+        leased = os.path.join(leased_dir, shard_name)
+        if os.path.exists(os.path.join(spool_dir, "done", shard_name)):
+            try:
+                os.remove(leased)
+            except FileNotFoundError:
+                pass
+            continue
+        try:
+            if now - os.path.getmtime(leased) < lease_timeout:
+                continue
+            os.rename(leased, os.path.join(spool_dir, "pending", shard_name))
+            requeued.append(shard_name)
+        except FileNotFoundError:
+            continue
+    return requeued
+
+
+def spool_status(spool_dir: str) -> Dict[str, int]:
+    def count(sub: str) -> int:
+        try:
+            return sum(1 for n in os.listdir(os.path.join(spool_dir, sub)) if n.endswith(".json"))
+        except FileNotFoundError:
+            return 0
+    return {"pending": count("pending"), "leased": count("leased"), "done": count("done")}
+
+
+def is_complete(spool_dir: str) -> bool:
+    job = _read_json(os.path.join(spool_dir, "job.json"))
+    return spool_status(spool_dir)["done"] >= job.get("shards", 0)
+
+
+def assemble_run(spool_dir: str) -> Dict[str, Any]:
+    job = load_job(spool_dir)
+    done_dir = os.path.join(spool_dir, "done")
+    generated = failed = 0
+    seconds = 0.0
+    workers = set()
+    for shard_name in sorted(os.listdir(done_dir)):
+        if not shard_name.endswith(".json"):
+            continue
+        marker = _read_json(os.path.join(done_dir, shard_name))
+        generated += marker.get("generated", 0)
+        failed += marker.get("failed", 0)
+        seconds += marker.get("seconds", 0.0)
+        workers.add(marker.get("worker", ""))
+
+    report = {
+        "generated": generated,
+        "failed": failed,
+        "shards": job["shards"],
+        "workers": sorted(w for w in workers if w),
+        "render_seconds": seconds,
+        "output_dir": job["output_dir"],
+    }
+    os.makedirs(job["output_dir"], exist_ok=True)
+    write_json_atomic(os.path.join(spool_dir, "report.json"), report)
+    return report
+
+
+def spawn_local_workers(spool_dir: str, count: int) -> List[subprocess.Popen]:
+    cmd = [sys.executable, "-m", "certify_app", "worker", spool_dir]
+    return [subprocess.Popen(cmd) for _ in range(max(0, int(count)))]
+
+
+def coordinate(
+    spool_dir: str,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    poll_interval: float = 2.0,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    log = log or (lambda _msg: None)
+    last = None
+    while not is_complete(spool_dir):
+        for shard_name in requeue_stalled(spool_dir, lease_timeout):
+            log(f"Re-leased stalled shard: {shard_name}")
+        status = spool_status(spool_dir)
+        if status != last:
+            log(f"Spool status: {status}")
+            last = status
+        time.sleep(poll_interval)
+    return assemble_run(spool_dir)
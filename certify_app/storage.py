@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import random
+import shutil
+import socket
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Event storage shared by the GUI, CLI batches, spool workers and the watcher.
+#
+# Two advisory locks per event live in <events>/.locks/ (outside the event folder, so
+# deleting the folder cannot pull a lock out from under a waiter):
+#   "data" - held briefly and exclusively while event.json / participants.csv are rewritten.
+#            Readers need no lock: every write is a temp file + os.replace.
+#   "run"  - held shared by every generation run and exclusively by delete_event and retention
+#            cleanup, so runs are never removed or relinked while certificates are being written.
+
+LOCKS_DIR = ".locks"
+TRASH_PREFIX = ".deleting_"
+LOCK_TIMEOUT = 30.0
+LOCK_POLL = 0.05
+WIN_READER_SLOTS = 64
+METADATA_NAME = "event.json"
+PARTICIPANTS_NAME = "participants.csv"
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class ConflictError(RuntimeError):
+    pass
+
+
+def lock_path_for(event_path: str, kind: str) -> str:
+    event_path = os.path.normpath(event_path)
+    return os.path.join(os.path.dirname(event_path), LOCKS_DIR, f"{os.path.basename(event_path)}.{kind}.lock")
+
+
+def _win_lock(fd: int, offset: int, nbytes: int = 1) -> bool:
+    os.lseek(fd, offset, os.SEEK_SET)
+    try:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, nbytes)
+        return True
+    except OSError:
+        return False
+
+
+def _win_unlock(fd: int, offset: int, nbytes: int = 1) -> None:
+    os.lseek(fd, offset, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, nbytes)
+
+
+def _try_lock(fd: int, shared: bool) -> Optional[Tuple[int, int]]:
+    # Returns the locked (offset, length) range, or None if the lock is taken.
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+            return (0, 0)
+        except OSError:
+            return None
+
+    # Windows byte-range emulation: byte 0 is the writer gate, bytes 1..N are reader slots.
+    # A reader passes the gate and keeps one slot; a writer needs the gate and every slot.
+    if not _win_lock(fd, 0):
+        return None
+    if not shared:
+        if _win_lock(fd, 1, WIN_READER_SLOTS):
+            _win_unlock(fd, 0)
+            return (1, WIN_READER_SLOTS)
+        _win_unlock(fd, 0)
+        return None
+    try:
+        for slot in random.sample(range(1, WIN_READER_SLOTS + 1), WIN_READER_SLOTS):
+            if _win_lock(fd, slot):
+                return (slot, 1)
+        return None
+    finally:
+        _win_unlock(fd, 0)
+
+
+def _unlock(fd: int, locked: Tuple[int, int]) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        _win_unlock(fd, *locked)
+
+
+@contextmanager
+def event_lock(event_path: str, kind: str = "data", shared: bool = False,
+               timeout: Optional[float] = LOCK_TIMEOUT) -> Iterator[None]:
+    path = lock_path_for(event_path, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            locked = _try_lock(fd, shared)
+            if locked is not None:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise LockTimeout(f"Event is busy (another process holds its {kind} lock): {event_path}")
+            time.sleep(LOCK_POLL)
+        try:
+            yield
+        finally:
+            _unlock(fd, locked)
+    finally:
+        os.close(fd)
+
+
+def run_lock(event_path: str, timeout: Optional[float] = LOCK_TIMEOUT):
+    return event_lock(event_path, kind="run", shared=True, timeout=timeout)
+
+
+def cleanup_lock(event_path: str, timeout: Optional[float] = 0.0):
+    return event_lock(event_path, kind="run", shared=False, timeout=timeout)
+
+
+def atomic_write(path: str, write: Callable[[str], None]) -> None:
+    # write(tmp_path) produces the file; it only becomes visible under `path` once complete.
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_json(path: str, data: Any) -> None:
+    def write(tmp: str) -> None:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+    atomic_write(path, write)
+
+
+def read_metadata(event_path: str) -> Dict[str, Any]:
+    path = os.path.join(event_path, METADATA_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def update_metadata(event_path: str, fields: Dict[str, Any], expected_version: Optional[int] = None,
+                    replace: bool = False) -> Dict[str, Any]:
+    # Read-modify-write under the data lock. "version" increases on every write; pass
+    # expected_version to fail instead of overwriting a change made since it was read.
+    with event_lock(event_path, "data"):
+        try:
+            current = read_metadata(event_path)
+        except ValueError:
+            current = {}  # unreadable file from an older, non-atomic writer
+        version = int(current.get("version", 0))
+        if expected_version is not None and expected_version != version:
+            raise ConflictError(
+                f"event.json was changed by another process (version {version}, expected {expected_version})"
+            )
+        data = {} if replace else dict(current)
+        data.update(fields)
+        data["version"] = version + 1
+        write_json(os.path.join(event_path, METADATA_NAME), data)
+    return data
+
+
+def write_participants(event_path: str, df) -> None:
+    with event_lock(event_path, "data"):
+        atomic_write(os.path.join(event_path, PARTICIPANTS_NAME), lambda tmp: df.to_csv(tmp, index=False))
+
+
+def new_run_dir(event_path: str, subdir: str = "certificates") -> str:
+    # Timestamped output folder; a suffix keeps two runs started in the same second apart.
+    if not os.path.isdir(event_path):
+        raise FileNotFoundError(f"Event folder not found (deleted?): {event_path}")
+    parent = os.path.join(event_path, subdir)
+    os.makedirs(parent, exist_ok=True)
+    base = datetime.now().strftime("%Y%m%d_%H%M%S")
+    n = 1
+    while True:
+        path = os.path.join(parent, base if n == 1 else f"{base}_{n}")
+        try:
+            os.mkdir(path)
+            return path
+        except FileExistsError:
+            n += 1
+
+
+def delete_event(event_path: str, timeout: Optional[float] = LOCK_TIMEOUT) -> None:
+    # Waits for running generations, then renames the folder away atomically so other
+    # processes never see a half-deleted event; the slow rmtree happens afterwards.
+    event_path = os.path.normpath(event_path)
+    with event_lock(event_path, "run", timeout=timeout), event_lock(event_path, "data", timeout=timeout):
+        trash = os.path.join(
+            os.path.dirname(event_path),
+            f"{TRASH_PREFIX}{os.path.basename(event_path)}_{os.getpid()}_{int(time.time())}",
+        )
+        os.rename(event_path, trash)
+    shutil.rmtree(trash, ignore_errors=True)
+
+
+def is_event_dir(events_dir: str, name: str) -> bool:
+    # Skips .locks/ and folders that are being deleted.
+    return not name.startswith(".") and os.path.isdir(os.path.join(events_dir, name))
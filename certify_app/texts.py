@@ -0,0 +1,75 @@
+import os
+import string
+from typing import List, Dict, Any, Union, Tuple
+
+import pandas as pd
+from PIL import Image
+
+from .layout import DYNAMIC_FIELDS, EVENT_KEYS, get_placement_plan
+
+_FORMATTER = string.Formatter()
+
+# A compiled text is a list of literal strings (event placeholders already substituted) and
+# (column, conversion, format_spec) slots filled from participants.csv.
+Part = Union[str, Tuple[str, str, str]]
+
+
+def compile_text(text: str, context: Dict[str, Any]) -> List[Part]:
+    parts: List[Part] = []
+
+    def add(part: Part) -> None:
+        if isinstance(part, str) and parts and isinstance(parts[-1], str):
+            parts[-1] += part
+        elif part:
+            parts.append(part)
+
+    for literal, key, spec, conversion in _FORMATTER.parse(text or ""):
+        add(literal)
+        if key is None:
+            continue
+        if key in EVENT_KEYS:
+            add(format(_FORMATTER.convert_field(context.get(key, ""), conversion), spec or ""))
+        else:
+            add((key, conversion, spec or ""))
+    return parts
+
+
+def render_texts(parts: List[Part], frame: pd.DataFrame) -> List[str]:
+    # One string per row, built column by column instead of formatting row dicts.
+    out = pd.Series("", index=frame.index, dtype=object)
+    for part in parts:
+        if isinstance(part, str):
+            out = out + part
+            continue
+        key, conversion, spec = part
+        if key not in frame.columns:
+            continue  # reported by the pre-flight check; left blank
+        column = frame[key]
+        if conversion or spec:
+            values = pd.Series(
+                [format(_FORMATTER.convert_field(v, conversion), spec) if pd.notna(v) else "" for v in column],
+                index=frame.index, dtype=object,
+            )
+        else:
+            values = column.astype("string").fillna("").str.strip().astype(object)
+        out = out + values
+    # an empty cell must not leave a double space behind
+    return out.str.replace(r"\s+", " ", regex=True).str.strip().tolist()
+
+
+def participant_texts(frame: pd.DataFrame, plan: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, List[str]]:
+    # field key -> text per row of frame, for the layout's per-certificate text fields
+    return {
+        key: render_texts(compile_text(field["text"], context), frame)
+        for key, field in plan["dynamic"].items()
+        if key not in DYNAMIC_FIELDS and field["text"]
+    }
+
+
+def texts_for_template(frame: pd.DataFrame, template_path: str, n_signatories: int,
+                       context: Dict[str, Any]) -> Dict[str, List[str]]:
+    size = (2000, 1414)
+    if template_path and os.path.exists(template_path):
+        with Image.open(template_path) as im:
+            size = im.size
+    return participant_texts(frame, get_placement_plan(template_path, size, n_signatories), context)
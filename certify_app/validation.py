@@ -0,0 +1,176 @@
+import os
+import re
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from .layout import get_placement_plan
+from .certificate import get_font
+from .fonts import missing_characters
+from .texts import participant_texts
+
+# Mirrors helpers.safe_filename, as vectorized string ops.
+_UNSAFE_CHARS = r"[<>:\"/\\|?*\x00-\x1F]"
+FILENAME_MAX = 120
+REPORT_SAMPLE = 20
+
+
+def predict_filenames(names: pd.Series) -> pd.Series:
+    stems = (
+        names.fillna("").astype(str).str.strip()
+        .str.replace(_UNSAFE_CHARS, "", regex=True)
+        .str.replace(r"\s+", "_", regex=True)
+        .str.slice(0, FILENAME_MAX)
+    )
+    return stems.mask(stems == "", "participant")
+
+
+def _dedupe_stems(stems: pd.Series) -> pd.Series:
+    # First occurrence keeps its name; later ones get the first free _2, _3, ... suffix in
+    # row order. Keys are casefolded because Windows/macOS treat "Juan" and "JUAN" as one file,
+    # and suffixes skip every original stem so a real "Juan_2" row is never displaced.
+    keys = stems.str.casefold()
+    dup = keys.duplicated(keep="first")
+    if not dup.any():
+        return stems
+    taken = set(keys)
+    out = stems.copy()
+    for idx in stems.index[dup.to_numpy()]:
+        base = stems.at[idx][:FILENAME_MAX - 6]
+        n = 2
+        while f"{base}_{n}".casefold() in taken:
+            n += 1
+        out.at[idx] = f"{base}_{n}"
+        taken.add(f"{base}_{n}".casefold())
+    return out
+
+
+def _too_wide(names: pd.Series, template_path: Optional[str], image_size, n_signatories: int) -> pd.Series:
+    flags = pd.Series(False, index=names.index)
+    if not template_path:
+        return flags
+    field = get_placement_plan(template_path, image_size, n_signatories)["dynamic"].get("name")
+    if not field or not field.get("max_width"):
+        return flags
+
+    font = get_font(field["size"], field.get("font_instance"))
+    max_width = field["max_width"]
+    # Bound by the narrowest/widest glyphs so only the ambiguous middle band is measured.
+    narrow = min(font.getlength(c) for c in "il.' ")
+    wide = max(font.getlength(c) for c in "WMm@")
+    lengths = names.str.len().to_numpy()
+    flags[:] = lengths * narrow > max_width
+    unsure = (lengths * wide > max_width) & ~flags.to_numpy()
+    if unsure.any():
+        idx = names.index[unsure]
+        flags.loc[idx] = [font.getlength(n) > max_width for n in names.loc[idx]]
+    return flags
+
+
+def validate_participants(
+    df: pd.DataFrame,
+    name_column: str = "name",
+    template_path: Optional[str] = None,
+    n_signatories: int = 1,
+    context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # context: event_title/event_org/event_dates for the layout's per-participant text fields
+    if name_column not in df.columns:
+        raise ValueError(f"CSV must contain a '{name_column}' column.")
+
+    raw = df[name_column]
+    names = (
+        raw.astype("string").fillna("")
+        .str.normalize("NFC")
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    changed = (names != raw.astype("string").fillna("")).to_numpy()
+    empty = (names == "").to_numpy()
+
+    valid = names[~empty]
+    keys = valid.str.casefold()
+    duplicate = pd.Series(False, index=names.index)
+    duplicate.loc[valid.index] = keys.duplicated(keep=False).to_numpy()
+
+    stems = predict_filenames(valid)
+    stem_keys = stems.str.casefold()
+    collides = stem_keys.duplicated(keep=False) & ~keys.duplicated(keep=False)
+    collision = pd.Series(False, index=names.index)
+    collision.loc[valid.index] = collides.to_numpy()
+    truncated = pd.Series(False, index=names.index)
+    truncated.loc[valid.index] = (valid.str.len() > FILENAME_MAX).to_numpy()
+
+    image_size = (2000, 1414)
+    if template_path and os.path.exists(template_path):
+        with Image.open(template_path) as im:
+            image_size = im.size
+    too_long = pd.Series(False, index=names.index)
+    too_long.loc[valid.index] = _too_wide(valid, template_path, image_size, n_signatories).to_numpy()
+
+    # Characters no font in the chain can draw (they would render as empty boxes).
+    missing = missing_characters("".join(valid.unique()))
+    no_glyph = pd.Series(False, index=names.index)
+    if missing:
+        no_glyph.loc[valid.index] = valid.str.contains("[" + re.escape(missing) + "]", regex=True).to_numpy()
+
+    output_names = _dedupe_stems(stems)
+
+    # Per-participant text fields, compiled once and filled column-wise for the usable rows.
+    plan = get_placement_plan(template_path, image_size, n_signatories)
+    missing_columns = [c for c in plan["columns"] if c not in df.columns]
+    fields = participant_texts(df.loc[valid.index], plan, context or {})
+
+    def rows(mask) -> List[int]:
+        # 1-based CSV line numbers (header is line 1)
+        return (np.flatnonzero(np.asarray(mask)) + 2).tolist()
+
+    return {
+        "total": int(len(names)),
+        "valid": int(len(valid)),
+        "names": valid.tolist(),
+        "output_names": output_names.tolist(),
+        "normalized_rows": rows(changed & ~empty),
+        "empty_rows": rows(empty),
+        "duplicate_rows": rows(duplicate),
+        "collision_rows": rows(collision),
+        "truncated_rows": rows(truncated),
+        "too_long_rows": rows(too_long),
+        "missing_glyph_rows": rows(no_glyph),
+        "missing_glyphs": missing,
+        "renamed": int((output_names != stems).sum()),
+        "fields": fields,
+        "missing_columns": missing_columns,
+    }
+
+
+def has_issues(report: Dict[str, Any]) -> bool:
+    return any(report[k] for k in ("empty_rows", "duplicate_rows", "collision_rows", "truncated_rows", "too_long_rows",
+                                   "missing_glyph_rows", "missing_columns"))
+
+
+def format_validation_report(report: Dict[str, Any]) -> List[str]:
+    def sample(rows: List[int]) -> str:
+        shown = ", ".join(str(r) for r in rows[:REPORT_SAMPLE])
+        return shown + (f", … (+{len(rows) - REPORT_SAMPLE})" if len(rows) > REPORT_SAMPLE else "")
+
+    lines = [f"Pre-flight: {report['valid']} of {report['total']} rows usable."]
+    checks = [
+        ("normalized_rows", "Whitespace/Unicode normalized"),
+        ("empty_rows", "Empty names (skipped)"),
+        ("duplicate_rows", "Duplicate names (each still gets its own file)"),
+        ("collision_rows", "Different names mapping to the same file name"),
+        ("truncated_rows", f"Names longer than {FILENAME_MAX} chars (file name truncated)"),
+        ("too_long_rows", "Names wider than the layout's name box"),
+        ("missing_glyph_rows", f"Characters no installed font can draw ({report['missing_glyphs']})"),
+    ]
+    for key, label in checks:
+        if report[key]:
+            lines.append(f"{label}: {len(report[key])} (CSV lines {sample(report[key])})")
+    if report["missing_columns"]:
+        lines.append(f"Layout text uses columns missing from participants.csv (left blank): {', '.join(report['missing_columns'])}")
+    if report["renamed"]:
+        lines.append(f"Output files renamed with _2, _3… suffixes to avoid overwrites: {report['renamed']}")
+    return lines
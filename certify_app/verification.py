@@ -0,0 +1,156 @@
+import os
+import secrets
+import sqlite3
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterable
+
+from .config import VERIFY_DB
+
+# Crockford-style alphabet: no I/L/O/U, so IDs survive being read aloud or retyped.
+ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ID_LENGTH = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    id TEXT PRIMARY KEY,
+    participant TEXT NOT NULL,
+    participant_key TEXT NOT NULL,
+    event TEXT NOT NULL,
+    run_ts TEXT NOT NULL,
+    output_file TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    created TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_certificates_participant ON certificates (participant_key, event);
+CREATE INDEX IF NOT EXISTS idx_certificates_sha256 ON certificates (sha256);
+CREATE TABLE IF NOT EXISTS certificate_files (
+    sha256 TEXT NOT NULL,
+    id TEXT NOT NULL,
+    format TEXT NOT NULL,
+    output_file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_certificate_files_sha256 ON certificate_files (sha256);
+"""
+
+COLUMNS = ("id", "participant", "participant_key", "event", "run_ts", "output_file", "sha256", "created")
+
+
+def new_certificate_id() -> str:
+    raw = "".join(secrets.choice(ID_ALPHABET) for _ in range(ID_LENGTH))
+    return f"{raw[:4]}-{raw[4:8]}-{raw[8:]}"
+
+
+def normalize_id(cert_id: str) -> str:
+    raw = "".join(ch for ch in (cert_id or "").upper() if ch.isalnum())
+    raw = raw.replace("O", "0").replace("I", "1").replace("L", "1")
+    return f"{raw[:4]}-{raw[4:8]}-{raw[8:]}" if len(raw) == ID_LENGTH else (cert_id or "").strip().upper()
+
+
+def participant_key(name: str) -> str:
+    return " ".join((name or "").split()).casefold()
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def connect(db_path: str = VERIFY_DB) -> sqlite3.Connection:
+    folder = os.path.dirname(db_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def output_files(paths: List[str]) -> List[Dict[str, str]]:
+    # one entry per encoded format; the PDF (if any) comes first and is the record's main file
+    files = [
+        {"format": os.path.splitext(p)[1].lstrip(".").lower(), "output_file": os.path.abspath(p), "sha256": sha256_file(p)}
+        for p in paths
+    ]
+    return sorted(files, key=lambda f: f["format"] != "pdf")
+
+
+def record_certificates(rows: Iterable[Dict[str, Any]], db_path: str = VERIFY_DB) -> int:
+    # rows: id, participant, event, run_ts and "files" from output_files()
+    rows = list(rows)
+    created = datetime.now().isoformat(timespec="seconds")
+    values = [
+        (
+            r["id"], r["participant"], participant_key(r["participant"]), r["event"],
+            r["run_ts"], r["files"][0]["output_file"], r["files"][0]["sha256"], created,
+        )
+        for r in rows
+    ]
+    files = [(f["sha256"], r["id"], f["format"], f["output_file"]) for r in rows for f in r["files"]]
+    if not values:
+        return 0
+    conn = connect(db_path)
+    try:
+        with conn:  # one transaction per run
+            conn.executemany(f"INSERT INTO certificates ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values)
+            conn.executemany("INSERT INTO certificate_files (sha256, id, format, output_file) VALUES (?, ?, ?, ?)", files)
+    finally:
+        conn.close()
+    return len(values)
+
+
+def _fetch(sql: str, params: tuple, db_path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(db_path):
+        return []
+    conn = connect(db_path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def lookup_id(cert_id: str, db_path: str = VERIFY_DB) -> Optional[Dict[str, Any]]:
+    rows = _fetch("SELECT * FROM certificates WHERE id = ?", (normalize_id(cert_id),), db_path)
+    return rows[0] if rows else None
+
+
+def lookup_name(name: str, event: Optional[str] = None, db_path: str = VERIFY_DB) -> List[Dict[str, Any]]:
+    if event:
+        return _fetch(
+            "SELECT * FROM certificates WHERE participant_key = ? AND event = ? ORDER BY run_ts",
+            (participant_key(name), event), db_path,
+        )
+    return _fetch("SELECT * FROM certificates WHERE participant_key = ? ORDER BY run_ts", (participant_key(name),), db_path)
+
+
+def lookup_file(path: str, db_path: str = VERIFY_DB) -> List[Dict[str, Any]]:
+    # content hash, not path: still matches after a run is moved or copied to backups/.
+    # Any recorded format matches (PDF, PNG, WebP…); records made before per-format hashes only have their main file.
+    digest = sha256_file(path)
+    return _fetch(
+        "SELECT * FROM certificates WHERE sha256 = ? "
+        "UNION SELECT c.* FROM certificates c JOIN certificate_files f ON f.id = c.id WHERE f.sha256 = ?",
+        (digest, digest), db_path,
+    )
+
+
+def verify(query: str, db_path: str = VERIFY_DB) -> List[Dict[str, Any]]:
+    query = (query or "").strip()
+    if not query:
+        return []
+    if os.path.isfile(query):
+        return lookup_file(query, db_path)
+    found = lookup_id(query, db_path)
+    if found:
+        return [found]
+    return lookup_name(query, db_path=db_path)
+
+
+def describe(record: Dict[str, Any]) -> str:
+    return (
+        f"{record['id']} — {record['participant']} — {record['event']} "
+        f"(run {record['run_ts']}, file {os.path.basename(record['output_file'])}, sha256 {record['sha256'][:12]}…)"
+    )
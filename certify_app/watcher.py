@@ -0,0 +1,233 @@
+import os
+import json
+import time
+from typing import Dict, List, Optional, Callable, Set, Tuple, Any
+
+import pandas as pd
+
+from .config import EVENTS_DIR
+from .helpers import load_event_settings, write_json_atomic
+from .certificate import base_layer_key
+from .batch import generate_batch, format_report
+from .validation import validate_participants, FILENAME_MAX
+from .storage import run_lock, is_event_dir, LockTimeout
+
+try:  # optional: Linux inotify wake-ups; falls back to polling
+    from inotify_simple import INotify, flags as inotify_flags
+except Exception:
+    INotify = None
+    inotify_flags = None
+
+WATCHED_FILES = ("participants.csv", "event.json")
+LIVE_SUBDIR = "live"
+MANIFEST_NAME = "manifest.json"
+
+
+def _stat_key(path: str) -> Optional[Tuple[float, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def generate_incremental(
+    event_path: str,
+    defaults: Optional[Dict[str, Any]] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> Optional[Dict[str, Any]]:
+    log = log or (lambda _msg: None)
+    defaults = defaults or {}
+    event_name = os.path.basename(event_path)
+
+    settings = load_event_settings(event_path)
+    template = settings["template"] or defaults.get("template")
+    signatories = settings["signatories"] or defaults.get("signatories") or []
+    if not template or not signatories:
+        log(f"[SKIP] {event_name}: no template/signatories in event.json (generate once from the GUI or pass defaults).")
+        return None
+
+    participants_csv = os.path.join(event_path, "participants.csv")
+    try:
+        df = pd.read_csv(participants_csv)
+    except Exception as e:
+        log(f"[WARN] {event_name}: cannot read participants.csv yet ({e}); will retry on next change.")
+        return None
+    if "name" not in df.columns:
+        log(f"[WARN] {event_name}: participants.csv has no 'name' column.")
+        return None
+
+    event_title = settings["event_title"]
+    event_org = settings["event_org"]
+    event_dates = settings["event_dates"]
+
+    output_dir = os.path.join(event_path, "certificates", LIVE_SUBDIR)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest: Dict[str, Any] = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except Exception:
+            manifest = {}
+
+    # The base-layer key changes whenever the template, event text or signatories change;
+    # in that case every certificate is stale, otherwise only new names need rendering.
+    fingerprint = base_layer_key(event_title, event_org, event_dates, template, signatories)
+    done: Dict[str, str] = manifest.get("generated", {}) if manifest.get("fingerprint") == fingerprint else {}
+
+    # same pre-flight as `cli generate`: normalized names, collision-free stems, per-participant texts
+    checked = validate_participants(
+        df, template_path=template, n_signatories=len(signatories),
+        context={"event_title": event_title, "event_org": event_org, "event_dates": event_dates},
+    )
+    # stems already in the live folder stay with their names, so a new row never takes over a file
+    taken = {os.path.splitext(f)[0].casefold() for f in done.values()}
+    reserved = taken | {
+        stem.casefold() for name, stem in zip(checked["names"], checked["output_names"]) if name not in done
+    }
+    todo: List[int] = []
+    stems: List[str] = []
+    seen: Set[str] = set()
+    for i, (name, stem) in enumerate(zip(checked["names"], checked["output_names"])):
+        if name in done or name in seen:
+            continue
+        seen.add(name)
+        if stem.casefold() in taken:
+            base, n = stem[:FILENAME_MAX - 6], 2
+            while f"{base}_{n}".casefold() in reserved:
+                n += 1
+            stem = f"{base}_{n}"
+            reserved.add(stem.casefold())
+        taken.add(stem.casefold())
+        todo.append(i)
+        stems.append(stem)
+    if not todo:
+        return None
+    names = [checked["names"][i] for i in todo]
+    field_texts = {key: [texts[i] for i in todo] for key, texts in checked["fields"].items()}
+
+    log(f"{event_name}: rendering {len(todo)} new certificate(s) → {output_dir}")
+    try:
+        with run_lock(event_path, timeout=0):
+            report = generate_batch(
+                names,
+                event_title=event_title,
+                event_org=event_org,
+                event_dates=event_dates,
+                template_path=template,
+                output_dir=output_dir,
+                signatories=signatories,
+                log=log,
+                file_stems=stems,
+                field_texts=field_texts,
+            )
+    except LockTimeout:
+        log(f"[WARN] {event_name}: event is locked by another process; skipped.")
+        return None
+    produced = {os.path.splitext(os.path.basename(p))[0]: os.path.basename(p) for p in report["outputs"]}
+    for name, stem in zip(names, stems):
+        if stem in produced:
+            done[name] = produced[stem]
+
+    write_json_atomic(manifest_path, {"fingerprint": fingerprint, "generated": done})
+    log(f"{event_name}: {format_report(report)}")
+    return report
+
+
+class EventWatcher:
+    def __init__(
+        self,
+        events_dir: str = EVENTS_DIR,
+        debounce: float = 2.0,
+        poll_interval: float = 1.0,
+        defaults: Optional[Dict[str, Any]] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        self.events_dir = events_dir
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.defaults = defaults or {}
+        self.log = log or (lambda _msg: None)
+        self._stopped = False
+        self._inotify = INotify() if INotify is not None else None
+        self._watched_dirs: Set[str] = set()
+        self._snapshot: Dict[str, Optional[Tuple[float, int]]] = {}
+
+    def _event_dirs(self) -> List[str]:
+        try:
+            return [
+                os.path.join(self.events_dir, d) for d in sorted(os.listdir(self.events_dir))
+                if is_event_dir(self.events_dir, d)
+            ]
+        except FileNotFoundError:
+            return []
+
+    def _refresh_watches(self, event_dirs: List[str]) -> None:
+        if self._inotify is None:
+            return
+        mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE | inotify_flags.DELETE
+        for d in [self.events_dir] + event_dirs:
+            if d not in self._watched_dirs:
+                try:
+                    self._inotify.add_watch(d, mask)
+                    self._watched_dirs.add(d)
+                except OSError:
+                    pass
+
+    def take_snapshot(self) -> Dict[str, Optional[Tuple[float, int]]]:
+        event_dirs = self._event_dirs()
+        self._refresh_watches(event_dirs)
+        snap = {}
+        for d in event_dirs:
+            for fname in WATCHED_FILES:
+                path = os.path.join(d, fname)
+                snap[path] = _stat_key(path)
+        return snap
+
+    def _wait(self, timeout: float) -> None:
+        if self._inotify is not None:
+            self._inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    def changed_events(self) -> Set[str]:
+        snap = self.take_snapshot()
+        changed = {
+            os.path.dirname(path) for path, key in snap.items()
+            if key is not None and self._snapshot.get(path) != key
+        }
+        self._snapshot = snap
+        return changed
+
+    def poll_once(self) -> Set[str]:
+        changed = self.changed_events()
+        if not changed:
+            return changed
+        # debounce: keep collecting until the burst has been quiet for `debounce` seconds
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce and not self._stopped:
+            self._wait(min(self.poll_interval, self.debounce))
+            more = self.changed_events()
+            if more:
+                changed |= more
+                quiet_since = time.monotonic()
+
+        for event_path in sorted(changed):
+            try:
+                generate_incremental(event_path, self.defaults, log=self.log)
+            except Exception as e:
+                self.log(f"[FAILED] {os.path.basename(event_path)}: {type(e).__name__}: {e}")
+        return changed
+
+    def run_forever(self) -> None:
+        mode = "inotify" if self._inotify is not None else "polling"
+        self.log(f"Watching {self.events_dir} ({mode}, debounce {self.debounce:.1f}s). Ctrl+C to stop.")
+        # first pass: catch up every event that changed while the daemon was down
+        self._snapshot = {}
+        while not self._stopped:
+            self.poll_once()
+            self._wait(self.poll_interval)
+
+    def stop(self) -> None:
+        self._stopped = True
@@ -0,0 +1,15 @@
+import pytest
+
+from certify_app.cache import RenderCache
+from certify_app.certificate import clear_base_layers
+from certify_app.signatures import clear_signature_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # a private disk cache and empty in-process layers, so hit counts start from zero
+    clear_base_layers()
+    clear_signature_cache()
+    yield RenderCache(root=str(tmp_path / "cache"))
+    clear_base_layers()
+    clear_signature_cache()
@@ -0,0 +1,75 @@
+import os
+
+from PIL import Image
+
+from certify_app import helpers, layout
+from certify_app.cache import RenderCache
+from certify_app.certificate import render_certificate, clear_base_layers
+
+EVENT = ("Codefest", "OpenIT", "May 1, 2025", "missing-template.png", [{"name": "A. Cruz", "position": "Chair"}])
+
+
+def test_memory_hits_are_counted(cache):
+    for name in ("Ana", "Ben", "Cy"):
+        render_certificate(name, *EVENT, cache=cache)
+    assert cache.stats() == {"hits": 0, "memory_hits": 2, "misses": 1, "evictions": 0}
+
+
+def test_disk_hit_after_memory_is_cleared(cache):
+    render_certificate("Ana", *EVENT, cache=cache)
+    clear_base_layers()
+    cache.reset_stats()
+    render_certificate("Ben", *EVENT, cache=cache)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["memory_hits"] == 0
+
+
+def test_entries_over_budget_are_evicted(tmp_path):
+    cache = RenderCache(root=str(tmp_path), max_bytes=1)
+    cache.put_image("a", Image.new("RGB", (4, 4)))
+    assert cache.get_image("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_puts_under_budget_do_not_rescan(tmp_path, monkeypatch):
+    cache = RenderCache(root=str(tmp_path))
+    cache.put_image("seed", Image.new("RGB", (4, 4)))
+    scans = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: scans.append(path) or real_listdir(path))
+    for i in range(20):
+        cache.put_image(f"k{i}", Image.new("RGB", (4, 4), (i, 0, 0)))
+    assert scans == []
+    assert cache._total == cache.size_bytes()
+
+
+def test_running_total_triggers_eviction(tmp_path):
+    image = Image.new("RGB", (4, 4))
+    cache = RenderCache(root=str(tmp_path))
+    cache.put_image("a", image)
+    size = cache.size_bytes()
+    cache = RenderCache(root=str(tmp_path), max_bytes=3 * size)  # seeded from the entry already on disk
+    for key in ("b", "c", "d"):
+        cache.put_image(key, image)
+    assert cache.stats()["evictions"] == 1
+    assert sorted(os.listdir(tmp_path)) == ["b.png", "c.png", "d.png"]
+
+
+def test_digest_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers, "DIGEST_MEMORY_SLOTS", 4)
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(bytes([i]) * 10)
+        paths.append(str(path))
+        helpers.file_digest(str(path))
+    assert len(helpers._DIGEST_CACHE) <= 4
+    assert helpers.file_digest(paths[0]) == helpers.file_digest(paths[0])
+
+
+def test_placement_plans_are_bounded(monkeypatch):
+    monkeypatch.setattr(layout, "PLAN_MEMORY_SLOTS", 3)
+    for width in range(1000, 1010):
+        layout.get_placement_plan("", (width, 700), 1)
+    assert len(layout._PLANS) <= 3
+    assert layout.get_placement_plan("", (1009, 700), 1) is layout.get_placement_plan("", (1009, 700), 1)
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from PIL import Image
+
+from certify_app import draft
+from certify_app.draft import render_contact_sheets
+from certify_app.layout import layout_path_for
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "award.png"
+    Image.new("RGB", (400, 283), "white").save(path)
+    with open(layout_path_for(str(path)), "w", encoding="utf-8") as f:
+        json.dump({"fields": {"award_line": {"x": "50%", "y": "60%", "size": 12, "text": "Awarded {award}"}}}, f)
+    return str(path)
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    calls = []
+    real_render = draft.render_certificate
+
+    def spy(name, *args, **kwargs):
+        calls.append((name, kwargs.get("fields")))
+        return real_render(name, *args, **kwargs)
+
+    monkeypatch.setattr(draft, "render_certificate", spy)
+    return calls
+
+
+def test_tiles_draw_participant_fields(tmp_path, template, rendered, cache):
+    report = render_contact_sheets(
+        ["Ana Cruz", "", "Ben Reyes"], "Codefest", "OpenIT", "May 1", template, str(tmp_path / "drafts"),
+        [{"name": "A. Reyes", "position": "Chair"}], cache=cache,
+        field_texts={"award_line": ["Awarded Gold", "Awarded", "Awarded Silver"]},
+    )
+    assert report["names"] == 2
+    assert rendered == [("Ana Cruz", {"award_line": "Awarded Gold"}), ("Ben Reyes", {"award_line": "Awarded Silver"})]
+
+
+def test_labels_carry_csv_line_numbers(tmp_path, template, cache, monkeypatch):
+    labels = []
+    real_text = draft.ImageDraw.ImageDraw.text
+
+    def spy(self, xy, text, *args, **kwargs):
+        labels.append(text)
+        return real_text(self, xy, text, *args, **kwargs)
+
+    monkeypatch.setattr(draft.ImageDraw.ImageDraw, "text", spy)
+    render_contact_sheets(
+        ["Ana Cruz", None, "  ", "Ben Reyes", "Cy Lim"], "Codefest", "OpenIT", "May 1", template,
+        str(tmp_path / "drafts"), [{"name": "A. Reyes", "position": "Chair"}], cache=cache, columns=2, per_sheet=2,
+    )
+    # participants.csv: header on line 1, blank names on lines 3 and 4
+    assert [t for t in labels if t[0].isdigit()] == ["2. Ana Cruz", "5. Ben Reyes", "6. Cy Lim"]
@@ -0,0 +1,53 @@
+import shutil
+from collections import namedtuple
+
+import pytest
+
+from certify_app import estimate
+from certify_app.estimate import stratified_sample, estimate_batch
+
+EVENT = ("Codefest", "OpenIT", "May 1, 2025", "missing-template.png", [{"name": "A. Reyes", "position": "Chair"}])
+Usage = namedtuple("Usage", "total used free")
+
+
+def test_small_lists_are_sampled_whole():
+    assert stratified_sample(["Ana", "Ben"], 9) == [0, 1]
+
+
+def test_sample_takes_short_median_and_long_names():
+    names = ["x" * n for n in range(1, 31)]
+    picked = stratified_sample(names, 6)
+    assert [len(names[i]) for i in picked] == [1, 2, 15, 16, 29, 30]
+
+
+@pytest.fixture
+def names():
+    return [f"Participant {'X' * (i % 25)} {i}" for i in range(200)] + [""]
+
+
+def run_estimate(names, cache, tmp_path, **kwargs):
+    return estimate_batch(names, *EVENT, cache=cache, output_dir=str(tmp_path / "events" / "Codefest" / "certificates"),
+                          sample_size=6, **kwargs)
+
+
+def test_estimate_scales_the_sample_to_the_whole_list(names, cache, tmp_path):
+    est = run_estimate(names, cache, tmp_path)
+    assert (est["names"], est["sampled"]) == (200, 6)
+    assert est["output_bytes"] > 0
+    assert est["backup_bytes"] == est["output_bytes"]
+    assert est["total_bytes"] == 2 * est["output_bytes"]
+    assert est["fits"]
+
+
+def test_estimate_reports_when_the_disk_is_too_small(names, cache, tmp_path, monkeypatch):
+    probed = []
+
+    def disk_usage(path):
+        probed.append(path)
+        return Usage(10 ** 9, 10 ** 9, 1000)
+
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage)
+    est = run_estimate(names, cache, tmp_path, backup=False)
+    assert probed == [str(tmp_path)]  # nearest existing parent of the output folder
+    assert (est["backup_bytes"], est["free_bytes"], est["fits"]) == (0, 1000, False)
+    assert "NOT ENOUGH DISK SPACE" in estimate.format_estimate(est)
@@ -0,0 +1,84 @@
+import os
+import struct
+
+import pytest
+
+from certify_app import fonts
+from certify_app.fonts import Coverage, _read_cmap, split_runs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def format4(segments, glyph_ids):
+    # segments: (start, end, delta, range_offset); 0xFFFF terminator appended
+    segments = list(segments) + [(0xFFFF, 0xFFFF, 1, 0)]
+    n = len(segments)
+    body = struct.pack(f">{n}H", *(s[1] for s in segments)) + b"\0\0"
+    body += struct.pack(f">{n}H", *(s[0] for s in segments))
+    body += struct.pack(f">{n}h", *(s[2] for s in segments))
+    body += struct.pack(f">{n}H", *(s[3] for s in segments))
+    body += struct.pack(f">{len(glyph_ids)}H", *glyph_ids)
+    return struct.pack(">7H", 4, 14 + len(body), 0, 2 * n, 0, 0, 0) + body
+
+
+def format12(groups):
+    body = b"".join(struct.pack(">III", *g) for g in groups)
+    return struct.pack(">HHIII", 12, 0, 16 + len(body), 0, len(groups)) + body
+
+
+def sfnt(*subtables):
+    records = b""
+    offset = 4 + 8 * len(subtables)
+    for platform, encoding, data in subtables:
+        records += struct.pack(">HHI", platform, encoding, offset)
+        offset += len(data)
+    cmap = struct.pack(">HH", 0, len(subtables)) + records + b"".join(d for _p, _e, d in subtables)
+    header = struct.pack(">IHHHH", 0x00010000, 1, 16, 0, 0)
+    return header + struct.pack(">4sIII", b"cmap", 0, 28, len(cmap)) + cmap
+
+
+def test_cmap_formats_4_and_12(tmp_path):
+    # "A"-"C" by delta; "a" and "b" through glyphIdArray, where "b" maps to glyph 0 (missing)
+    sub4 = format4([(0x41, 0x43, -0x40, 0), (0x61, 0x62, 0, 4)], [5, 0])
+    # the second group starts at glyph 0, so its first codepoint is not covered
+    sub12 = format12([(0x1F600, 0x1F602, 10), (0x2000, 0x2001, 0)])
+    path = tmp_path / "test.ttf"
+    path.write_bytes(sfnt((3, 1, sub4), (3, 10, sub12), (1, 0, format12([(0x30, 0x39, 1)]))))
+
+    assert _read_cmap(str(path)) == [0x41, 0x42, 0x43, 0x61, 0x2001, 0x1F600, 0x1F601, 0x1F602]
+
+
+def test_shipped_font_coverage():
+    chain = fonts.font_chain()
+    if not chain or not os.path.exists(os.path.join(ROOT, fonts.FONTS_DIR, fonts.PRIMARY_FONT)):
+        pytest.skip("primary font not shipped")
+    cov = Coverage(_read_cmap(chain[0]))
+    assert all(ord(c) in cov for c in "AZaz09 éñÅ")
+    assert ord("李") not in cov
+
+
+def test_coverage_merges_ranges():
+    cov = Coverage([5, 1, 2, 3, 9])
+    assert (cov.starts, cov.ends, len(cov)) == ([1, 5, 9], [3, 5, 9], 5)
+    assert 2 in cov and 4 not in cov and 10 not in cov
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    monkeypatch.setattr(fonts, "font_chain", lambda: ("latin.ttf", "cjk.ttf"))
+    monkeypatch.setattr(fonts, "_chain_coverages", lambda: (
+        Coverage(range(0x20, 0x7F)), Coverage(list(range(0x4E00, 0xA000)) + [0x20]),
+    ))
+
+
+def test_split_runs_falls_back_per_character(chain):
+    assert split_runs("Ana 李小龍 Cruz") == [("latin.ttf", "Ana "), ("cjk.ttf", "李小龍 "), ("latin.ttf", "Cruz")]
+
+
+def test_combining_marks_stay_with_their_base(chain):
+    assert split_runs("李́é") == [("cjk.ttf", "李́"), ("latin.ttf", "é")]
+
+
+def test_uncovered_characters_use_the_primary_font(chain):
+    assert split_runs("Zoë") == [("latin.ttf", "Zoë")]
+    assert fonts.missing_characters("Zoë 李") == "ë"
@@ -0,0 +1,28 @@
+import os
+
+from certify_app import batch
+from certify_app.batch import generate_batch
+from certify_app.gallery import list_runs, load_run_entries
+
+EVENT = ("Codefest", "OpenIT", "May 1, 2025", "missing-template.png", [{"name": "A. Reyes", "position": "Chair"}])
+
+
+def test_runs_newest_first(tmp_path):
+    for ts in ("20250101_100000", "20250103_100000", "20250102_100000"):
+        (tmp_path / "certificates" / ts).mkdir(parents=True)
+    assert list_runs(str(tmp_path)) == ["20250103_100000", "20250102_100000", "20250101_100000"]
+    assert list_runs(str(tmp_path / "missing")) == []
+
+
+def test_entries_use_names_and_thumbnails_of_a_run(tmp_path, cache, monkeypatch):
+    monkeypatch.setattr(batch, "record_certificates", lambda records: len(records))
+    run = tmp_path / "certificates" / "20250101_100000"
+    generate_batch(["Zoë Núñez", "ana cruz", "Ben Reyes"], *EVENT[:4], str(run), EVENT[4], cache=cache,
+                   formats=[{"format": "png"}, {"format": "pdf"}], file_stems=["Zoe", "ana_cruz", "Ben_Reyes"])
+    os.remove(run / ".thumbs" / "Ben_Reyes.jpg")
+
+    entries = load_run_entries(str(run))
+    assert [(e["name"], os.path.basename(e["file"])) for e in entries] == [
+        ("ana cruz", "ana_cruz.pdf"), ("Ben Reyes", "Ben_Reyes.pdf"), ("Zoë Núñez", "Zoe.pdf"),
+    ]
+    assert [e["thumb"] and os.path.basename(e["thumb"]) for e in entries] == ["ana_cruz.jpg", None, "Zoe.jpg"]
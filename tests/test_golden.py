@@ -0,0 +1,69 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from certify_app import golden
+from certify_app.layout import layout_path_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR = os.path.join(ROOT, golden.GOLDEN_DIR)
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return golden.build_corpus(
+        os.path.join(ROOT, golden.TEMPLATES_DIR), os.path.join(ROOT, golden.SAMPLE_DATA_DIR), GOLDEN_DIR,
+    )
+
+
+def failures(report):
+    return [f"{r['case']} ({r['path']}): {golden.format_metrics(r)}" for r in report["results"] if not r["ok"]]
+
+
+def test_corpus_has_a_golden_image_per_case(cases):
+    assert len(cases) == 9
+    for case in cases:
+        for subdir in ("", golden.DRAFT_SUBDIR):
+            assert os.path.exists(os.path.join(GOLDEN_DIR, subdir, f"{case['id']}.png")), (subdir, case["id"])
+
+
+def test_render_paths_match_golden_images(cases, tmp_path):
+    report = golden.run_harness(cases, golden_dir=GOLDEN_DIR, diff_dir=str(tmp_path))
+    assert report["failed"] == 0, failures(report)
+    assert len(report["results"]) == len(cases) * len(golden.RENDER_PATHS)
+
+
+def test_missing_golden_fails(cases, tmp_path):
+    report = golden.run_harness(cases[:1], paths=["memory"], golden_dir=str(tmp_path))
+    assert report["failed"] == 1
+    assert report["results"][0]["missing"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_draft_golden_fails(cases, tmp_path):
+    shutil.copy(os.path.join(GOLDEN_DIR, f"{cases[0]['id']}.png"), tmp_path)
+    report = golden.run_harness(cases[:1], paths=["memory", "draft"], golden_dir=str(tmp_path))
+    assert [(r["path"], r["ok"]) for r in report["results"]] == [("draft", False), ("memory", True)]
+
+
+def test_update_writes_missing_goldens(cases, tmp_path):
+    report = golden.run_harness(cases[:1], paths=["memory", "draft"], golden_dir=str(tmp_path), update=True)
+    assert report["failed"] == 0
+    name = f"{cases[0]['id']}.png"
+    assert sorted(os.listdir(tmp_path)) == sorted([name, golden.DRAFT_SUBDIR])
+    assert os.listdir(tmp_path / golden.DRAFT_SUBDIR) == [name]
+
+
+def test_moved_name_is_caught(cases, tmp_path):
+    case = cases[0]
+    template = tmp_path / os.path.basename(case["template_path"])
+    shutil.copy(case["template_path"], template)
+    with open(layout_path_for(str(template)), "w", encoding="utf-8") as f:
+        json.dump({"fields": {"name": {"y": 682}}}, f)
+    report = golden.run_harness([dict(case, template_path=str(template))], paths=["memory", "draft"],
+                                golden_dir=GOLDEN_DIR, diff_dir=str(tmp_path / "diffs"))
+    assert [r["path"] for r in report["results"] if not r["ok"]] == ["memory", "draft"]
+    assert all(os.path.exists(r["diff_image"]) for r in report["results"])
+
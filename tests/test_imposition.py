@@ -0,0 +1,68 @@
+import re
+
+import pytest
+from PIL import Image, PdfParser
+
+from certify_app.imposition import PdfSheetWriter, plan_sheet, impose_certificates
+
+
+def read_xref(data):
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[startxref:].startswith(b"xref\n")
+    header, _, rest = data[startxref + 5:].partition(b"\n")
+    first, count = map(int, header.split())
+    entries = [rest[i * 20:(i + 1) * 20] for i in range(count)]
+    assert first == 0
+    assert entries[0] == b"0000000000 65535 f \n"
+    assert all(len(e) == 20 and e.endswith(b" 00000 n \n") for e in entries[1:])
+    return {obj_id: int(e[:10]) for obj_id, e in enumerate(entries) if obj_id}, rest[count * 20:]
+
+
+def write_pdf(path, pages):
+    writer = PdfSheetWriter(str(path), (595.28, 841.89))
+    for i in range(pages):
+        writer.add_page(Image.new("RGB", (62 + i, 88), (i * 40 % 256, 120, 200)))
+    writer.close()
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("pages", [1, 3])
+def test_xref_offsets_point_at_their_objects(tmp_path, pages):
+    data = write_pdf(tmp_path / "sheets.pdf", pages)
+    offsets, trailer = read_xref(data)
+    assert len(offsets) == 2 + 3 * pages
+    for obj_id, offset in offsets.items():
+        assert data[offset:].startswith(f"{obj_id} 0 obj\n".encode())
+    assert f"/Size {len(offsets) + 1} /Root 1 0 R".encode() in trailer
+
+
+def test_pdf_parses_with_pillow(tmp_path):
+    path = tmp_path / "sheets.pdf"
+    write_pdf(path, 3)
+    pdf = PdfParser.PdfParser(str(path))
+    try:
+        assert len(pdf.pages) == 3
+        assert pdf.read_indirect(pdf.pages[0])[b"MediaBox"] == [0, 0, 595.28, 841.89]
+    finally:
+        pdf.close()
+    assert not (tmp_path / "sheets.pdf.tmp").exists()
+
+
+def test_grid_for_landscape_certificates():
+    plan = plan_sheet("A4", 2, (2000, 1414))
+    assert (plan["cols"], plan["rows"]) == (1, 2)
+    plan = plan_sheet("A4", 4, (2000, 1414))
+    assert (plan["cols"], plan["rows"]) == (2, 2)
+    assert plan["sheet_px"][0] > plan["sheet_px"][1]  # turned landscape
+    with pytest.raises(ValueError):
+        plan_sheet("Letter", 2, (2000, 1414))
+
+
+def test_impose_fills_sheets(tmp_path, cache):
+    out = tmp_path / "print.pdf"
+    report = impose_certificates(
+        ["Ana", None, "Ben", "Cy"], "Codefest", "OpenIT", "May 1", "missing-template.png", str(out), [],
+        up=2, dpi=50, cache=cache,
+    )
+    assert (report["names"], report["sheets"]) == (3, 2)
+    read_xref(out.read_bytes())
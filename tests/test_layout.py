@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from PIL import Image
+
+from certify_app.layout import (
+    DEFAULT_LAYOUT, _coord, _merge, compile_layout, get_placement_plan, layout_path_for,
+)
+from certify_app.spool import create_spool, load_job
+
+
+@pytest.mark.parametrize("value, extent, scale, expected", [
+    (1000, 2000, 1.0, 1000),
+    (1000, 1000, 0.5, 500),
+    (-35, 1414, 1.0, 1379),
+    (-35, 707, 0.5, 689),
+    ("-35", 1414, 1.0, 1379),
+    ("680", 1414, 1.0, 680),
+    ("50%", 2000, 1.0, 1000),
+    ("50%", 1000, 0.5, 500),
+    (" 12.5% ", 2000, 1.0, 250),
+    ("1/3", 2000, 1.0, 666),
+    ("2/3", 999, 0.25, 666),
+    (0, 2000, 1.0, 0),
+])
+def test_coord(value, extent, scale, expected):
+    assert _coord(value, extent, scale) == expected
+
+
+def test_merge_keeps_unmentioned_defaults():
+    merged = _merge(DEFAULT_LAYOUT, {"fields": {"name": {"y": 700}}})
+    assert merged["fields"]["name"] == dict(DEFAULT_LAYOUT["fields"]["name"], y=700)
+    assert merged["fields"]["event_line"] == DEFAULT_LAYOUT["fields"]["event_line"]
+    assert DEFAULT_LAYOUT["fields"]["name"]["y"] == 680
+
+
+def test_default_layout_geometry():
+    plan = compile_layout(DEFAULT_LAYOUT, (2000, 1414), 2)
+    assert sorted(plan["static"]) == ["dates_line", "event_line"]
+    assert sorted(plan["dynamic"]) == ["certificate_id", "name"]
+    assert plan["dynamic"]["name"]["max_width"] == 1800
+    assert [s["x"] for s in plan["slots"]] == [666, 1333]
+    assert plan["slots"][0]["signature_y"] == 1414 - 210
+    assert plan["signature_width"] == 360
+
+
+def test_column_fields_are_dynamic():
+    layout = _merge(DEFAULT_LAYOUT, {"fields": {
+        "award": {"x": "50%", "y": 760, "text": "Awarded {award} for {event_title}"},
+        "dates_line": None,
+    }})
+    plan = compile_layout(layout, (2000, 1414), 1)
+    assert "award" in plan["dynamic"]
+    assert "dates_line" not in plan["static"]
+    assert plan["columns"] == ["award"]
+
+
+def test_invalid_layouts():
+    with pytest.raises(ValueError, match="align"):
+        compile_layout(_merge(DEFAULT_LAYOUT, {"fields": {"name": {"align": "middle"}}}), (2000, 1414), 1)
+    with pytest.raises(ValueError, match="4 signatories"):
+        compile_layout(DEFAULT_LAYOUT, (2000, 1414), 4)
+
+
+def write_template(tmp_path, layout):
+    template = tmp_path / "tpl.png"
+    Image.new("RGB", (1000, 700), "white").save(template)
+    with open(layout_path_for(str(template)), "w", encoding="utf-8") as f:
+        json.dump(layout, f)
+    return str(template)
+
+
+def test_sidecar_layout_is_used(tmp_path):
+    template = write_template(tmp_path, {"fields": {"name": {"y": "25%"}}})
+    assert get_placement_plan(template, (1000, 700), 1)["dynamic"]["name"]["y"] == 175
+
+
+def test_spool_carries_the_layout(tmp_path):
+    template = write_template(tmp_path, {"fields": {"name": {"y": "25%"}}})
+    event = tmp_path / "event"
+    event.mkdir()
+    spool = create_spool(str(event), ["Ana"], "Codefest", "OpenIT", "May 1", template, [], run_id="run1")
+    copied = load_job(spool)["template_path"]
+    assert copied != template
+    assert get_placement_plan(copied, (1000, 700), 1)["dynamic"]["name"]["y"] == 175
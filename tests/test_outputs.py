@@ -0,0 +1,48 @@
+import pytest
+from PIL import Image
+
+from certify_app.outputs import parse_formats, save_outputs, DEFAULT_FORMATS
+
+
+def test_parse_formats():
+    assert parse_formats("") == DEFAULT_FORMATS
+    assert parse_formats("PDF, jpeg:quality=70 ,webp:width=1200:quality=80:method=6,png:scale=0.5") == [
+        {"format": "pdf"},
+        {"format": "jpg", "quality": 70},
+        {"format": "webp", "width": 1200, "quality": 80, "method": 6},
+        {"format": "png", "scale": 0.5},
+    ]
+
+
+@pytest.mark.parametrize("spec", ["tiff", "png:width", ",", "pdf:=3"])
+def test_parse_formats_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_formats(spec)
+
+
+def test_one_render_many_formats(tmp_path):
+    image = Image.new("RGB", (400, 283), "white")
+    paths = save_outputs(image, str(tmp_path), "Ana_Cruz", parse_formats("pdf,png:width=200,webp:width=200"))
+    assert [p.rsplit("/", 1)[1] for p in paths] == ["Ana_Cruz.pdf", "Ana_Cruz.png", "Ana_Cruz.webp"]
+    for path in paths[1:]:
+        with Image.open(path) as im:
+            assert im.size == (200, 142)
+
+
+def test_pdfs_are_deterministic(tmp_path):
+    image = Image.new("RGB", (400, 283), "white")
+    first = save_outputs(image, str(tmp_path / "a"), "Ana_Cruz")[0]
+    second = save_outputs(image, str(tmp_path / "b"), "Ana_Cruz")[0]
+    with open(first, "rb") as a, open(second, "rb") as b:
+        data = a.read()
+        assert data == b.read()
+    assert b"CreationDate" not in data and b"ModDate" not in data
+
+
+def test_downscaled_pdf_keeps_its_page_size(tmp_path):
+    image = Image.new("RGB", (400, 283), "white")
+    full = save_outputs(image, str(tmp_path / "full"), "c")[0]
+    small = save_outputs(image, str(tmp_path / "small"), "c", [{"format": "pdf", "width": 200}])[0]
+    with open(full, "rb") as a, open(small, "rb") as b:
+        assert b"/MediaBox [ 0 0 288.0 203.76 ]" in a.read()
+        assert b"/MediaBox [ 0 0 288.0 204.48 ]" in b.read()
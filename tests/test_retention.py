@@ -0,0 +1,129 @@
+import os
+import time
+
+import pytest
+
+from certify_app import batch
+from certify_app.batch import generate_batch
+from certify_app.retention import plan_retention, apply_plan, apply_retention
+from certify_app.storage import run_lock
+
+EVENT = ("Codefest", "OpenIT", "May 1, 2025", "missing-template.png", [{"name": "A. Reyes", "position": "Chair"}])
+
+
+def age_tree(root, seconds):
+    past = time.time() - seconds
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files + [""]:
+            os.utime(os.path.join(dirpath, name), (past, past))
+
+
+@pytest.fixture
+def event(tmp_path):
+    path = tmp_path / "events" / "Codefest"
+    path.mkdir(parents=True)
+    return path
+
+
+def render_run(event, timestamp, names, cache):
+    out = event / "certificates" / timestamp
+    generate_batch(names, *EVENT[:4], str(out), EVENT[4], cache=cache, record=False, thumbnails=False)
+    return out
+
+
+def fake_run(event, timestamp, size=1000):
+    out = event / "certificates" / timestamp
+    out.mkdir(parents=True)
+    (out / "cert.pdf").write_bytes(os.urandom(size))
+    return out
+
+
+def plan(event, tmp_path, **kwargs):
+    return plan_retention(str(event), backup_dir=str(tmp_path / "backups"), min_age=60, **kwargs)
+
+
+def test_rerendered_certificates_are_linked(event, tmp_path, cache):
+    first = render_run(event, "20250101_100000", ["Ana Cruz", "Ben Reyes"], cache)
+    time.sleep(1.1)  # PDF timestamps used to have one-second resolution
+    second = render_run(event, "20250102_100000", ["Ana Cruz", "Ben Reyes"], cache)
+    age_tree(event, 3600)
+
+    links = plan(event, tmp_path)["links"]
+    assert sorted(links) == [
+        [str(second / "Ana_Cruz.pdf"), str(first / "Ana_Cruz.pdf")],
+        [str(second / "Ben_Reyes.pdf"), str(first / "Ben_Reyes.pdf")],
+    ]
+    assert apply_plan(plan(event, tmp_path))["linked"] == 2
+    assert os.path.samefile(first / "Ana_Cruz.pdf", second / "Ana_Cruz.pdf")
+    assert plan(event, tmp_path)["links"] == []
+
+
+def test_keep_last_spares_the_newest_runs(event, tmp_path):
+    for ts in ("20250101_100000", "20250102_100000", "20250103_100000", "20250104_100000"):
+        fake_run(event, ts)
+    age_tree(event, 3600)
+    result = plan(event, tmp_path, keep_last=2)
+    assert [r["timestamp"] for r in result["delete"]] == ["20250101_100000", "20250102_100000"]
+    assert result["bytes_freed"] == 2000
+
+
+def test_max_bytes_deletes_oldest_first(event, tmp_path):
+    for ts in ("20250101_100000", "20250102_100000", "20250103_100000"):
+        fake_run(event, ts)
+    age_tree(event, 3600)
+    result = plan(event, tmp_path, max_bytes=1500)
+    assert [r["timestamp"] for r in result["delete"]] == ["20250101_100000", "20250102_100000"]
+
+
+def test_recent_runs_are_left_alone(event, tmp_path):
+    fake_run(event, "20250101_100000")
+    fake_run(event, "20250102_100000")
+    assert plan(event, tmp_path, keep_last=1)["delete"] == []
+
+
+def test_backups_count_as_the_same_run(event, tmp_path):
+    run = fake_run(event, "20250101_100000")
+    fake_run(event, "20250102_100000")
+    backup = tmp_path / "backups" / "backup_Codefest_20250101_100000"
+    backup.mkdir(parents=True)
+    (backup / "cert.pdf").write_bytes((run / "cert.pdf").read_bytes())
+    age_tree(tmp_path, 3600)
+
+    result = plan(event, tmp_path, keep_last=1)
+    assert result["runs"] == 2
+    assert result["delete"][0]["paths"] == [str(run), str(backup)]
+
+
+def test_working_folders_are_not_counted_or_backed_up(event, tmp_path, monkeypatch):
+    run = fake_run(event, "20250101_100000")
+    for sub in (".thumbs", ".profile"):
+        (run / sub).mkdir()
+        (run / sub / "big.bin").write_bytes(os.urandom(5000))
+    other = fake_run(event, "20250102_100000")
+    (other / ".profile").mkdir()
+    (other / ".profile" / "big.bin").write_bytes((run / ".profile" / "big.bin").read_bytes())
+    age_tree(event, 3600)
+
+    result = plan(event, tmp_path)
+    assert result["bytes"] == 2000
+    assert result["links"] == []
+
+    monkeypatch.setattr(batch, "BACKUP_DIR", str(tmp_path / "backups"))
+    backup = batch.backup_output(str(run), "Codefest", "20250101_100000")
+    assert sorted(os.listdir(backup)) == ["cert.pdf"]
+
+
+def test_cleanup_skips_an_event_being_generated(event, tmp_path):
+    old = fake_run(event, "20250101_100000")
+    fake_run(event, "20250102_100000")
+    age_tree(event, 3600)
+    policy = {"keep_last": 1, "backup_dir": str(tmp_path / "backups"), "min_age": 60}
+
+    logged = []
+    with run_lock(str(event)):
+        assert apply_retention(str(event), log=logged.append, **policy) is None
+    assert old.exists()
+    assert "cleanup skipped" in logged[-1]
+
+    assert apply_retention(str(event), **policy)["result"] == {"deleted": 1, "linked": 0}
+    assert not old.exists()
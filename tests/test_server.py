@@ -0,0 +1,132 @@
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from certify_app import server
+from certify_app.batch import generate_batch
+from certify_app.helpers import load_event_settings
+from certify_app.texts import texts_for_template
+from certify_app.layout import layout_path_for
+from certify_app.server import CertificateService, make_handler, content_disposition
+
+NAMES = ["Ana Cruz", "李小龍", "José Rizal"]
+
+
+@pytest.fixture
+def events_dir(tmp_path):
+    event = tmp_path / "events" / "Codefest"
+    event.mkdir(parents=True)
+    template = tmp_path / "template.png"
+    Image.new("RGB", (400, 283), "white").save(template)
+    (event / "participants.csv").write_text("name\n" + "\n".join(NAMES) + "\n", encoding="utf-8")
+    (event / "event.json").write_text(json.dumps({
+        "title": "Codefest",
+        "template": str(template),
+        "signatories": [{"name": "A. Reyes", "position": "Chair"}],
+    }), encoding="utf-8")
+    return str(tmp_path / "events")
+
+
+@pytest.fixture
+def client(events_dir, cache, monkeypatch):
+    monkeypatch.setattr(server, "get_default_cache", lambda: cache)
+    service = CertificateService(events_dir=events_dir, workers=1)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path):
+        conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=30)
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response, response.read()
+
+    yield get
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_certificate_for_any_name(client, name):
+    response, body = client(f"/events/Codefest/certificate?name={quote(name)}")
+    assert response.status == 200
+    assert body.startswith(b"%PDF")
+    disposition = response.getheader("Content-Disposition")
+    assert disposition.isascii()
+    assert unquote(disposition.split("filename*=UTF-8''")[1]) == name.replace(" ", "_") + ".pdf"
+
+
+def test_unregistered_name_is_not_found(client):
+    response, _ = client(f"/events/Codefest/certificate?name={quote('Nobody')}")
+    assert response.status == 404
+
+
+def test_ascii_fallback_filename():
+    assert 'filename="Jose_Rizal.pdf"' in content_disposition("José Rizal")
+    assert 'filename="certificate.pdf"' in content_disposition("李小龍")
+
+
+@pytest.fixture
+def award_service(tmp_path, cache, monkeypatch):
+    event = tmp_path / "events" / "Awards"
+    event.mkdir(parents=True)
+    template = tmp_path / "award.png"
+    Image.new("RGB", (400, 283), "white").save(template)
+    with open(layout_path_for(str(template)), "w", encoding="utf-8") as f:
+        json.dump({"fields": {"award_line": {"x": "50%", "y": "60%", "size": 12, "text": "Awarded {award}"}}}, f)
+    (event / "participants.csv").write_text("name,award\nAna Cruz,Gold\nBen Reyes,Silver\n", encoding="utf-8")
+    (event / "event.json").write_text(json.dumps({
+        "title": "Awards", "template": str(template), "signatories": [{"name": "A. Reyes", "position": "Chair"}],
+    }), encoding="utf-8")
+
+    rendered = []
+    real_render = server.render_certificate
+
+    def spy(name, *args, **kwargs):
+        rendered.append((name, kwargs.get("fields")))
+        return real_render(name, *args, **kwargs)
+
+    monkeypatch.setattr(server, "get_default_cache", lambda: cache)
+    monkeypatch.setattr(server, "render_certificate", spy)
+    service = CertificateService(events_dir=str(tmp_path / "events"), workers=1)
+    yield service, event, rendered
+    service.shutdown()
+
+
+def test_participant_fields_are_rendered(award_service):
+    service, _event, rendered = award_service
+    service.certificate_pdf("Awards", "Ben Reyes")
+    assert rendered == [("Ben Reyes", {"award_line": "Awarded Silver"})]
+
+
+def test_changed_fields_invalidate_cached_pdf(award_service):
+    service, event, rendered = award_service
+    service.certificate_pdf("Awards", "Ana Cruz")
+    service.certificate_pdf("Awards", "Ana Cruz")
+    assert service.stats()["hits"] == 1
+
+    (event / "participants.csv").write_text("name,award\nAna Cruz,Platinum\nBen Reyes,Silver\n", encoding="utf-8")
+    service.certificate_pdf("Awards", "Ana Cruz")
+    assert service.stats()["misses"] == 2
+    assert rendered[-1] == ("Ana Cruz", {"award_line": "Awarded Platinum"})
+
+
+def test_served_pdf_matches_batch_pdf(award_service, tmp_path, cache):
+    service, event, _rendered = award_service
+    settings = load_event_settings(str(event))
+    fields = texts_for_template(pd.read_csv(event / "participants.csv"), settings["template"], 1,
+                                {k: settings[k] for k in ("event_title", "event_org", "event_dates")})
+    report = generate_batch(
+        ["Ana Cruz", "Ben Reyes"], settings["event_title"], settings["event_org"], settings["event_dates"],
+        settings["template"], str(tmp_path / "run"), settings["signatories"],
+        cache=cache, record=False, thumbnails=False, field_texts=fields,
+    )
+    with open(report["outputs"][1], "rb") as f:
+        assert service.certificate_pdf("Awards", "Ben Reyes") == f.read()
@@ -0,0 +1,38 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from certify_app.signatures import key_background, trim_whitespace, prepare_signature, WHITE_THRESHOLD
+
+
+def scanned_signature():
+    # ink stroke on an opaque, slightly grey paper background with a wide margin
+    image = Image.new("RGB", (300, 120), (245, 244, 240))
+    ImageDraw.Draw(image).line([(60, 80), (120, 30), (200, 70)], fill=(20, 20, 90), width=6)
+    return image
+
+
+def test_paper_becomes_transparent_and_ink_stays():
+    alpha = np.asarray(key_background(scanned_signature()).getchannel("A"))
+    assert alpha[5, 5] == 0
+    assert alpha[80, 60] == 255
+
+
+def test_ramp_below_threshold():
+    grey = Image.new("RGB", (1, 1), (WHITE_THRESHOLD - 20,) * 3)
+    assert 0 < key_background(grey).getpixel((0, 0))[3] < 255
+
+
+def test_trim_to_ink():
+    trimmed = trim_whitespace(key_background(scanned_signature()))
+    assert trimmed.width < 160 and trimmed.height < 70
+    empty = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+    assert trim_whitespace(empty) is empty
+
+
+def test_prepared_signature_fills_target_width(tmp_path, cache):
+    path = tmp_path / "sig.png"
+    scanned_signature().save(path)
+    prepared = prepare_signature(str(path), 360, cache=cache)
+    assert prepared.mode == "RGBA" and prepared.width == 360
+    assert prepare_signature(str(path), 360, cache=cache) is prepared
+    assert cache.stats()["memory_hits"] == 1
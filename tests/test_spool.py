@@ -0,0 +1,100 @@
+import os
+import time
+import threading
+
+from certify_app import batch, storage
+from certify_app.spool import (
+    create_spool, claim_shard, complete_shard, requeue_stalled, spool_status, is_complete, run_worker, _read_json,
+)
+
+
+def make_spool(tmp_path, names=("Ana", "Ben", "Cy", "Dee", "Eve"), shard_size=2):
+    event = tmp_path / "event"
+    event.mkdir()
+    return create_spool(str(event), list(names), "Codefest", "OpenIT", "May 1", "", [], shard_size=shard_size, run_id="run1")
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_names_are_sharded_in_order(tmp_path):
+    spool = make_spool(tmp_path)
+    assert spool_status(spool) == {"pending": 3, "leased": 0, "done": 0}
+    shards = sorted(os.listdir(os.path.join(spool, "pending")))
+    assert [[e[0] for e in _read_json(os.path.join(spool, "pending", s))] for s in shards] == [["Ana", "Ben"], ["Cy", "Dee"], ["Eve"]]
+
+
+def test_each_shard_is_claimed_once(tmp_path):
+    spool = make_spool(tmp_path)
+    claimed = [claim_shard(spool) for _ in range(4)]
+    assert claimed[3] is None
+    assert len(set(claimed[:3])) == 3
+    assert spool_status(spool) == {"pending": 0, "leased": 3, "done": 0}
+
+
+def test_stalled_lease_is_requeued(tmp_path):
+    spool = make_spool(tmp_path)
+    fresh = claim_shard(spool)
+    stalled = claim_shard(spool)
+    age(os.path.join(spool, "leased", stalled), 600)
+
+    assert requeue_stalled(spool, lease_timeout=300) == [stalled]
+    assert os.path.exists(os.path.join(spool, "leased", fresh))
+    assert claim_shard(spool) == stalled
+
+
+def test_finished_shard_is_not_requeued(tmp_path):
+    spool = make_spool(tmp_path)
+    shard = claim_shard(spool)
+    leased = os.path.join(spool, "leased", shard)
+    # the worker finished, but its lease file came back (e.g. a stale rename from another host)
+    complete_shard(spool, shard, {"generated": 2, "failed": 0})
+    with open(leased, "w") as f:
+        f.write("[]")
+    age(leased, 600)
+
+    assert requeue_stalled(spool, lease_timeout=300) == []
+    assert not os.path.exists(leased)
+    assert spool_status(spool) == {"pending": 2, "leased": 0, "done": 1}
+
+
+def test_complete_when_every_shard_is_done(tmp_path):
+    spool = make_spool(tmp_path)
+    while True:
+        shard = claim_shard(spool)
+        if shard is None:
+            break
+        assert not is_complete(spool)
+        complete_shard(spool, shard, {"generated": 1, "failed": 0})
+    assert is_complete(spool)
+
+
+def test_worker_waits_for_job_file(tmp_path, cache, monkeypatch):
+    monkeypatch.setattr(batch, "get_default_cache", lambda: cache)
+    monkeypatch.setattr(batch, "record_certificates", lambda records: len(records))
+    spool = str(tmp_path / "event" / "spool" / "run1")
+    assert run_worker(spool, idle_exit=True) == 0
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(run_worker(spool, poll_interval=0.05)))
+    worker.start()
+    time.sleep(0.2)
+    assert worker.is_alive()
+    make_spool(tmp_path)
+    worker.join(timeout=30)
+    assert result == [3]  # shards rendered
+    assert is_complete(spool)
+
+
+def test_spool_run_gets_its_own_output_folder(tmp_path, monkeypatch):
+    event = tmp_path / "event"
+    event.mkdir()
+    frozen = storage.datetime(2025, 5, 1, 9, 30)
+    monkeypatch.setattr(storage, "datetime", type("Frozen", (), {"now": staticmethod(lambda: frozen)}))
+    taken = storage.new_run_dir(str(event))
+    spool = create_spool(str(event), ["Ana"], "Codefest", "OpenIT", "May 1", "", [])
+    run_id = os.path.basename(spool)
+    assert os.path.isdir(event / "certificates" / run_id)
+    assert (os.path.basename(taken), run_id) == ("20250501_093000", "20250501_093000_2")
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from certify_app.layout import DEFAULT_LAYOUT, _merge, compile_layout
+from certify_app.texts import compile_text, render_texts, participant_texts
+
+CONTEXT = {"event_title": "Codefest", "event_org": "OpenIT", "event_dates": "May 1"}
+
+
+@pytest.mark.parametrize("text, parts", [
+    ("", []),
+    ("Awarded", ["Awarded"]),
+    ("{award}", [("award", None, "")]),
+    ("Awarded {award} at {event_title}", ["Awarded ", ("award", None, ""), " at Codefest"]),
+    ("{event_title} by {event_org}, {event_dates}", ["Codefest by OpenIT, May 1"]),
+    ("{event_title}{event_org}", ["CodefestOpenIT"]),
+    ("Score: {score:.1f}%", ["Score: ", ("score", None, ".1f"), "%"]),
+    ("{role!r}", [("role", "r", "")]),
+    ("{{literal}} {award}", ["{literal} ", ("award", None, "")]),
+    ("{event_title:>10}", ["  Codefest"]),
+])
+def test_compile_text(text, parts):
+    assert compile_text(text, CONTEXT) == parts
+
+
+def test_compile_text_rejects_bad_templates():
+    with pytest.raises(ValueError):
+        compile_text("Awarded {award", CONTEXT)
+
+
+def test_render_texts_fills_columns():
+    frame = pd.DataFrame({"award": ["Gold", None, " Silver "], "score": [95.25, 80.0, None]})
+    parts = compile_text("{award} award ({score:.1f}) at {event_title}", CONTEXT)
+    assert render_texts(parts, frame) == [
+        "Gold award (95.2) at Codefest",
+        "award (80.0) at Codefest",
+        "Silver award () at Codefest",
+    ]
+
+
+def test_missing_column_is_left_blank():
+    frame = pd.DataFrame({"name": ["Ana"]})
+    assert render_texts(compile_text("Awarded {award} as {role}", CONTEXT), frame) == ["Awarded as"]
+
+
+def test_participant_texts_per_dynamic_field():
+    layout = _merge(DEFAULT_LAYOUT, {"fields": {
+        "award_line": {"x": "50%", "y": 760, "text": "Awarded {award}"},
+        "event_line": {"text": "at {event_title}"},
+    }})
+    plan = compile_layout(layout, (2000, 1414), 1)
+    frame = pd.DataFrame({"name": ["Ana", "Ben"], "award": ["Gold", "Silver"]}, index=[3, 7])
+    assert participant_texts(frame, plan, CONTEXT) == {"award_line": ["Awarded Gold", "Awarded Silver"]}
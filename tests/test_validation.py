@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from certify_app.validation import (
+    FILENAME_MAX, _dedupe_stems, predict_filenames, validate_participants, has_issues, format_validation_report,
+)
+
+
+def report_for(names, **kwargs):
+    return validate_participants(pd.DataFrame({"name": names}), **kwargs)
+
+
+def test_dedupe_keeps_first_and_suffixes_in_row_order():
+    stems = pd.Series(["Juan", "Ana", "juan", "JUAN"])
+    assert _dedupe_stems(stems).tolist() == ["Juan", "Ana", "juan_2", "JUAN_3"]
+
+
+def test_dedupe_never_displaces_a_real_suffixed_name():
+    stems = pd.Series(["Juan", "Juan", "Juan_2"])
+    assert _dedupe_stems(stems).tolist() == ["Juan", "Juan_3", "Juan_2"]
+
+
+def test_dedupe_leaves_unique_stems_alone():
+    stems = pd.Series(["Ana", "Ben"])
+    assert _dedupe_stems(stems) is stems
+
+
+def test_predicted_filenames_match_safe_filename():
+    names = pd.Series(["  Ana  Cruz ", 'a/b:"c"', "", "x" * 200])
+    assert predict_filenames(names).tolist() == ["Ana_Cruz", "abc", "participant", "x" * FILENAME_MAX]
+
+
+def test_clean_list_has_no_issues():
+    report = report_for(["Ana Cruz", "Ben Reyes"])
+    assert report["valid"] == 2
+    assert report["output_names"] == ["Ana_Cruz", "Ben_Reyes"]
+    assert not has_issues(report)
+
+
+def test_rows_are_reported_as_csv_lines():
+    report = report_for(["Ana  Cruz", None, "  ", "ana cruz", "Ana/Cruz", "Ben"])
+    assert report["total"] == 6
+    assert report["valid"] == 4
+    assert report["names"] == ["Ana Cruz", "ana cruz", "Ana/Cruz", "Ben"]
+    assert report["normalized_rows"] == [2]
+    assert report["empty_rows"] == [3, 4]
+    assert report["duplicate_rows"] == [2, 5]
+    assert report["collision_rows"] == []
+    assert report["output_names"] == ["Ana_Cruz", "ana_cruz_2", "AnaCruz", "Ben"]
+    assert report["renamed"] == 1
+    assert has_issues(report)
+
+
+def test_different_names_sharing_a_file_name():
+    report = report_for(["Ana:Cruz", "AnaCruz"])
+    assert report["collision_rows"] == [2, 3]
+    assert report["duplicate_rows"] == []
+    assert report["output_names"] == ["AnaCruz", "AnaCruz_2"]
+
+
+def test_long_and_wide_names():
+    report = report_for(["W" * 130, "Ana"], template_path="missing-template.png")
+    assert report["truncated_rows"] == [2]
+    assert report["too_long_rows"] == [2]
+
+
+def test_missing_name_column():
+    with pytest.raises(ValueError, match="'name'"):
+        validate_participants(pd.DataFrame({"full_name": ["Ana"]}))
+
+
+def test_report_lines():
+    lines = format_validation_report(report_for(["Ana", "Ana", ""]))
+    assert lines[0] == "Pre-flight: 2 of 3 rows usable."
+    assert any(line.startswith("Empty names (skipped): 1 (CSV lines 4)") for line in lines)
+    assert any(line.startswith("Duplicate names") and "CSV lines 2, 3" in line for line in lines)
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from certify_app import batch
+from certify_app.verification import (
+    new_certificate_id, normalize_id, record_certificates, lookup_id, lookup_file, verify, ID_ALPHABET,
+)
+
+
+@pytest.mark.parametrize("typed", [
+    "ab12-cd34-ef56",
+    "AB12CD34EF56",
+    " ab12 cd34 ef56 ",
+    "AB12.CD34.EF56",
+])
+def test_normalize_id_formatting(typed):
+    assert normalize_id(typed) == "AB12-CD34-EF56"
+
+
+def test_normalize_id_maps_confusable_letters():
+    assert normalize_id("O0IL-1234-5678") == "0011-1234-5678"
+
+
+def test_normalize_id_leaves_wrong_lengths_alone():
+    assert normalize_id(" abc-123 ") == "ABC-123"
+    assert normalize_id("") == ""
+
+
+def test_new_ids_round_trip():
+    for _ in range(50):
+        cert_id = new_certificate_id()
+        assert normalize_id(cert_id.lower()) == cert_id
+        assert set(cert_id.replace("-", "")) <= set(ID_ALPHABET)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "verification.db")
+    monkeypatch.setattr(batch, "record_certificates", lambda rows: record_certificates(rows, db_path=path))
+    return path
+
+
+@pytest.mark.parametrize("formats", [
+    [{"format": "png"}, {"format": "pdf"}],
+    [{"format": "png"}, {"format": "webp"}],
+])
+def test_every_output_format_verifies_by_hash(tmp_path, db, cache, formats):
+    out = tmp_path / "run"
+    report = batch.generate_batch(
+        ["Ana Cruz"], "Codefest", "OpenIT", "May 1", "missing-template.png", str(out), [],
+        cache=cache, formats=formats, thumbnails=False,
+    )
+    assert report["recorded"] == 1
+    main = report["outputs"][0]
+    if any(f["format"] == "pdf" for f in formats):
+        assert main.endswith(".pdf")
+
+    for spec in formats:
+        found = lookup_file(str(out / f"Ana_Cruz.{spec['format']}"), db_path=db)
+        assert [r["participant"] for r in found] == ["Ana Cruz"]
+        assert os.path.basename(found[0]["output_file"]) == os.path.basename(main)
+
+    record = lookup_id(found[0]["id"].lower(), db_path=db)
+    assert verify(record["id"], db_path=db) == [record]
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from PIL import Image
+
+from certify_app import batch
+from certify_app.watcher import generate_incremental, LIVE_SUBDIR, MANIFEST_NAME
+
+
+@pytest.fixture
+def event(tmp_path, cache, monkeypatch):
+    monkeypatch.setattr(batch, "get_default_cache", lambda: cache)
+    monkeypatch.setattr(batch, "record_certificates", lambda records: len(records))
+    path = tmp_path / "events" / "Codefest"
+    path.mkdir(parents=True)
+    template = tmp_path / "template.png"
+    Image.new("RGB", (400, 283), "white").save(template)
+    (path / "event.json").write_text(json.dumps({
+        "title": "Codefest",
+        "template": str(template),
+        "signatories": [{"name": "A. Reyes", "position": "Chair"}],
+    }), encoding="utf-8")
+    return path
+
+
+def write_names(event, *names):
+    (event / "participants.csv").write_text("name\n" + "\n".join(names) + "\n", encoding="utf-8")
+
+
+def manifest(event):
+    return json.loads((event / "certificates" / LIVE_SUBDIR / MANIFEST_NAME).read_text(encoding="utf-8"))["generated"]
+
+
+def test_only_new_names_are_rendered(event):
+    write_names(event, "Ana  Cruz", "Ben Reyes")
+    assert generate_incremental(str(event))["generated"] == 2
+    assert manifest(event) == {"Ana Cruz": "Ana_Cruz.pdf", "Ben Reyes": "Ben_Reyes.pdf"}
+
+    write_names(event, "Ana Cruz", "Ben Reyes", "Cy Lim")
+    report = generate_incremental(str(event))
+    assert report["generated"] == 1
+    assert [p.rsplit("/", 1)[1] for p in report["outputs"]] == ["Cy_Lim.pdf"]
+    assert generate_incremental(str(event)) is None
+
+
+def test_colliding_names_get_their_own_files(event):
+    write_names(event, "Ana/Reyes", "AnaReyes")
+    generate_incremental(str(event))
+    assert manifest(event) == {"Ana/Reyes": "AnaReyes.pdf", "AnaReyes": "AnaReyes_2.pdf"}
+
+
+def test_new_row_never_takes_an_existing_file(event):
+    write_names(event, "AnaReyes")
+    generate_incremental(str(event))
+    # the new name sorts first in the CSV and would be given "AnaReyes" by a fresh pre-flight
+    write_names(event, "Ana/Reyes", "AnaReyes")
+    generate_incremental(str(event))
+    assert manifest(event) == {"AnaReyes": "AnaReyes.pdf", "Ana/Reyes": "AnaReyes_2.pdf"}
+    assert sorted(p.name for p in (event / "certificates" / LIVE_SUBDIR).glob("*.pdf")) == ["AnaReyes.pdf", "AnaReyes_2.pdf"]